@@ -0,0 +1,134 @@
+"""
+Dashboard fan-out benchmark.
+
+Connects --clients in-process fake WebSockets (one of them stalled) to a
+BroadcastHub and applies --changes metric updates (positions opening and
+closing, sentiment moving), then compares the loop time spent per change
+with the old per-client loop that rebuilt and serialized the full metrics
+for every client.
+
+    python benchmarks/bench_broadcast.py --clients 1 10 100 1000 --positions 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from broadcast import BroadcastHub
+
+
+class FakeSocket:
+    """
+    Accepted WebSocket stand-in; a stalled one never completes a send.
+    """
+    def __init__(self, stalled=False):
+        self.stalled = stalled
+        self.messages = 0
+        self.bytes = 0
+        self._closed = asyncio.Event()
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.messages += 1
+        self.bytes += len(text)
+
+    async def receive_text(self):
+        await self._closed.wait()
+        raise ConnectionError("closed")
+
+    async def close(self):
+        self._closed.set()
+
+
+class Metrics:
+    """
+    get_metrics() shaped state with random position / sentiment churn.
+    """
+    def __init__(self, positions, seed=3):
+        self.rng = random.Random(seed)
+        self.positions = {}
+        self.sentiment = 0.0
+        self.symbols = [f"NSE_EQ|INE{i:06d}01018" for i in range(positions * 2)]
+        for symbol in self.symbols[:positions]:
+            self.open(symbol)
+
+    def open(self, symbol):
+        self.positions[symbol] = {"side": "BUY", "entry_price": round(self.rng.uniform(100, 3000), 2),
+                                  "entry_time": datetime.now(), "quantity": 1, "sl": 0.0, "tgt": 0.0}
+
+    def change(self):
+        if self.rng.random() < 0.5:
+            self.sentiment = round(self.rng.uniform(-1, 1), 3)
+        else:
+            symbol = self.rng.choice(self.symbols)
+            if symbol in self.positions:
+                del self.positions[symbol]
+            else:
+                self.open(symbol)
+
+    def snapshot(self):
+        return {"positions": self.positions, "sentiment": self.sentiment,
+                "active_orders": len(self.positions), "order_queue": {"depth": 0}, "pnl": 0.0}
+
+
+async def run_hub(clients, changes, positions):
+    metrics = Metrics(positions)
+    hub = BroadcastHub(metrics.snapshot, min_interval=0.0, send_timeout=2.0)
+    sockets = [FakeSocket(stalled=(i == 0 and clients > 1)) for i in range(clients)]
+    serving = [asyncio.create_task(hub.serve(ws)) for ws in sockets]
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for _ in range(changes):
+        metrics.change()
+        hub.notify()
+        await asyncio.sleep(0)  # Flush
+        await asyncio.sleep(0)  # Client sends
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(2.1)    # Stalled client times out
+    stats = hub.stats()
+    for ws in sockets:
+        await ws.close()
+    await asyncio.gather(*serving)
+    live = sockets[1:] if clients > 1 else sockets
+    return elapsed, sum(ws.bytes for ws in live) / len(live), stats
+
+
+async def run_baseline(clients, changes, positions):
+    metrics = Metrics(positions)
+    sockets = [FakeSocket() for _ in range(clients)]
+    start = time.perf_counter()
+    for _ in range(changes):
+        metrics.change()
+        for ws in sockets:
+            await ws.send_text(json.dumps(metrics.snapshot(), default=str))
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(ws.bytes for ws in sockets) / clients
+
+
+async def run(args):
+    print(f"{args.changes} changes, ~{args.positions} open positions")
+    for clients in args.clients:
+        base, base_bytes = await run_baseline(clients, args.changes, args.positions)
+        hub, hub_bytes, stats = await run_hub(clients, args.changes, args.positions)
+        print(f"{clients:>5} clients: per-client {base / args.changes * 1e6:>9.1f} us/change {base_bytes / 1024:>8.0f} KiB/client | "
+              f"hub {hub / args.changes * 1e6:>8.1f} us/change {hub_bytes / 1024:>6.0f} KiB/client "
+              f"({base / hub:.1f}x)  dropped {stats['dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--changes", type=int, default=500)
+    parser.add_argument("--positions", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
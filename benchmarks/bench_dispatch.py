@@ -0,0 +1,103 @@
+"""
+Tick dispatch under a slow consumer.
+
+A producer feeds encoded frames to MarketDataStreamer.on_message at a fixed
+rate, as the socket reader would, while the risk handler takes --risk-ms
+per call (an order round trip, a slow strategy). Inline, the reader waits
+for every handler: frames are read late and risk acts on old prices. With
+the dispatcher (what connect() uses), the reader only enqueues, candle
+building still sees every tick, and risk acts on the newest tick per symbol.
+
+    python benchmarks/bench_dispatch.py --symbols 50 --rate 500 --risk-ms 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import SyntheticMarket, SESSION_START_MS
+from market_data import MarketDataStreamer
+
+INTERVAL_MS = 250
+
+
+def pct(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def run_case(frames, symbols, args, dispatch):
+    streamer = MarketDataStreamer({"TRADING_SYMBOL_LIST": symbols})
+    sent = [0] * len(frames)
+    reader_lag, staleness = [], []
+    candle_ticks = 0
+
+    async def candles(ticks):
+        nonlocal candle_ticks
+        candle_ticks += len(ticks)
+
+    async def risk(ticks):
+        # Age of the newest price acted on, from when its frame was due
+        newest = max(tick.ltt for tick in ticks)
+        staleness.append(time.perf_counter_ns() - sent[(newest - SESSION_START_MS) // INTERVAL_MS])
+        await asyncio.sleep(args.risk_ms / 1000)
+
+    streamer.tick_handlers.append(candles)
+    streamer.latest_handlers.append(risk)
+    if dispatch:
+        streamer.dispatcher.start()
+
+    period = 1e9 / args.rate
+    start = time.perf_counter_ns()
+    for i, frame in enumerate(frames):
+        due = start + i * period
+        now = time.perf_counter_ns()
+        if now < due:
+            await asyncio.sleep((due - now) / 1e9)
+        sent[i] = due
+        reader_lag.append(time.perf_counter_ns() - due)
+        await streamer.on_message(frame)
+        await asyncio.sleep(0)
+
+    if dispatch:
+        while streamer.dispatcher.queue or streamer.dispatcher.latest:
+            await asyncio.sleep(0.01)
+        stats = streamer.dispatcher.stats()
+        streamer.dispatcher.stop()
+    else:
+        stats = {}
+    label = "dispatch" if dispatch else "inline"
+    print(f"{label:<9} reader lag p50 {pct(reader_lag, 50) / 1e6:8.1f} ms  p99 {pct(reader_lag, 99) / 1e6:8.1f} ms | "
+          f"risk price age p50 {pct(staleness, 50) / 1e6:8.1f} ms  p99 {pct(staleness, 99) / 1e6:8.1f} ms | "
+          f"risk calls {len(staleness)}  candle ticks {candle_ticks}")
+    if stats:
+        print(f"{'':<9} {stats}")
+
+
+async def run(args):
+    market = SyntheticMarket(args.symbols, seed=args.seed)
+    frames = market.encoded_frames(args.frames, ticks_per_frame=args.ticks_per_frame)
+    print(f"{len(frames)} frames x {args.ticks_per_frame or args.symbols} ticks at {args.rate}/s, "
+          f"risk handler {args.risk_ms} ms per call")
+    for dispatch in (False, True):
+        await run_case(frames, market.symbols, args, dispatch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--ticks-per-frame", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=500.0, help="Frames per second")
+    parser.add_argument("--risk-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
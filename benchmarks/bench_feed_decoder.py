@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for the V2 feed decoder.
+
+Measures frames/sec and ticks/sec of FeedDecoder.decode on sample frames.
+Frames are either loaded from a recording (--frames, a file of
+4-byte little-endian length-prefixed raw WebSocket frames) or synthesised
+with encode_feed_response to mimic a 'full' mode subscription.
+
+    python benchmarks/bench_feed_decoder.py --symbols 300
+    python benchmarks/bench_feed_decoder.py --frames recorded.bin
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from feed_decoder import FeedDecoder, Tick, encode_feed_response, read_frames, write_frames
+
+
+def synthetic_frames(n_frames, n_symbols, mode="full", seed=42):
+    rng = random.Random(seed)
+    symbols = [f"NSE_EQ|INE{i:06d}01018" for i in range(n_symbols)]
+    prices = [rng.uniform(100, 3000) for _ in symbols]
+    vtt = [0] * n_symbols
+    ltt = 1_700_000_000_000
+    frames = []
+    for _ in range(n_frames):
+        ltt += rng.randint(50, 500)
+        ticks = []
+        for i, symbol in enumerate(symbols):
+            prices[i] = round(prices[i] * (1 + rng.gauss(0, 0.0005)), 2)
+            qty = rng.randint(1, 500)
+            vtt[i] += qty
+            ticks.append(Tick(symbol, ltp=prices[i], ltt=ltt, ltq=qty, cp=prices[i] * 0.99,
+                              vtt=vtt[i], oi=0.0, atp=prices[i]))
+        frames.append(encode_feed_response(ticks, mode=mode))
+    return frames
+
+
+def run(frames, seconds, backend):
+    decoder = FeedDecoder(backend)
+    for frame in frames[:10]:
+        decoder.decode(frame)  # Warm the key cache
+
+    n_frames = n_ticks = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for frame in frames:
+            n_ticks += len(decoder.decode(frame))
+        n_frames += len(frames)
+        if time.perf_counter() >= deadline:
+            break
+    elapsed = time.perf_counter() - start
+    return n_frames / elapsed, n_ticks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="Recorded frames file (length-prefixed)")
+    parser.add_argument("--record", help="Write the synthetic frames to this file and exit")
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--count", type=int, default=200, help="Synthetic frames to generate")
+    parser.add_argument("--mode", choices=["full", "ltpc"], default="full")
+    parser.add_argument("--backend", choices=["auto", "native", "python"], default="auto")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.frames:
+        frames = read_frames(args.frames)
+    else:
+        frames = synthetic_frames(args.count, args.symbols, args.mode)
+
+    if args.record:
+        write_frames(args.record, frames)
+        print(f"Wrote {len(frames)} frames to {args.record}")
+        return
+
+    avg_size = sum(len(f) for f in frames) / len(frames)
+    backends = ["native", "python"] if args.backend == "auto" else [args.backend]
+    print(f"frames: {len(frames)}  avg size: {avg_size / 1024:.1f} KiB")
+    for backend in backends:
+        try:
+            fps, tps = run(frames, args.seconds, backend)
+        except ImportError as e:
+            print(f"{backend:>6}: skipped ({e})")
+            continue
+        print(f"{backend:>6}: {fps:,.0f} frames/sec  {tps:,.0f} ticks/sec  {1e6 / tps:.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
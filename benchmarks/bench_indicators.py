@@ -0,0 +1,150 @@
+"""
+Streaming indicators vs full-history pandas_ta recomputation.
+
+Times the per-bar cost of the old on_candle path (TechnicalIndicators over
+the whole frame, then iloc[-1]) against IndicatorState.update, and checks
+that the streaming values match pandas_ta within tolerance.
+
+    python benchmarks/bench_indicators.py --symbols 500 --bars 375
+    python benchmarks/bench_indicators.py --check-only
+
+The comparison starts at bar --warmup (default: the strategy's min_bars,
+the first bar it trades on). pandas_ta uses TA-Lib (SMA-seeded Wilder
+smoothing) when it is installed; its RSI/ATR then converge to the
+streaming values only later, so raise --warmup to compare against it.
+tests/test_indicators.py checks the same parity against the pandas_ta
+formulas written out in pandas, without needing pandas_ta.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from streaming_indicators import IndicatorState
+
+
+def synthetic_candles(n_bars, seed=0, start_ms=1_700_019_900_000):
+    """
+    Random-walk 1-min OHLCV bars with volume bursts, spanning sessions when
+    n_bars > 375.
+    """
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    spread = close * rng.uniform(0.0002, 0.002, n_bars)
+    high = close + spread * rng.random(n_bars)
+    low = close - spread * rng.random(n_bars)
+    open_ = low + (high - low) * rng.random(n_bars)
+    volume = rng.integers(1_000, 20_000, n_bars).astype(float)
+    burst = rng.random(n_bars) < 0.03
+    volume[burst] *= rng.uniform(3, 8, burst.sum())
+    ts = start_ms + np.arange(n_bars, dtype=np.int64) * 60_000
+    index = pd.to_datetime(ts, unit="ms", utc=True).tz_convert("Asia/Kolkata").tz_localize(None)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def streaming_series(df, rsi_period=14, atr_period=14, vol_ma_period=20):
+    state = IndicatorState(rsi_period, atr_period, vol_ma_period)
+    ts = df.index.tz_localize("Asia/Kolkata").as_unit("ms").asi8
+    out = np.empty((len(df), 4))
+    rows = zip(ts.tolist(), df["open"].tolist(), df["high"].tolist(), df["low"].tolist(),
+               df["close"].tolist(), df["volume"].tolist())
+    for i, row in enumerate(rows):
+        state.update(*row)
+        out[i] = (state.vwap, state.rsi, state.atr, state.vol_sma)
+    return out
+
+
+def check_parity(df, warmup, rtol):
+    from indicators import TechnicalIndicators
+
+    reference = {
+        "vwap": TechnicalIndicators.calculate_vwap(df),
+        "rsi": TechnicalIndicators.calculate_rsi(df, 14),
+        "atr": TechnicalIndicators.calculate_atr(df, 14),
+        "vol_sma": TechnicalIndicators.calculate_sma_volume(df, 20),
+    }
+    streamed = streaming_series(df)
+    ok = True
+    for col, name in enumerate(reference):
+        ref = reference[name].to_numpy()[warmup:]
+        got = streamed[warmup:, col]
+        mask = ~np.isnan(ref)
+        if (np.isnan(got) != ~mask).any():
+            print(f"{name:>8}: NaN pattern differs from pandas_ta")
+            ok = False
+            continue
+        err = np.max(np.abs(got[mask] - ref[mask]) / np.maximum(np.abs(ref[mask]), 1e-12)) if mask.any() else 0.0
+        status = "ok" if err <= rtol else "MISMATCH"
+        ok &= err <= rtol
+        print(f"{name:>8}: max rel err {err:.2e} {status}")
+    return ok
+
+
+def bench(n_symbols, n_bars):
+    frames = [synthetic_candles(n_bars, seed=i) for i in range(n_symbols)]
+
+    # Old path: one closing bar -> full-history pandas_ta recompute per symbol
+    from indicators import TechnicalIndicators
+    start = time.perf_counter()
+    for df in frames:
+        df = df.copy()
+        df["vwap"] = TechnicalIndicators.calculate_vwap(df)
+        df["rsi"] = TechnicalIndicators.calculate_rsi(df, 14)
+        df["atr"] = TechnicalIndicators.calculate_atr(df, 14)
+        df["vol_sma"] = TechnicalIndicators.calculate_sma_volume(df, 20)
+        df.iloc[-1]
+    full = time.perf_counter() - start
+
+    # New path: all history already folded in, one O(1) update per symbol
+    states = []
+    last_rows = []
+    for df in frames:
+        state = IndicatorState()
+        ts = df.index.tz_localize("Asia/Kolkata").as_unit("ms").asi8
+        rows = list(zip(ts.tolist(), df["open"].tolist(), df["high"].tolist(), df["low"].tolist(),
+                        df["close"].tolist(), df["volume"].tolist()))
+        for row in rows[:-1]:
+            state.update(*row)
+        states.append(state)
+        last_rows.append(rows[-1])
+    start = time.perf_counter()
+    for state, row in zip(states, last_rows):
+        state.update(*row)
+    incremental = time.perf_counter() - start
+
+    print(f"{n_symbols} symbols x {n_bars} bars, one bar close:")
+    print(f"  pandas_ta full recompute: {full * 1e3:10.2f} ms")
+    print(f"  streaming update:         {incremental * 1e3:10.3f} ms  ({full / incremental:,.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=375)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--rtol", type=float, default=1e-6)
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        import pandas_ta  # noqa: F401
+    except ImportError:
+        print("pandas_ta is not installed; nothing to compare against.")
+        sys.exit(2)
+
+    ok = True
+    for seed in range(3):
+        print(f"parity (seed {seed}, {args.bars * 3} bars):")
+        ok &= check_parity(synthetic_candles(args.bars * 3, seed=seed), args.warmup, args.rtol)
+    if not args.check_only:
+        bench(args.symbols, args.bars)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Instrument master: build, open and lookup cost on a synthetic Upstox
+instruments file (equities on NSE and BSE plus F&O contracts), compared
+with parsing the file on every start.
+
+    python benchmarks/bench_instruments.py --instruments 150000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from instruments import InstrumentMaster, _read_source
+
+
+def synthetic_instruments(n, seed=0):
+    """
+    BOD-JSON style rows: n // 10 equities listed on NSE and BSE, the rest
+    NSE_FO futures and options on them.
+    """
+    rng = random.Random(seed)
+    rows = []
+    n_eq = max(1, n // 20)
+    for i in range(n_eq):
+        isin = f"INE{i:05d}A01{i % 10}"
+        for segment in ("NSE_EQ", "BSE_EQ"):
+            rows.append({"segment": segment, "name": f"COMPANY {i} LIMITED", "exchange": segment[:3],
+                         "isin": isin, "instrument_type": "EQ", "instrument_key": f"{segment}|{isin}",
+                         "lot_size": 1, "tick_size": 5.0, "trading_symbol": f"SYM{i}"})
+    token = 10_000
+    seen = set()
+    while len(rows) < n:
+        i = rng.randrange(n_eq)
+        strike = rng.randrange(100, 5000, 50)
+        kind = rng.choice(("FUT", "CE", "PE"))
+        symbol = f"SYM{i} FUT 30 JAN 25" if kind == "FUT" else f"SYM{i} {strike} {kind} 30 JAN 25"
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        rows.append({"segment": "NSE_FO", "name": f"SYM{i}", "exchange": "NSE", "isin": "",
+                     "instrument_type": kind, "instrument_key": f"NSE_FO|{token}",
+                     "lot_size": rng.choice((25, 50, 75, 250, 500)), "tick_size": 5.0, "trading_symbol": symbol})
+        token += 1
+    return rows[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instruments", type=int, default=150_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = synthetic_instruments(args.instruments)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "NSE.json.gz")
+        with gzip.open(source, "wt") as f:
+            json.dump(rows, f)
+        store = os.path.join(tmp, "store")
+        print(f"{len(rows)} instruments, source {os.path.getsize(source) / 1e6:.1f} MB gzipped")
+
+        start = time.perf_counter()
+        _read_source(source)
+        print(f"parse source:      {(time.perf_counter() - start) * 1e3:9.1f} ms")
+        start = time.perf_counter()
+        InstrumentMaster.build(source, store)
+        print(f"build store:       {(time.perf_counter() - start) * 1e3:9.1f} ms")
+        start = time.perf_counter()
+        master = InstrumentMaster.open(store, source)
+        print(f"open store:        {(time.perf_counter() - start) * 1e3:9.1f} ms")
+
+        rng = random.Random(1)
+        picks = [rng.choice(rows) for _ in range(args.lookups)]
+        for label, names in (("instrument_key", [r["instrument_key"] for r in picks]),
+                             ("segment|symbol", [f"{r['segment']}|{r['trading_symbol']}" for r in picks]),
+                             ("bare symbol", [r["trading_symbol"] for r in picks if r["segment"] == "NSE_EQ"])):
+            start = time.perf_counter()
+            keys = master.instrument_keys(names)
+            took = time.perf_counter() - start
+            print(f"lookup {label:<15} {took / len(names) * 1e6:7.2f} us each ({len(names)} names)")
+        assert keys == [f"NSE_EQ|{r['isin']}" for r in picks if r["segment"] == "NSE_EQ"]
+
+        start = time.perf_counter()
+        selected = master.select("NSE_EQ", "EQ")
+        print(f"select NSE_EQ/EQ:  {(time.perf_counter() - start) * 1e3:9.1f} ms ({len(selected)} keys)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Cost of the tick-to-trade latency instrumentation.
+
+First times the instrumentation a feed frame goes through (clock reads
+and histogram records for the decode / candle / risk / frame stages) in
+isolation, on and off; the per-tick cost is that divided by the ticks per
+frame. Then feeds synthetic full-mode frames through
+MarketDataStreamer.on_message -> CandleAggregator -> GodfatherStrategy both
+ways and prints the recorded stage percentiles.
+
+    python benchmarks/bench_latency.py --symbols 1 10 50 300
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_feed_decoder import synthetic_frames
+from candles import CandleAggregator
+from latency import LATENCY, now_ns
+from market_data import MarketDataStreamer
+from strategy import GodfatherStrategy
+
+
+class NoOrders:
+    async def place_order_async(self, symbol, side, quantity, **kwargs):
+        return None
+
+
+class FixedSentiment:
+    sentiment_cache = {"market": 0.0}
+
+
+def pipeline(symbols):
+    config = {"TRADING_SYMBOL_LIST": symbols}
+    streamer = MarketDataStreamer(config)
+    strategy = GodfatherStrategy(NoOrders(), FixedSentiment(), config)
+    candles = CandleAggregator(strategy.timeframe, symbols, on_close=strategy.on_bar_close)
+    streamer.tick_handlers += [candles.on_ticks, strategy.on_ticks]
+    return streamer
+
+
+async def per_tick(frames, n_symbols, enabled, rounds):
+    LATENCY.enabled = enabled
+    best = float("inf")
+    for _ in range(rounds):
+        streamer = pipeline([f"NSE_EQ|INE{i:06d}01018" for i in range(n_symbols)])
+        start = time.perf_counter()
+        for frame in frames:
+            await streamer.on_message(frame)
+        best = min(best, (time.perf_counter() - start) / (len(frames) * n_symbols))
+    return best
+
+
+def frame_instrumentation():
+    # Mirrors the calls on_message / CandleAggregator.on_ticks / GodfatherStrategy.on_ticks make per frame
+    received = LATENCY.frame_ns = now_ns()
+    LATENCY.record("decode", received)
+    started = now_ns()
+    LATENCY.record("candle", started)
+    started = now_ns()
+    LATENCY.record("risk", started)
+    LATENCY.record("frame", received)
+    LATENCY.frame_ns = 0
+
+
+def per_frame_cost(enabled, n=200_000, rounds=5):
+    LATENCY.enabled = enabled
+    def empty():
+        pass
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(n):
+            frame_instrumentation()
+        timed = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(n):
+            empty()
+        best = min(best, (timed - (time.perf_counter() - start)) / n)
+    return best
+
+
+async def run(args):
+    on, off = per_frame_cost(True), per_frame_cost(False)
+    print(f"instrumentation per frame: on {on * 1e9:.0f} ns  off {off * 1e9:.0f} ns  -> per tick on: "
+          + "  ".join(f"{n} ticks/frame {on / n * 1e9:.0f} ns" for n in args.symbols))
+    LATENCY.reset()
+    for n in args.symbols:
+        frames = synthetic_frames(args.frames, n)
+        off = await per_tick(frames, n, False, args.rounds)
+        on = await per_tick(frames, n, True, args.rounds)
+        print(f"{n:>4} ticks/frame pipeline: off {off * 1e6:7.2f} us/tick  on {on * 1e6:7.2f} us/tick")
+    print()
+    for stage, row in LATENCY.snapshot().items():
+        if row["count"]:
+            print(f"{stage:<14} {row}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 10, 50, 300])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Event-loop stall caused by news scraping.
+
+Serves news page fixtures from a local HTTP server, points
+IntelligenceModule at it and runs scrapes while a probe task measures how
+late the event loop wakes it up (what a tick handler would wait). Compares
+parsing inline (workers=0) with the worker process (workers=1).
+
+    python benchmarks/bench_loop_stall.py --scrapes 5
+    python benchmarks/bench_loop_stall.py --fixtures saved_pages/   # real *.html pages
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from intelligence import IntelligenceModule
+from mock_news import MockNewsServer
+from news_fetcher import NewsSource, MONEYCONTROL_RULES, ECONOMICTIMES_RULES
+from bench_sentiment import synthetic_headlines
+
+
+def synthetic_pages(n_stories=600, seed=11):
+    """
+    Two pages shaped like the scraped sources: Moneycontrol-style <h2> lists and
+    Economic Times-style div.eachStory cards, padded with typical page markup.
+    """
+    rng = random.Random(seed)
+    headlines = synthetic_headlines(2 * n_stories, unique=1.0, seed=seed)
+    filler = "<p class='summary'>" + "Markets traded in a narrow range through the session. " * 6 + "</p>"
+    nav = "<ul class='nav'>" + "".join(f"<li><a href='/s/{i}'>Section {i}</a></li>" for i in range(200)) + "</ul>"
+    mc = ["<html><head><title>Markets</title></head><body>", nav]
+    for h in headlines[:n_stories]:
+        mc.append(f"<li class='clearfix'><h2><a href='/n/{rng.randint(1, 10**6)}'>{h}</a></h2>{filler}</li>")
+    mc.append("</body></html>")
+    et = ["<html><body>", nav]
+    for h in headlines[n_stories:]:
+        et.append(f"<div class='eachStory'><h3><a href='/a/{rng.randint(1, 10**6)}'>{h}</a></h3>{filler}</div>")
+    et.append("</body></html>")
+    return {"moneycontrol.html": "".join(mc), "economictimes.html": "".join(et)}
+
+
+RULES = {"moneycontrol.html": MONEYCONTROL_RULES, "economictimes.html": ECONOMICTIMES_RULES}
+
+
+def load_fixtures(path):
+    pages = {}
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".html"):
+            with open(os.path.join(path, name), encoding="utf-8", errors="replace") as f:
+                pages[name] = f.read()
+    return pages
+
+
+async def probe(lags, interval):
+    """
+    Wake every 'interval' seconds and record how late each wake-up was.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - expected)
+
+
+async def measure(server, pages, workers, scrapes, interval):
+    # interval=0: every source is due on every scrape
+    sources = [NewsSource(name, server.url(name), interval=0.0, rules=RULES.get(name, MONEYCONTROL_RULES))
+               for name in pages]
+    # cache_size=0: score every headline, as when most headlines are new
+    brain = IntelligenceModule(cache_size=0, workers=workers, news_sources=sources)
+    await brain.scrape_news()  # Warm up (worker start-up, imports)
+
+    lags = []
+    task = asyncio.create_task(probe(lags, interval))
+    start = time.perf_counter()
+    for i in range(scrapes):
+        # Change every page so each scrape re-parses it
+        for name, html in pages.items():
+            server.set_page(name, html + f"<!-- {workers}.{i} -->")
+        await brain.scrape_news()
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    await brain.close()
+
+    lags.sort()
+    return {
+        "scrape_ms": elapsed / scrapes * 1e3,
+        "p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1e3,
+        "max_ms": lags[-1] * 1e3,
+    }
+
+
+async def run(args):
+    pages = load_fixtures(args.fixtures) if args.fixtures else synthetic_pages(args.stories)
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages.values()) / 1e3:,.0f} kB")
+    server = MockNewsServer(pages)
+    await server.start()
+    try:
+        for label, workers in (("inline", 0), ("worker", 1)):
+            r = await measure(server, pages, workers, args.scrapes, args.interval)
+            print(f"{label:<7} scrape {r['scrape_ms']:8.1f} ms   loop stall p99 {r['p99_ms']:8.2f} ms   max {r['max_ms']:8.2f} ms")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrapes", type=int, default=5)
+    parser.add_argument("--stories", type=int, default=600, help="Headlines per synthetic page")
+    parser.add_argument("--fixtures", help="Directory of saved *.html pages to serve instead")
+    parser.add_argument("--interval", type=float, default=0.001, help="Probe wake-up interval (s)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Conditional news fetching against the local news stand-in.
+
+Polls two synthetic news pages where, on each poll, a page gets a fresh
+headline with probability --change. Reports bytes fetched vs saved by 304s,
+parse time spent vs saved, and how many new headlines reached scoring,
+with and without server-side ETag support (the body hash still avoids
+re-parsing an unchanged page when the site never answers 304).
+
+    python benchmarks/bench_news_fetch.py --polls 60 --change 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from intelligence import IntelligenceModule
+from mock_news import MockNewsServer
+from news_fetcher import NewsSource
+from bench_loop_stall import synthetic_pages, RULES
+from bench_sentiment import synthetic_headlines
+
+
+async def run_polls(pages, polls, change, conditional, seed):
+    rng = random.Random(seed)
+    fresh = iter(synthetic_headlines(polls * len(pages), unique=1.0, seed=seed + 1))
+    server = MockNewsServer(pages, conditional=conditional)
+    await server.start()
+    sources = [NewsSource(name, server.url(name), interval=0.0, rules=RULES[name]) for name in pages]
+    brain = IntelligenceModule(workers=0, news_sources=sources)
+    current = dict(pages)
+    new_headlines = 0
+    try:
+        for _ in range(polls):
+            for name, html in current.items():
+                if rng.random() < change:
+                    # Breaking story at the top of the page
+                    tag = "<h2>{}</h2>" if name.startswith("moneycontrol") else "<div class='eachStory'><h3>{}</h3></div>"
+                    html = html.replace("</ul>", "</ul>" + tag.format(next(fresh)), 1)
+                    current[name] = html
+                    server.set_page(name, html)
+            changed = await brain.news.fetch_due()
+            if changed:
+                results = brain.parse_and_score([(s.name, html, s.rules) for s, html in changed])
+                for (source, _), result in zip(changed, results):
+                    brain.news.record_parse(source, result["parse_seconds"])
+                    new_headlines += len(result["new"])
+    finally:
+        await brain.close()
+        await server.stop()
+    return brain.news.stats(), new_headlines
+
+
+async def run(args):
+    pages = synthetic_pages(args.stories)
+    print(f"{args.polls} polls of {len(pages)} pages ({sum(len(p) for p in pages.values()) / 1e3:,.0f} kB), "
+          f"change probability {args.change}")
+    for label, conditional in (("etag", True), ("no-etag", False)):
+        stats, new = await run_polls(pages, args.polls, args.change, conditional, args.seed)
+        total_bytes = stats["bytes_fetched"] + stats["bytes_saved"]
+        total_parse = stats["parse_ms"] + stats["parse_ms_saved"]
+        print(f"{label:<8} fetched {stats['bytes_fetched'] / 1e6:7.2f} MB of {total_bytes / 1e6:7.2f} MB   "
+              f"parsed {stats['changed']:3d}/{stats['requests']} pages, "
+              f"{stats['parse_ms']:8.1f} ms of {total_parse:8.1f} ms   new headlines {new}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--polls", type=int, default=60)
+    parser.add_argument("--change", type=float, default=0.2, help="Per-poll probability a page changes")
+    parser.add_argument("--stories", type=int, default=600, help="Headlines per synthetic page")
+    parser.add_argument("--seed", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Order gateway benchmark against the local mock Upstox server.
+
+Reports sequential submit latency (p50/p99) over the pooled keep-alive
+session and burst throughput (orders/sec) with place_orders.
+
+    python benchmarks/bench_order_gateway.py --orders 2000 --burst 20
+    python benchmarks/bench_order_gateway.py --latency 0.005
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mock_upstox import MockUpstoxServer
+from order_gateway import OrderGateway
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+async def run(args):
+    server = MockUpstoxServer(latency=args.latency)
+    await server.start()
+    gateway = OrderGateway({
+        "ACCESS_TOKEN": "bench-token",
+        "UPSTOX_API_URL": server.base_url,
+        "UPSTOX_HFT_URL": server.base_url,
+    }, pool_size=args.pool)
+    await gateway.start()
+    await gateway.warm_up()
+
+    try:
+        # 1. Sequential submit latency
+        latencies = []
+        for i in range(args.orders):
+            start = time.perf_counter()
+            order_id = await gateway.place_order("NSE_EQ|INE002A01018", "BUY" if i % 2 else "SELL", 1)
+            latencies.append(time.perf_counter() - start)
+            assert order_id is not None
+        print(f"sequential: {args.orders / sum(latencies):,.0f} orders/sec  "
+              f"p50 {percentile(latencies, 50) * 1e3:.3f} ms  p99 {percentile(latencies, 99) * 1e3:.3f} ms")
+
+        # 2. Bursts of concurrent orders
+        batch = [{"symbol": f"NSE_EQ|SYM{i}", "side": "BUY", "quantity": 1} for i in range(args.burst)]
+        burst_latencies = []
+        start = time.perf_counter()
+        for _ in range(max(1, args.orders // args.burst)):
+            t0 = time.perf_counter()
+            ids = await gateway.place_orders(batch)
+            burst_latencies.append(time.perf_counter() - t0)
+            assert all(ids)
+        elapsed = time.perf_counter() - start
+        sent = len(burst_latencies) * args.burst
+        print(f"burst x{args.burst}: {sent / elapsed:,.0f} orders/sec  "
+              f"p99 batch {percentile(burst_latencies, 99) * 1e3:.3f} ms")
+    finally:
+        await gateway.close()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--pool", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server delay per request (s)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
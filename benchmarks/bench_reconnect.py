@@ -0,0 +1,160 @@
+"""
+Feed reconnects against a flaky mock feed, and the REST resync after them.
+
+Connection resets (only the subscribed connection is cut; a standby, if
+kept, survives) and short outages (every connection cut, new ones refused
+for --downtime seconds) are timed as the gap between the last frame before
+the cut and the first after it. Then, with a position open: the broker
+closes it and opens another while the feed is down (reconciled on
+reconnect), and the price crosses the stop during an outage (exited from
+REST polling before the feed is back).
+
+    python benchmarks/bench_reconnect.py --drops 10 --downtime 0.3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import instrument_keys
+from mock_feed import MockFeedServer
+from mock_upstox import MockUpstoxServer
+from order_gateway import OrderGateway
+from market_data import MarketDataStreamer
+from candles import CandleAggregator
+from strategy import GodfatherStrategy
+from resync import StateResync
+
+
+class GatewayClient:
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+    async def place_order_async(self, symbol, side, quantity, **kwargs):
+        return await self.gateway.place_order(symbol, side, quantity)
+
+
+class FixedSentiment:
+    sentiment_cache = {"market": 0.0}
+
+
+async def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        await asyncio.sleep(0.001)
+
+
+class Bot:
+    def __init__(self, feed, rest, symbols, standby):
+        config = {"TRADING_SYMBOL_LIST": symbols, "ACCESS_TOKEN": "bench", "UPSTOX_FEED_URL": feed.url,
+                  "UPSTOX_API_URL": rest.base_url, "UPSTOX_HFT_URL": rest.base_url, "FEED_STANDBY": standby,
+                  "RESYNC_POLL_INTERVAL": 0.1}
+        self.gateway = OrderGateway(config)
+        self.market_data = MarketDataStreamer(config)
+        self.strategy = GodfatherStrategy(GatewayClient(self.gateway), FixedSentiment(), config)
+        self.candles = CandleAggregator(self.strategy.timeframe, symbols, on_close=self.strategy.on_bar_close)
+        self.resync = StateResync.from_config(config, self.gateway, self.strategy)
+        self.market_data.tick_handlers.append(self.candles.on_ticks)
+        self.market_data.latest_handlers.append(self.strategy.on_ticks)
+        self.market_data.gap_handlers += [self.candles.mark_gap, self.strategy.on_gap]
+        self.market_data.disconnect_handlers.append(self.resync.on_disconnect)
+        self.market_data.connect_handlers.append(self.resync.on_connect)
+        self.task = None
+
+    async def start(self):
+        self.task = asyncio.create_task(self.market_data.connect())
+        await wait_for(lambda: self.market_data.last_frame_ns)
+        if self.market_data.use_standby:
+            await wait_for(lambda: self.market_data.stats()["standby"])
+
+    async def stop(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await self.gateway.close()
+
+    async def cut(self, feed, down, subscribed_only):
+        gaps = self.market_data.gaps
+        feed.drop(down, subscribed_only)
+        await wait_for(lambda: self.market_data.gaps > gaps)
+        if self.market_data.use_standby:
+            await wait_for(lambda: self.market_data.stats()["standby"])
+        return self.market_data.last_gap_ms
+
+
+async def run(args):
+    symbols = instrument_keys(args.symbols)
+    rest = MockUpstoxServer()
+    await rest.start()
+    # Steady feed prices, equal to the REST quotes: only the test moves them
+    feed = MockFeedServer(frame_rate=args.frame_rate, ticks_per_frame=args.symbols, volatility=0.0)
+    for symbol in symbols:
+        feed.set_price(symbol, rest.price(symbol))
+    await feed.start()
+
+    print(f"{args.drops} cuts each, feed at {args.frame_rate:g} frames/s (gap = last frame before -> first after)")
+    for standby in (False, True):
+        bot = Bot(feed, rest, symbols, standby)
+        await bot.start()
+        for label, down, subscribed_only in (("reset", 0.0, True), (f"{args.downtime:g}s outage", args.downtime, False)):
+            gaps = [await bot.cut(feed, down, subscribed_only) for _ in range(args.drops)]
+            print(f"  standby {'on ' if standby else 'off'}  {label:<12} gap p50 {np.percentile(gaps, 50):7.1f} ms  "
+                  f"max {max(gaps):7.1f} ms")
+        await bot.stop()
+
+    bot = Bot(feed, rest, symbols, True)
+    await bot.start()
+    strategy = bot.strategy
+    held, other = symbols[0], symbols[1]
+    await strategy.execute_trade(held, "BUY", rest.price(held), rest.price(held) * 0.002)
+
+    # Broker-side changes while the feed is down: reconciled on reconnect
+    feed.drop(args.downtime, False)
+    rest.orders["MANUAL1"] = {"order_id": "MANUAL1", "status": "complete", "instrument_token": held,
+                              "transaction_type": "SELL", "quantity": 1, "filled_quantity": 1,
+                              "average_price": rest.price(held)}
+    rest.orders["MANUAL2"] = {"order_id": "MANUAL2", "status": "complete", "instrument_token": other,
+                              "transaction_type": "SELL", "quantity": 3, "filled_quantity": 3,
+                              "average_price": rest.price(other)}
+    resyncs = bot.resync.resyncs
+    await wait_for(lambda: bot.resync.resyncs > resyncs)
+    assert held not in strategy.positions and strategy.positions[other]["quantity"] == 3, strategy.positions
+    print(f"resync      {bot.resync.last_resync_ms:7.1f} ms  {bot.resync.stats()}  positions {list(strategy.positions)}")
+
+    # The stop is crossed during an outage: exited from REST polling
+    pos = strategy.positions[other]
+    feed.drop(args.downtime * 10, False)
+    cut = time.perf_counter()
+    rest.prices[other] = pos["sl"] + 1.0
+    await wait_for(lambda: other not in strategy.positions)
+    exited = time.perf_counter()
+    await wait_for(lambda: not strategy.inflight)
+    print(f"stop during outage: exited after {(exited - cut) * 1000:.0f} ms "
+          f"({bot.resync.polls} REST polls), feed still down: {not bot.market_data.running}")
+    await bot.stop()
+    await feed.stop()
+    await rest.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--frame-rate", type=float, default=100.0)
+    parser.add_argument("--drops", type=int, default=10)
+    parser.add_argument("--downtime", type=float, default=0.3, help="Seconds new connections are refused")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Headline sentiment scoring benchmark.
+
+Scores synthetic headlines three ways:
+  - baseline: the original per-call keyword dict + substring scan + TextBlob
+  - cold:     compiled KeywordScorer + TextBlob, empty cache
+  - warm:     the same headlines again (every scrape after the first)
+
+Then tags the headlines with instruments from a --universe sized alias
+index, against a naive scan of every company name per headline.
+
+    python benchmarks/bench_sentiment.py --headlines 10000
+    python benchmarks/bench_sentiment.py --headlines 10000 --unique 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from textblob import TextBlob
+from intelligence import IntelligenceModule
+from sentiment_lexicon import DEFAULT_KEYWORDS, KeywordScorer
+from sentiment_index import AliasIndex, SentimentIndex
+
+COMPANIES = ["Reliance", "TCS", "Infosys", "HDFC Bank", "ICICI Bank", "Tata Motors", "Wipro", "ITC",
+             "Adani Ports", "Bajaj Finance", "Maruti", "Sun Pharma", "L&T", "Axis Bank", "SBI"]
+TEMPLATES = [
+    "{c} shares surged after Q{q} profit beat estimates",
+    "{c} slumps {p}% as analysts downgrade the stock",
+    "{c} announces acquisition of a mid-size rival for Rs {n} crore",
+    "Brokerages upgrade {c}, see {p}% upside on strong growth",
+    "{c} faces investigation over accounting lapses; shares crash",
+    "Markets close at record high led by {c} and banking stocks",
+    "{c} posts quarterly loss; debt concerns weigh on sentiment",
+    "Sell {c}, says brokerage, citing weak margins and rising debt",
+    "{c} to raise Rs {n} crore via rights issue next week",
+    "Nifty ends flat as {c} gains offset IT weakness",
+    "{c} shares drop {p}% after missing revenue guidance",
+    "Bullish outlook for {c} as order book hits record levels",
+]
+
+
+def synthetic_headlines(n, unique=0.2, seed=7):
+    """
+    n headlines of which about unique * n are distinct (news pages repeat most
+    headlines from one scrape to the next).
+    """
+    rng = random.Random(seed)
+    pool = [rng.choice(TEMPLATES).format(c=rng.choice(COMPANIES), q=rng.randint(1, 4),
+                                         p=rng.randint(1, 15), n=rng.randint(100, 9000))
+            + f" ({i})" for i in range(max(1, int(n * unique)))]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def baseline_score(text):
+    text_lower = text.lower()
+    keywords = dict(DEFAULT_KEYWORDS)
+    score = 0.0
+    for word, val in keywords.items():
+        if word in text_lower:
+            score += val
+    blob_score = TextBlob(text).sentiment.polarity
+    return max(-1.0, min(1.0, score * 0.7 + blob_score * 0.3))
+
+
+def synthetic_universe(n, seed=5):
+    """
+    {instrument_key: company name}: the headline companies plus generated names.
+    """
+    rng = random.Random(seed)
+    parts = ["Alpha", "Bharat", "Coastal", "Deccan", "Eastern", "Federal", "Global", "Hind", "Indo", "Jyoti",
+             "Kaveri", "Lotus", "Metro", "Nova", "Orient", "Prime", "Royal", "Surya", "Trident", "Vikas"]
+    kinds = ["Industries", "Finance", "Pharma", "Motors", "Power", "Steel", "Textiles", "Chemicals", "Infra", "Foods"]
+    names = {f"NSE_EQ|INE{i:06d}01018": c + " Ltd" for i, c in enumerate(COMPANIES)}
+    while len(names) < n:
+        name = f"{rng.choice(parts)} {rng.choice(parts)} {rng.choice(kinds)} Ltd"
+        names[f"NSE_EQ|INE{len(names):06d}01018"] = name
+    return names
+
+
+def timed(label, fn, headlines):
+    start = time.perf_counter()
+    for h in headlines:
+        fn(h)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(headlines) / elapsed:>12,.0f} headlines/sec  {elapsed / len(headlines) * 1e6:>9.2f} us/headline")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headlines", type=int, default=10_000)
+    parser.add_argument("--unique", type=float, default=0.2, help="Fraction of distinct headlines")
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--universe", type=int, default=2000, help="Instruments in the alias index")
+    args = parser.parse_args()
+
+    headlines = synthetic_headlines(args.headlines, args.unique)
+    print(f"{len(headlines)} headlines, {len(set(headlines))} distinct")
+
+    # Keyword pass alone: dict rebuild + substring scan vs one compiled regex
+    scorer = KeywordScorer()
+    def substring(text):
+        text_lower = text.lower()
+        return sum(v for k, v in dict(DEFAULT_KEYWORDS).items() if k in text_lower)
+    timed("substring", substring, headlines)
+    timed("compiled", scorer.score, headlines)
+
+    # Full analyze_sentiment
+    base = timed("baseline", baseline_score, headlines)
+    brain = IntelligenceModule(cache_size=args.cache_size)
+    cold = timed("cold", brain.analyze_sentiment, headlines)
+    warm = timed("warm", brain.analyze_sentiment, headlines)
+    print(f"speedup: cold {base / cold:.1f}x  warm {base / warm:.1f}x  cache {brain.score_cache.stats()}")
+
+    # Instrument tagging
+    names = synthetic_universe(args.universe)
+    aliases = AliasIndex.for_universe(names, names)
+    lowered = [(key, " " + name.lower().replace(" ltd", "") + " ") for key, name in names.items()]
+    def naive(text):
+        text = " " + text.lower() + " "
+        return {key for key, name in lowered if name in text}
+    print(f"{len(names)} instruments, {len(aliases)} aliases")
+    n = timed("naive", naive, headlines)
+    a = timed("alias", aliases.match, headlines)
+    index = SentimentIndex()
+    timed("index", lambda h: index.add(0.5, aliases.match(h), 0.0), headlines)
+    print(f"speedup: {n / a:.1f}x  tagged {sum(bool(aliases.match(h)) for h in headlines)}/{len(headlines)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Sharded ingestion scaling test against the local fake feed.
+
+Starts fake feed server processes sharing one port and a mock order API,
+then runs the ShardCoordinator with 1, 2, 4... shards over the same
+universe and reports the ticks/sec the shards decode, aggregate into
+candles and risk-check. The feed offers more than one process can take,
+so throughput should grow with shards up to the number of cores.
+
+    python benchmarks/bench_sharding.py --symbols 500 --shards 1 2 4 --seconds 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mock_feed import serve_forever
+from mock_upstox import MockUpstoxServer
+from order_gateway import OrderGateway
+from order_scheduler import OrderScheduler, PRIORITY_ENTRY
+from sharding import ShardCoordinator
+
+
+class GatewayOrders:
+    """
+    Minimal UpstoxHandler stand-in: scheduler + gateway against the mock API.
+    """
+    def __init__(self, gateway):
+        self.scheduler = OrderScheduler(gateway.place_order)
+
+    async def place_order_async(self, symbol, side, quantity, priority=PRIORITY_ENTRY, **kwargs):
+        return await self.scheduler.submit(priority, symbol=symbol, side=side, quantity=quantity, **kwargs)
+
+
+class FixedSentiment:
+    def __init__(self, market):
+        self.sentiment_cache = {"market": market}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def measure(config, orders, shards, warmup, seconds):
+    coordinator = ShardCoordinator(config, orders, FixedSentiment(0.5), shards=shards)
+    task = asyncio.create_task(coordinator.run())
+    # Wait for every shard to report (process start-up, imports, subscription)
+    deadline = time.monotonic() + 60
+    while len(coordinator.shard_stats) < len(coordinator.shards) and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+    await asyncio.sleep(warmup)
+    start_ticks, start = coordinator.stats()["ticks"], time.monotonic()
+    await asyncio.sleep(seconds)
+    stats = coordinator.stats()
+    elapsed = time.monotonic() - start
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return (stats["ticks"] - start_ticks) / elapsed, stats
+
+
+async def run(args):
+    port = free_port()
+    feeds = [multiprocessing.Process(target=serve_forever, daemon=True,
+                                     args=(port, args.frame_rate, args.ticks_per_frame, 64, True, i + 1))
+             for i in range(args.feed_processes)]
+    for p in feeds:
+        p.start()
+    api = MockUpstoxServer()
+    await api.start()
+    gateway = OrderGateway({"ACCESS_TOKEN": "bench-token", "UPSTOX_API_URL": api.base_url,
+                            "UPSTOX_HFT_URL": api.base_url})
+    await gateway.start()
+    config = {
+        "ACCESS_TOKEN": "bench-token",
+        "UPSTOX_FEED_URL": f"ws://127.0.0.1:{port}/",
+        "TRADING_SYMBOL_LIST": [f"NSE_EQ|INE{i:06d}01018" for i in range(args.symbols)],
+        "RISK_MAX_OPEN_POSITIONS": 20,
+    }
+    await asyncio.sleep(1.0)  # Let the feed processes bind
+    print(f"{args.symbols} symbols, {os.cpu_count()} cores, feed offers "
+          f"{args.frame_rate * args.ticks_per_frame:,.0f} ticks/sec per connection")
+    try:
+        base = None
+        for shards in args.shards:
+            rate, stats = await measure(config, GatewayOrders(gateway), shards, args.warmup, args.seconds)
+            base = base or rate
+            per_shard = " ".join(f"{s['ticks']}" for _, s in sorted(stats["per_shard"].items()))
+            print(f"shards {shards:>2}: {rate:>10,.0f} ticks/sec  ({rate / base:.2f}x)  ticks per shard: {per_shard}  "
+                  f"open positions {stats['open_positions']}  entries refused {stats['denied_entries']}")
+    finally:
+        await gateway.close()
+        await api.stop()
+        for p in feeds:
+            p.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--frame-rate", type=float, default=500.0, help="Feed frames/sec per connection")
+    parser.add_argument("--ticks-per-frame", type=int, default=100)
+    parser.add_argument("--feed-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
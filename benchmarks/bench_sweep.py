@@ -0,0 +1,147 @@
+"""
+Parameter sweep over months of synthetic 1-min candles.
+
+First checks the sweep against the live code paths on a few symbols: the
+vectorized indicators against an IndicatorState fold, and the vectorized
+entries / exits against a bar-by-bar loop (one position per symbol, the
+same stop / target / time-stop / session-end rules). Then times the grid
+in-process and over a process pool with shared-memory inputs.
+
+    python benchmarks/bench_sweep.py --symbols 50 --sessions 60 --workers 4
+"""
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from replay import synthetic_candles
+from streaming_indicators import IndicatorState, session_day
+import sweep
+
+
+def reference(candles, params, settings, min_bars):
+    """
+    Bar-by-bar: indicators from IndicatorState, entries at the close, exits
+    checked on each following bar. Returns (trades, pnl).
+    """
+    p = dict(zip(sweep.PARAMS, params))
+    stop_bars = math.ceil(p["time_stop_minutes"] * 60_000 / settings["interval_ms"])
+    slip, side = settings["slippage"], (1 if settings["sentiment"] > 0 else -1)
+    trades, total = 0, 0.0
+    for bars in candles.values():
+        state = IndicatorState(p["rsi_period"], p["atr_period"], p["vol_ma_period"])
+        days = session_day(bars["ts"])
+        n, pos = len(days), None
+        for i in range(n):
+            o, h, l, c, v = (float(bars[k][i]) for k in ("open", "high", "low", "close", "volume"))
+            last = i == n - 1 or days[i + 1] != days[i]
+            if pos:
+                entry, stop, target, tight, at = pos
+                lower = tight if i - at > stop_bars else stop
+                if side < 0:  # Mirror the bar: the short's stop is above, its target below
+                    o, h, l, c, lower, target = -o, -l, -h, -c, -lower, -target
+                exit_px = None
+                if o <= lower or o >= target:
+                    exit_px = o
+                elif l <= lower and (h < target or c >= o):
+                    exit_px = lower
+                elif h >= target:
+                    exit_px = target
+                elif last:
+                    exit_px = c
+                if side < 0:
+                    o, h, l, c = -o, -l, -h, -c
+                    exit_px = -exit_px if exit_px is not None else None
+                if exit_px is not None:
+                    fill = entry * (1 + slip * side)
+                    total += (exit_px * (1 - slip * side) - fill) * side
+                    trades += 1
+                    pos = None
+            state.update(int(bars["ts"][i]), o, h, l, c, v)
+            if pos or last or state.bars < min_bars or math.isnan(state.atr):
+                continue
+            if not v > state.vol_sma * p["vol_surge_mult"]:
+                continue
+            if side > 0 and c > state.vwap and p["rsi_low"] < state.rsi < p["rsi_high"]:
+                stop = c - p["sl_atr_mult"] * state.atr
+                pos = (c, stop, c + p["tgt_atr_mult"] * state.atr, max(stop, c * (1 + p["time_stop_min_profit"])), i)
+            elif side < 0 and c < state.vwap and state.rsi < p["rsi_low"]:
+                stop = c + p["sl_atr_mult"] * state.atr
+                pos = (c, stop, c - p["tgt_atr_mult"] * state.atr, min(stop, c * (1 - p["time_stop_min_profit"])), i)
+    return trades, total
+
+
+def check(args, defaults, min_bars, min_sentiment):
+    candles = synthetic_candles(args.check_symbols, sessions=3, seed=args.seed + 1)
+    params = dict(defaults, sl_atr_mult=1.0, tgt_atr_mult=1.5)
+    grid = {name: [value] for name, value in params.items()}
+    data = sweep.build_inputs(candles, grid, min_bars)
+
+    bars = candles[next(iter(candles))]
+    n = len(bars["ts"])
+    state = IndicatorState(params["rsi_period"], params["atr_period"], params["vol_ma_period"])
+    streamed = {"rsi": [], "atr": [], "vol_sma": [], "vwap": []}
+    for i in range(n):
+        state.update(int(bars["ts"][i]), *(float(bars[k][i]) for k in ("open", "high", "low", "close", "volume")))
+        for name in streamed:
+            streamed[name].append(getattr(state, name))
+    columns = {"rsi": f"rsi_{params['rsi_period']}", "atr": f"atr_{params['atr_period']}",
+               "vol_sma": f"vol_sma_{params['vol_ma_period']}", "vwap": "vwap"}
+    diffs = {name: float(np.nanmax(np.abs(np.array(streamed[name]) - data[col][:n])))
+             for name, col in columns.items()}
+    same_nan = all((np.isnan(streamed[name]) == np.isnan(data[col][:n])).all() for name, col in columns.items())
+    print(f"indicators vs IndicatorState ({n} bars): max abs diff {diffs}, NaN warm-up identical: {same_nan}")
+
+    for sentiment in (0.5, -0.5):
+        settings = {"sentiment": sentiment, "min_sentiment": min_sentiment, "slippage": args.slippage_bps / 10_000,
+                    "interval_ms": 60_000}
+        values = tuple(params[name] for name in sweep.PARAMS)
+        longs, shorts = sweep.entries(data, values[:len(sweep.ENTRY_PARAMS)], settings)
+        metrics = dict(zip(sweep.METRICS, sweep.evaluate(data, longs, shorts, values[len(sweep.ENTRY_PARAMS):],
+                                                         settings)))
+        trades, pnl = reference(candles, values, settings, min_bars)
+        print(f"{'longs ' if sentiment > 0 else 'shorts'} vs bar-by-bar loop: trades {metrics['trades']} / {trades}, "
+              f"pnl {metrics['pnl']:.2f} / {pnl:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--check-symbols", type=int, default=5)
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    defaults, min_bars, min_sentiment = sweep.strategy_defaults()
+    check(args, defaults, min_bars, min_sentiment)
+
+    candles = synthetic_candles(args.symbols, sessions=args.sessions, seed=args.seed)
+    bars = sum(len(c["ts"]) for c in candles.values())
+    grid = {"rsi_period": [10, 14], "vol_surge_mult": [1.5, 2.0, 2.5], "rsi_low": [45, 50, 55],
+            "atr_period": [10, 14], "sl_atr_mult": [1.0, 1.5, 2.0], "tgt_atr_mult": [2.0, 3.0],
+            "time_stop_minutes": [5, 15]}
+    combos = math.prod(len(v) for v in grid.values())
+    print(f"{combos} combinations x {bars} bars ({args.symbols} symbols x {args.sessions} sessions)")
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        results = sweep.sweep(candles, grid, workers, slippage_bps=args.slippage_bps, min_bars=min_bars,
+                              min_sentiment=min_sentiment)
+        took = time.perf_counter() - start
+        print(f"  {workers} worker(s): {took:6.2f}s  ({took / combos * 1000:.1f} ms per combination, "
+              f"{bars * combos / took / 1e6:.0f}M bar-evaluations/s)")
+    best = sweep.rank(results, "return_pct", 10)
+    print(sweep.format_table(best, 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Startup candle warm-up: fetching from the (mock) Upstox historical API
+into an empty cache, then a restart with the past sessions cached (only
+today is fetched), then a cache-only load (what sharded workers do), and
+seeding the candle buffers and indicator state from the result.
+
+    python benchmarks/bench_warmup.py --symbols 500 --days 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mock_upstox import MockUpstoxServer
+from order_gateway import OrderGateway
+from history import CandleCache, HistoryWarmup, UpstoxHistorySource, seed
+from candles import CandleAggregator
+from strategy import GodfatherStrategy
+from synthetic import instrument_keys
+
+
+class NoOrders:
+    async def place_order_async(self, symbol, side, quantity, **kwargs):
+        return None
+
+
+class FixedSentiment:
+    sentiment_cache = {"market": 0.0}
+
+
+async def run(args):
+    # Mid-session (12:30 IST on a Wednesday), so today has bars too
+    clock = (lambda: 1_700_031_600.0) if args.midday else time.time
+    server = MockUpstoxServer(latency=args.latency, clock=clock)
+    await server.start()
+    gateway = OrderGateway({"ACCESS_TOKEN": "bench", "UPSTOX_API_URL": server.base_url,
+                            "UPSTOX_HFT_URL": server.base_url}, pool_size=args.concurrency)
+    source = UpstoxHistorySource(gateway)
+    symbols = instrument_keys(args.symbols)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CandleCache(tmp)
+        for label, src in (("cold cache", source), ("warm cache", source), ("cache only", None)):
+            warmup = HistoryWarmup(cache, src, days=args.days, daily_days=args.daily_days,
+                                   concurrency=args.concurrency, clock=clock)
+            requests = server.requests
+            start = time.perf_counter()
+            intraday, daily = await warmup.load(symbols)
+            took = time.perf_counter() - start
+            bars = sum(len(b["ts"]) for b in intraday.values())
+            print(f"{label:<11} {took:7.2f} s  {server.requests - requests:5d} requests  "
+                  f"{bars} intraday / {sum(len(b['ts']) for b in daily.values())} daily bars")
+
+        strategy = GodfatherStrategy(NoOrders(), FixedSentiment(), {"TRADING_SYMBOL_LIST": symbols})
+        candles = CandleAggregator(strategy.timeframe, symbols, on_close=strategy.on_bar_close)
+        start = time.perf_counter()
+        seed(candles, strategy, intraday)
+        took = time.perf_counter() - start
+        ready = sum(state.bars >= strategy.min_bars for state in strategy.indicators.values())
+        print(f"seed        {took:7.2f} s  {ready}/{len(symbols)} symbols past min_bars")
+
+        # Seeded state matches folding the same bars one at a time
+        symbol = symbols[0]
+        check = GodfatherStrategy(NoOrders(), FixedSentiment(), {"TRADING_SYMBOL_LIST": [symbol]})
+        cols = candles.buffers[symbol].arrays()
+        for bar in zip(*(cols[k].tolist() for k in ("ts", "open", "high", "low", "close", "volume"))):
+            await check.on_bar(symbol, bar)
+        a, b = check.indicators[symbol], strategy.indicators[symbol]
+        assert (a.bars, a.close, a.rsi, a.atr, a.vwap) == (b.bars, b.close, b.rsi, b.atr, b.vwap)
+
+    await gateway.close()
+    await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--daily-days", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock API latency per request (s)")
+    parser.add_argument("--now", dest="midday", action="store_false",
+                        help="Use the wall clock instead of a fixed mid-session time")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
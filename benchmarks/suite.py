@@ -0,0 +1,305 @@
+"""
+Hot-path benchmark suite.
+
+Times the bot's per-tick and per-bar paths on SyntheticMarket data at
+several universe sizes and writes the results as JSON, so a change can be
+compared against the numbers of an earlier commit:
+
+    python benchmarks/suite.py                                  # -> benchmarks/results/<commit>.json
+    python benchmarks/suite.py --symbols 1 50 --quick
+    python benchmarks/suite.py --compare benchmarks/results/abc1234.json --threshold 0.15 --fail-on-regression
+
+Cases (value = best of --repeat runs, lower is better):
+  feed_decode                     FeedDecoder.decode, us per tick
+  candles.on_ticks                CandleAggregator fold, us per tick
+  strategy.on_tick                on_tick -> manage_risk with every symbol in a position, us per tick
+  strategy.on_ticks               batched risk / mark-to-market per frame, us per tick
+  strategy.on_candle.cold         on_candle with a full session of bars, us per symbol
+  strategy.on_candle.incremental  on_candle with one new bar, us per symbol
+  strategy.on_bar_close           batched indicators + signals for the universe, us per bar close
+  indicators.<name>               TechnicalIndicators over a session of bars, us per symbol
+  intelligence.analyze_sentiment  cold / warm cache, us per headline (universe independent)
+"""
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import SyntheticMarket
+from feed_decoder import FeedDecoder
+from candles import CandleAggregator
+from strategy import GodfatherStrategy
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SESSION_BARS = 375
+
+
+class AcceptOrders:
+    """
+    UpstoxHandler stand-in that fills every order instantly.
+    """
+    def __init__(self):
+        self.orders = 0
+
+    async def place_order_async(self, symbol, side, quantity, **kwargs):
+        self.orders += 1
+        return f"bench-{self.orders}"
+
+
+class FixedSentiment:
+    def __init__(self, market=0.0):
+        self.sentiment_cache = {"market": market}
+
+
+def best_of(fn, repeat):
+    """
+    Best wall time of fn() over 'repeat' runs, seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def best_of_async(loop, coro_fn, repeat):
+    """
+    best_of for a coroutine function, timed inside the loop (excludes
+    run_until_complete overhead).
+    """
+    async def timed():
+        start = time.perf_counter()
+        await coro_fn()
+        return time.perf_counter() - start
+    return min(loop.run_until_complete(timed()) for _ in range(repeat))
+
+
+def new_strategy(symbols):
+    return GodfatherStrategy(AcceptOrders(), FixedSentiment(), {"TRADING_SYMBOL_LIST": symbols})
+
+
+def bench_feed(market, n_frames, repeat):
+    frames = market.encoded_frames(n_frames)
+    decoder = FeedDecoder()
+    decoder.decode(frames[0])
+    ticks = sum(len(decoder.decode(f)) for f in frames)
+    t = best_of(lambda: [decoder.decode(f) for f in frames], repeat)
+    return {"feed_decode": t / ticks * 1e6}
+
+
+def bench_ticks(market, n_frames, repeat, loop):
+    symbols = market.symbols
+    frames = market.tick_frames(n_frames)
+    ticks = sum(len(f) for f in frames)
+    out = {}
+
+    async def fold():
+        candles = CandleAggregator("1min", symbols)
+        for frame in frames:
+            await candles.on_ticks(frame)
+    out["candles.on_ticks"] = best_of_async(loop, fold, repeat) / ticks * 1e6
+
+    # Every symbol in a position with bands wide enough that no tick exits
+    strategy = new_strategy(symbols)
+    for tick in frames[0]:
+        loop.run_until_complete(strategy.execute_trade(tick.symbol, "BUY", tick.ltp, tick.ltp))
+    flat = [tick for frame in frames for tick in frame]
+
+    async def per_tick():
+        for tick in flat:
+            await strategy.on_tick(tick)
+    out["strategy.on_tick"] = best_of_async(loop, per_tick, repeat) / ticks * 1e6
+
+    async def per_frame():
+        for frame in frames:
+            await strategy.on_ticks(frame)
+    out["strategy.on_ticks"] = best_of_async(loop, per_frame, repeat) / ticks * 1e6
+    return out
+
+
+def bench_candles(market, repeat, loop):
+    symbols = market.symbols
+    frames = market.candles(SESSION_BARS + 1)
+    history = {symbol: df.iloc[:-1] for symbol, df in frames.items()}
+    out = {}
+
+    warm = new_strategy(symbols)
+    async def cold():
+        strategy = new_strategy(symbols)
+        for symbol, df in history.items():
+            await strategy.on_candle(symbol, df)
+        warm.indicators = strategy.indicators
+    out["strategy.on_candle.cold"] = best_of_async(loop, cold, repeat) / len(symbols) * 1e6
+
+    # One more bar on top of the folded history (states are copied so every run sees the same input)
+    async def incremental():
+        for symbol, df in frames.items():
+            await strategy.on_candle(symbol, df)
+    times = []
+    for _ in range(repeat):
+        strategy = new_strategy(symbols)
+        strategy.indicators = copy.deepcopy(warm.indicators)
+        times.append(best_of_async(loop, incremental, 1))
+    out["strategy.on_candle.incremental"] = min(times) / len(symbols) * 1e6
+
+    # Batched bar close: each run closes the next bar of the session
+    strategy = new_strategy(symbols)
+    columns = {s: (df.index.tz_localize("Asia/Kolkata").as_unit("ms").asi8.tolist(), df["open"].tolist(),
+                   df["high"].tolist(), df["low"].tolist(), df["close"].tolist(), df["volume"].tolist())
+               for s, df in frames.items()}
+    def bar(i):
+        return [(s, tuple(col[i] for col in cols)) for s, cols in columns.items()]
+    for i in range(SESSION_BARS - repeat):
+        loop.run_until_complete(strategy.on_bar_close(columns[symbols[0]][0][i], bar(i)))
+    times = []
+    for i in range(SESSION_BARS - repeat, SESSION_BARS):
+        bars = bar(i)
+        times.append(best_of_async(loop, lambda: strategy.on_bar_close(columns[symbols[0]][0][i], bars), 1))
+    out["strategy.on_bar_close"] = min(times) * 1e6
+
+    try:
+        from indicators import TechnicalIndicators
+    except ImportError as e:
+        print(f"indicators.* skipped ({e})")
+        return out
+    calls = {
+        "vwap": TechnicalIndicators.calculate_vwap,
+        "atr": lambda df: TechnicalIndicators.calculate_atr(df, 14),
+        "rsi": lambda df: TechnicalIndicators.calculate_rsi(df, 14),
+        "sma_volume": lambda df: TechnicalIndicators.calculate_sma_volume(df, 20),
+    }
+    for name, fn in calls.items():
+        t = best_of(lambda: [fn(df) for df in history.values()], repeat)
+        out[f"indicators.{name}"] = t / len(symbols) * 1e6
+    return out
+
+
+def bench_sentiment(n_headlines, repeat):
+    from bench_sentiment import synthetic_headlines
+    from intelligence import IntelligenceModule
+    headlines = synthetic_headlines(n_headlines)
+    cold = float("inf")
+    for _ in range(repeat):
+        brain = IntelligenceModule(workers=0)
+        start = time.perf_counter()
+        for h in headlines:
+            brain.analyze_sentiment(h)
+        cold = min(cold, time.perf_counter() - start)
+    warm = best_of(lambda: [brain.analyze_sentiment(h) for h in headlines], repeat)
+    return {"intelligence.analyze_sentiment.cold": cold / len(headlines) * 1e6,
+            "intelligence.analyze_sentiment.warm": warm / len(headlines) * 1e6}
+
+
+def git_commit():
+    try:
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    loop = asyncio.new_event_loop()
+    results = []
+    def add(values, symbols):
+        for name, value in values.items():
+            results.append({"name": name, "symbols": symbols, "unit": "us", "value": round(value, 4)})
+            label = f"{name} [{symbols}]" if symbols else name
+            print(f"{label:<44} {value:>12.3f} us")
+
+    for n in args.symbols:
+        market = SyntheticMarket(n, seed=args.seed)
+        frames = max(20, args.ticks // n)
+        add(bench_feed(market, frames, args.repeat), n)
+        add(bench_ticks(market, frames, args.repeat, loop), n)
+        add(bench_candles(market, args.repeat, loop), n)
+    add(bench_sentiment(args.headlines, args.repeat), None)
+    loop.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline_path, threshold):
+    """
+    Print the change against a previous report; returns the regressed cases.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r["name"], r["symbols"]): r["value"] for r in baseline["results"]}
+    print(f"\nvs {baseline['meta']['commit']} ({baseline_path}):")
+    regressed = []
+    for r in report["results"]:
+        key = (r["name"], r["symbols"])
+        if key not in old or not old[key]:
+            continue
+        change = r["value"] / old[key] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(key)
+        elif change < -threshold:
+            flag = "  faster"
+        label = f"{r['name']} [{r['symbols']}]" if r["symbols"] else r["name"]
+        print(f"{label:<44} {old[key]:>12.3f} -> {r['value']:>12.3f} us  {change:+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--ticks", type=int, default=20_000, help="Ticks per tick-path case")
+    parser.add_argument("--headlines", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="Fewer ticks / headlines / repeats")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any case regressed")
+    args = parser.parse_args()
+    if args.quick:
+        args.ticks, args.headlines, args.repeat = 2_000, 300, 2
+    logging.basicConfig(level=logging.WARNING)
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        regressed = compare(report, args.compare, args.threshold)
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Synthetic market data for the benchmarks.
+
+SyntheticMarket produces per-instrument random-walk prices with volume
+bursts, as Tick frames (what MarketDataStreamer hands to the tick handlers),
+encoded V2 FeedResponse frames (what arrives on the WebSocket) and 1-min
+OHLCV candle frames (what the strategy's DataFrame entry point takes).
+Everything is seeded, so two runs (or two commits) see the same data.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from feed_decoder import Tick, encode_feed_response
+
+SESSION_START_MS = 1_700_019_900_000  # 09:15 IST
+
+
+def instrument_keys(n):
+    return [f"NSE_EQ|INE{i:06d}01018" for i in range(n)]
+
+
+class SyntheticMarket:
+    """
+    n_symbols instruments starting between 100 and 3000. Each step moves
+    every price by a gaussian return of 'volatility'; with probability
+    'burst_prob' an instrument trades 3-8x its usual volume that step.
+    """
+    def __init__(self, n_symbols, seed=0, volatility=0.0005, burst_prob=0.02, start_ms=SESSION_START_MS):
+        self.symbols = instrument_keys(n_symbols)
+        self.rng = np.random.default_rng(seed)
+        self.volatility = volatility
+        self.burst_prob = burst_prob
+        self.start_ms = start_ms
+        self.prices = self.rng.uniform(100, 3000, n_symbols)
+
+    def _volumes(self, shape, low, high):
+        volume = self.rng.integers(low, high, shape).astype(float)
+        burst = self.rng.random(shape) < self.burst_prob
+        volume[burst] *= self.rng.uniform(3, 8, burst.sum())
+        return volume
+
+    def tick_frames(self, n_frames, ticks_per_frame=None, interval_ms=250):
+        """
+        n_frames lists of Ticks; each frame carries 'ticks_per_frame'
+        instruments (default: all of them), rotating through the universe.
+        """
+        n = len(self.symbols)
+        per_frame = min(ticks_per_frame or n, n)
+        vtt = np.zeros(n)
+        frames = []
+        cursor = 0
+        for f in range(n_frames):
+            idx = (cursor + np.arange(per_frame)) % n
+            cursor = (cursor + per_frame) % n
+            self.prices[idx] *= np.exp(self.rng.normal(0, self.volatility, per_frame))
+            qty = self._volumes(per_frame, 1, 500)
+            vtt[idx] += qty
+            ltt = self.start_ms + f * interval_ms
+            ltp = np.round(self.prices[idx], 2).tolist()
+            frames.append([Tick(self.symbols[i], ltp=p, ltt=ltt, ltq=int(q), cp=p * 0.99, vtt=int(v), oi=0.0, atp=p)
+                           for i, p, q, v in zip(idx.tolist(), ltp, qty.tolist(), vtt[idx].tolist())])
+        return frames
+
+    def encoded_frames(self, n_frames, ticks_per_frame=None, mode="full"):
+        return [encode_feed_response(ticks, mode=mode) for ticks in self.tick_frames(n_frames, ticks_per_frame)]
+
+    def candles(self, n_bars):
+        """
+        {symbol: 1-min OHLCV DataFrame} with a naive session-local
+        DatetimeIndex, as CandleBuffer.to_frame produces.
+        """
+        ts = self.start_ms + np.arange(n_bars, dtype=np.int64) * 60_000
+        index = pd.to_datetime(ts, unit="ms", utc=True).tz_convert("Asia/Kolkata").tz_localize(None)
+        out = {}
+        for i, symbol in enumerate(self.symbols):
+            close = self.prices[i] * np.exp(np.cumsum(self.rng.normal(0, self.volatility * 2, n_bars)))
+            spread = close * self.rng.uniform(0.0002, 0.002, n_bars)
+            high = close + spread * self.rng.random(n_bars)
+            low = close - spread * self.rng.random(n_bars)
+            open_ = low + (high - low) * self.rng.random(n_bars)
+            out[symbol] = pd.DataFrame({"open": open_, "high": high, "low": low, "close": close,
+                                        "volume": self._volumes(n_bars, 1_000, 20_000)}, index=index)
+        return out
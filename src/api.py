@@ -1,8 +1,8 @@
 import logging
 from fastapi import FastAPI, WebSocket
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-import json
 from contextlib import asynccontextmanager
 
 # Import Bot Components
@@ -10,7 +10,15 @@ from config import load_config
 from upstox_client import UpstoxHandler
 from market_data import MarketDataStreamer
 from intelligence import IntelligenceModule
+from sentiment_index import AliasIndex
+from instruments import resolve_universe
+from history import HistoryWarmup, UpstoxHistorySource, seed
+from resync import StateResync
 from strategy import GodfatherStrategy
+from candles import CandleAggregator
+from tick_journal import TickJournal
+from broadcast import BroadcastHub
+from latency import LATENCY
 
 logger = logging.getLogger("API")
 
@@ -20,6 +28,9 @@ bot_state = {
     "brain": None,
     "strategy": None,
     "market_data": None,
+    "candles": None,
+    "resync": None,
+    "journal": None,
     "running": False
 }
 
@@ -28,31 +39,74 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting HFT Bot API...")
     config = load_config()
+    LATENCY.enabled = config["LATENCY_STATS"]
+    instruments = resolve_universe(config)
     
-    bot_state["upstox"] = UpstoxHandler(config)
-    bot_state["brain"] = IntelligenceModule()
+    bot_state["upstox"] = UpstoxHandler(config, instruments)
+    bot_state["brain"] = IntelligenceModule(
+        config.get("SENTIMENT_LEXICON"),
+        aliases=AliasIndex.for_universe(config["TRADING_SYMBOL_LIST"],
+                                        names=instruments.names(config["TRADING_SYMBOL_LIST"]) if instruments else None,
+                                        alias_path=config.get("SENTIMENT_ALIASES")),
+        half_life=config["SENTIMENT_HALF_LIFE"],
+    )
     bot_state["market_data"] = MarketDataStreamer(config)
     
-    # Check Auth
-    if bot_state["upstox"].validate_session():
+    bot_state["strategy"] = GodfatherStrategy(
+        bot_state["upstox"], 
+        bot_state["brain"], 
+        config
+    )
+    bot_state["candles"] = CandleAggregator(
+        bot_state["strategy"].timeframe,
+        config["TRADING_SYMBOL_LIST"],
+        on_close=bot_state["strategy"].on_bar_close
+    )
+    # Hook Data
+    bot_state["market_data"].tick_handlers.append(bot_state["candles"].on_ticks)
+    bot_state["market_data"].latest_handlers.append(bot_state["strategy"].on_ticks)
+    bot_state["strategy"].change_handlers.append(lambda event, symbol: hub.notify())
+    bot_state["strategy"].change_handlers.append(bot_state["market_data"].subscriptions.on_change)
+    bot_state["market_data"].latest_handlers.append(notify_marks)
+    bot_state["market_data"].gap_handlers += [bot_state["candles"].mark_gap, bot_state["strategy"].on_gap]
+    bot_state["resync"] = StateResync.from_config(config, bot_state["upstox"].gateway, bot_state["strategy"])
+    bot_state["market_data"].disconnect_handlers.append(bot_state["resync"].on_disconnect)
+    bot_state["market_data"].connect_handlers.append(bot_state["resync"].on_connect)
+    if config.get("JOURNAL_DIR"):
+        bot_state["journal"] = TickJournal(config["JOURNAL_DIR"])
+        bot_state["journal"].start()
+        bot_state["market_data"].frame_handlers.append(bot_state["journal"].record_frame)
+        bot_state["market_data"].tick_handlers.append(bot_state["journal"].on_ticks)
+
+    # Connect the feed while the session is checked
+    feed = asyncio.create_task(bot_state["market_data"].connect())
+    if await bot_state["upstox"].validate_session_async():
         logger.info("Auth Valid.")
-        bot_state["strategy"] = GodfatherStrategy(
-            bot_state["upstox"], 
-            bot_state["brain"], 
-            config
-        )
-        # Hook Data
-        bot_state["market_data"].on_message = bot_state["strategy"].on_tick
-        
+        warmup = HistoryWarmup.from_config(config, UpstoxHistorySource(bot_state["upstox"].gateway),
+                                           bot_state["strategy"].timeframe)
+        if warmup:
+            intraday, _ = await warmup.load(config["TRADING_SYMBOL_LIST"])
+            seed(bot_state["candles"], bot_state["strategy"], intraday)
         # Start Background Tasks
         asyncio.create_task(run_intelligence_loop(bot_state["brain"]))
-        asyncio.create_task(bot_state["market_data"].connect())
+        asyncio.create_task(bot_state["candles"].run())
+        asyncio.create_task(bot_state["strategy"].risk.run())
         bot_state["running"] = True
     else:
         logger.warning("Auth Invalid. Bot paused.")
+        feed.cancel()
+        if bot_state["journal"]:
+            bot_state["journal"].stop()
+            bot_state["journal"] = None
+        bot_state["strategy"] = bot_state["candles"] = bot_state["resync"] = None
         
     yield
-    # Shutdown logic if needed
+    # Shutdown
+    await bot_state["upstox"].scheduler.stop()
+    await bot_state["upstox"].gateway.close()
+    if bot_state["journal"]:
+        bot_state["journal"].stop()
+    await bot_state["brain"].close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -68,10 +122,13 @@ app.add_middleware(
 async def run_intelligence_loop(brain):
     while True:
         try:
+            published = brain.sentiment_cache
             await brain.scrape_news()
+            if brain.sentiment_cache is not published:
+                hub.notify()
         except Exception as e:
             logger.error(f"Intelligence Loop Error: {e}")
-        await asyncio.sleep(60)
+        await asyncio.sleep(max(1.0, brain.news.seconds_until_due()))
 
 @app.get("/")
 def read_root():
@@ -92,17 +149,54 @@ def get_metrics():
         "positions": strat.positions,
         "sentiment": brain.sentiment_cache.get("market", 0.0),
         "active_orders": len(strat.active_orders),
-        "pnl": 0.0 # TODO: Calculate Real PnL
+        "order_queue": bot_state["upstox"].scheduler.stats(),
+        "pnl": round(strat.pnl.equity, 2),
+        "pnl_detail": strat.pnl.stats(),
+        "halted": strat.halted,
+        "feed": bot_state["market_data"].subscriptions.stats(),
+        "dispatch": bot_state["market_data"].dispatcher.stats(),
+        "connection": bot_state["market_data"].stats(),
+        "resync": bot_state["resync"].stats(),
     }
 
+@app.get("/latency")
+def get_latency():
+    """
+    Per-stage latency percentiles (microseconds), feed frame receipt -> broker ack.
+    """
+    return {"enabled": LATENCY.enabled, "stages": LATENCY.snapshot()}
+
+@app.get("/latency/prometheus", response_class=PlainTextResponse)
+def get_latency_prometheus():
+    return LATENCY.prometheus()
+
+@app.post("/latency")
+def set_latency(enabled: bool = True, reset: bool = False):
+    """
+    Switch the instrumentation on/off at runtime; reset=true clears the histograms.
+    """
+    LATENCY.enabled = enabled
+    if reset:
+        LATENCY.reset()
+    return {"enabled": LATENCY.enabled}
+
+# One snapshot per change, serialized once, fanned out to every dashboard
+hub = BroadcastHub(get_metrics, min_interval=0.25)
+
+async def notify_marks(ticks):
+    # Open positions are re-marked on every tick; the hub rate-limits the pushes
+    if bot_state["strategy"].pnl.positions:
+        hub.notify()
+
+@app.get("/ws/stats")
+def get_ws_stats():
+    return hub.stats()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Full metrics snapshot on connect, then deltas as positions, orders and
+    sentiment change (see BroadcastHub for the message format).
+    """
     await websocket.accept()
-    try:
-        while True:
-            # Push updates every second
-            metrics = get_metrics()
-            await websocket.send_json(metrics)
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.info(f"WebSocket disconnected: {e}")
+    await hub.serve(websocket)
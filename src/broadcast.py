@@ -0,0 +1,190 @@
+import logging
+import asyncio
+import json
+from collections import deque
+
+logger = logging.getLogger("Broadcast")
+
+
+def _delta(old, new):
+    """
+    Top-level changes between two snapshots. Dict-valued fields (positions)
+    are patched per entry. Removals are listed explicitly, so a null value
+    stays a value. Returns {"changes": {key: value}, "removed": [key],
+    "patches": {key: {entry: value}}, "deletes": {key: [entry]}}, with only
+    the non-empty parts ({} if nothing changed).
+    """
+    changes, patches, deletes = {}, {}, {}
+    for key, value in new.items():
+        if key in old and value == old[key]:
+            continue
+        before = old.get(key)
+        if isinstance(value, dict) and isinstance(before, dict):
+            patch = {k: v for k, v in value.items() if k not in before or before[k] != v}
+            if patch:
+                patches[key] = patch
+            gone = [k for k in before if k not in value]
+            if gone:
+                deletes[key] = gone
+        else:
+            changes[key] = value
+    removed = [key for key in old if key not in new]
+    delta = {"changes": changes, "removed": removed, "patches": patches, "deletes": deletes}
+    return {part: value for part, value in delta.items() if value}
+
+
+class _Client:
+    __slots__ = ("websocket", "pending", "wake", "resync", "sent", "coalesced")
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending = deque()   # Serialized deltas not yet sent
+        self.wake = asyncio.Event()
+        self.resync = True       # Next message is a full snapshot
+        self.sent = 0
+        self.coalesced = 0
+
+
+class BroadcastHub:
+    """
+    Fan-out of dashboard metrics to WebSocket clients.
+
+    notify() marks the metrics dirty; at most once per 'min_interval' the hub
+    takes one snapshot, diffs it against the previous one and serializes the
+    delta once for every client. A new client gets the full snapshot first,
+    then deltas:
+
+        {"type": "snapshot", "seq": n, "data": {...}}
+        {"type": "delta", "seq": n, "changes": {key: value}, "removed": [key],
+         "patches": {key: {entry: value}}, "deletes": {key: [entry]}}
+
+    (delta parts are left out when empty).
+
+    A client more than 'max_pending' deltas behind has its backlog replaced
+    by one fresh snapshot; a client whose send blocks for 'send_timeout'
+    seconds is disconnected. Neither holds up the others.
+    """
+    def __init__(self, snapshot, min_interval=0.05, max_pending=32, send_timeout=5.0):
+        self.snapshot = snapshot  # callable() -> JSON-serializable dict (default=str)
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.clients = set()
+
+        self.seq = 0
+        self._state = {}
+        self._snapshot_text = None  # Serialized full snapshot for self.seq
+        self._flush_handle = None
+        self._last_flush = 0.0
+
+        # Stats
+        self.snapshots = 0
+        self.deltas = 0
+        self.dropped = 0
+
+    def notify(self):
+        """
+        Something the dashboard shows changed (position, order, sentiment...).
+        """
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, self._last_flush + self.min_interval - loop.time())
+            self._flush_handle = loop.call_later(delay, self._flush)
+
+    def _refresh(self):
+        """
+        Take a snapshot; returns its delta against the previous one.
+        """
+        text = json.dumps(self.snapshot(), default=str)
+        state = json.loads(text)  # Detached, JSON-typed copy to diff against next time
+        delta = _delta(self._state, state)
+        if delta or self.seq == 0:
+            self.seq += 1
+            self._state = state
+            self._snapshot_text = f'{{"type": "snapshot", "seq": {self.seq}, "data": {text}}}'
+            self.snapshots += 1
+        return delta
+
+    def _flush(self):
+        self._flush_handle = None
+        self._last_flush = asyncio.get_running_loop().time()
+        if not self.clients:
+            self._state = {}  # Nobody to diff for; the next client gets a fresh snapshot
+            self.seq = 0
+            return
+        delta = self._refresh()
+        if not delta:
+            return
+        self.deltas += 1
+        text = json.dumps({"type": "delta", "seq": self.seq, **delta}, default=str)
+        for client in self.clients:
+            if client.resync:
+                continue
+            if len(client.pending) >= self.max_pending:
+                # Too far behind: replace the backlog with one snapshot
+                client.coalesced += len(client.pending)
+                client.pending.clear()
+                client.resync = True
+            else:
+                client.pending.append(text)
+            client.wake.set()
+
+    async def serve(self, websocket):
+        """
+        Stream to one accepted WebSocket until it disconnects.
+        """
+        if self.seq == 0:
+            self._refresh()
+        client = _Client(websocket)
+        self.clients.add(client)
+        client.wake.set()
+        sender = asyncio.create_task(self._pump(client))
+        try:
+            # Clients don't send anything; receiving detects the disconnect
+            while True:
+                await websocket.receive_text()
+        except Exception:
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+
+    async def _pump(self, client):
+        try:
+            while True:
+                await client.wake.wait()
+                client.wake.clear()
+                while True:
+                    if client.resync:
+                        client.resync = False
+                        client.pending.clear()
+                        text = self._snapshot_text
+                    elif client.pending:
+                        text = client.pending.popleft()
+                    else:
+                        break
+                    await asyncio.wait_for(client.websocket.send_text(text), self.send_timeout)
+                    client.sent += 1
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning(f"Dropping dashboard client: send blocked for {self.send_timeout}s")
+            self.clients.discard(client)
+            try:
+                await client.websocket.close()
+            except Exception:
+                pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"Dashboard client disconnected: {e}")
+            self.clients.discard(client)
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "seq": self.seq,
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "coalesced": sum(c.coalesced for c in self.clients),
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,299 @@
+import logging
+import asyncio
+import time
+import numpy as np
+from latency import LATENCY, now_ns
+
+logger = logging.getLogger("Candles")
+
+SESSION_TZ = "Asia/Kolkata"
+
+
+def parse_timeframe(timeframe):
+    """
+    Convert a timeframe string ('5s', '15s', '1min', '5min') to milliseconds.
+    """
+    tf = timeframe.strip().lower()
+    if tf.endswith("min"):
+        return int(tf[:-3]) * 60_000
+    if tf.endswith("s"):
+        return int(tf[:-1]) * 1_000
+    raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+class CandleBuffer:
+    """
+    Fixed-size ring buffer of closed bars for one symbol.
+    Backed by preallocated NumPy arrays; appending never allocates.
+    """
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)  # Bar open time (epoch millis)
+        self.open = np.zeros(capacity, dtype=np.float64)
+        self.high = np.zeros(capacity, dtype=np.float64)
+        self.low = np.zeros(capacity, dtype=np.float64)
+        self.close = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.head = 0  # Next write slot
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, ts, o, h, l, c, v):
+        i = self.head
+        self.ts[i] = ts
+        self.open[i] = o
+        self.high[i] = h
+        self.low[i] = l
+        self.close[i] = c
+        self.volume[i] = v
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def load(self, ts, o, h, l, c, v):
+        """
+        Replace the contents with bar columns (oldest first); only the last
+        'capacity' bars are kept.
+        """
+        n = min(len(ts), self.capacity)
+        for name, column in zip(("ts", "open", "high", "low", "close", "volume"), (ts, o, h, l, c, v)):
+            getattr(self, name)[:n] = column[len(column) - n:]
+        self.head = n % self.capacity
+        self.count = n
+
+    def last(self):
+        """
+        Most recent closed bar as (ts, open, high, low, close, volume).
+        """
+        if not self.count:
+            return None
+        i = self.head - 1
+        return (int(self.ts[i]), float(self.open[i]), float(self.high[i]), float(self.low[i]),
+                float(self.close[i]), float(self.volume[i]))
+
+    def arrays(self):
+        """
+        Closed bars oldest-first as a dict of arrays (copies).
+        """
+        if self.count < self.capacity:
+            idx = slice(0, self.count)
+            return {name: getattr(self, name)[idx].copy() for name in ("ts", "open", "high", "low", "close", "volume")}
+        order = np.r_[self.head:self.capacity, 0:self.head]
+        return {name: getattr(self, name)[order] for name in ("ts", "open", "high", "low", "close", "volume")}
+
+    def to_frame(self):
+        """
+        Closed bars as an OHLCV DataFrame indexed by session-local bar time,
+        the shape GodfatherStrategy.on_candle expects.
+        """
+        import pandas as pd  # Deferred: the live tick/bar path never builds frames
+        cols = self.arrays()
+        index = pd.to_datetime(cols.pop("ts"), unit="ms", utc=True).tz_convert(SESSION_TZ).tz_localize(None)
+        return pd.DataFrame(cols, index=index)
+
+
+class CandleAggregator:
+    """
+    Streaming tick -> OHLCV aggregator for one timeframe.
+
+    Each tick updates the symbol's open bar in O(1). Bars close on the
+    timeframe boundary, either when a tick from the next bucket arrives or
+    when the run() timer reaches the boundary, whichever comes first. Symbols
+    that had no ticks in a bucket get a flat bar at their last close.
+    """
+    def __init__(self, timeframe="1min", symbols=None, capacity=500, on_candle=None, on_bar=None,
+                 on_close=None, clock=time.time, close_delay=0.0):
+        self.timeframe = timeframe
+        self.interval = parse_timeframe(timeframe)
+        self.capacity = capacity
+        self.on_candle = on_candle  # async callback(symbol, df_candles)
+        self.on_bar = on_bar        # async callback(symbol, (ts, open, high, low, close, volume, full))
+        self.on_close = on_close    # async callback(bar_ts, [(symbol, bar), ...]) once per boundary
+        self.clock = clock
+        self.close_delay = close_delay  # Seconds to wait past the boundary for stragglers
+
+        self.buffers = {}
+        self._open = {}       # symbol -> [open, high, low, close, volume] of the current bar
+        self._last_close = {} # symbol -> close of the last bar (for flat bars)
+        self._last_vtt = {}   # symbol -> cumulative day volume at the previous tick
+        self.bucket = None    # Open time of the current bar (epoch millis)
+        self.gaps = []        # (start, end) epoch millis of feed outages, see mark_gap()
+        self._closing = asyncio.Lock()  # The tick path and run() both close bars
+        for symbol in symbols or []:
+            self.buffers[symbol] = CandleBuffer(capacity)
+
+    def seed(self, symbol, bars):
+        """
+        Put historical bars (columns ts/open/high/low/close/volume, oldest
+        first) in front of the symbol's buffer. Bars at or after the first
+        bar already built from ticks (or the open bar) are dropped.
+        """
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            buffer = self.buffers[symbol] = CandleBuffer(self.capacity)
+        live = buffer.arrays()
+        cutoff = live["ts"][0] if buffer.count else self.bucket
+        keep = bars["ts"] < cutoff if cutoff is not None else slice(None)
+        columns = [np.concatenate((bars[name][keep], live[name]))
+                   for name in ("ts", "open", "high", "low", "close", "volume")]
+        if not len(columns[0]):
+            return
+        buffer.load(*columns)
+        if symbol not in self._last_close:
+            self._last_close[symbol] = float(columns[4][-1])
+
+    def mark_gap(self, start_ms, end_ms):
+        """
+        The feed was down from start_ms to end_ms. Bars overlapping the gap
+        are built from the ticks around it; the day-volume baselines are
+        dropped so the first full-mode tick after it doesn't book everything
+        traded during the outage to one bar.
+        """
+        self._last_vtt.clear()
+        self.gaps.append((start_ms, end_ms))
+        del self.gaps[:-100]
+        logger.warning(f"Feed gap of {(end_ms - start_ms) / 1000:.3f}s: bars from "
+                       f"{start_ms // self.interval * self.interval} to {end_ms // self.interval * self.interval} are partial")
+
+    def is_partial(self, bar_ts):
+        """
+        Whether the bar opened at bar_ts overlaps a recorded feed gap.
+        """
+        end = bar_ts + self.interval
+        return any(start < end and bar_ts <= stop for start, stop in self.gaps)
+
+    async def on_ticks(self, ticks):
+        """
+        Fold a batch of Ticks into the open bars.
+        """
+        started = now_ns()
+        interval = self.interval
+        opened = self._open
+        last_vtt = self._last_vtt
+
+        for tick in ticks:
+            ts = tick.ltt
+            if self.bucket is None:
+                self.bucket = (ts or int(self.clock() * 1000)) // interval * interval
+            elif ts >= self.bucket + interval:
+                await self.close_until(ts)
+                started = now_ns()  # Bar-close work is timed by the strategy stages
+
+            # Volume: delta of cumulative day volume in full mode (traded volume),
+            # else the last trade qty (a sample of it)
+            vtt = tick.vtt
+            if vtt:
+                prev = last_vtt.get(tick.symbol)
+                full = prev is not None and vtt >= prev
+                volume = vtt - prev if full else tick.ltq
+                last_vtt[tick.symbol] = vtt
+            else:
+                # ltpc mode has no day volume; drop the last one so a later switch to
+                # full mode doesn't book everything traded in between to one bar
+                last_vtt.pop(tick.symbol, None)
+                full = False
+                volume = tick.ltq
+
+            price = tick.ltp
+            bar = opened.get(tick.symbol)
+            if bar is None:
+                opened[tick.symbol] = [price, price, price, price, volume, full]
+            else:
+                if price > bar[1]:
+                    bar[1] = price
+                elif price < bar[2]:
+                    bar[2] = price
+                bar[3] = price
+                bar[4] += volume
+                bar[5] = bar[5] and full
+        LATENCY.record("candle", started)
+
+    async def close_until(self, ts):
+        """
+        Close every bar whose bucket ends at or before ts (epoch millis).
+        Closes are serialized: a caller that waited for another close sees
+        the bucket it advanced to, so no boundary is closed twice or skipped.
+        """
+        async with self._closing:
+            if self.bucket is None:
+                return
+            steps = (ts - self.bucket) // self.interval
+            if steps <= 0:
+                return
+            if steps > self.capacity:
+                # Session break (overnight/restart): don't pad with thousands of flat bars
+                await self._notify(*self._seal(ts // self.interval * self.interval))
+                return
+            for _ in range(steps):
+                await self._notify(*self._seal(self.bucket + self.interval))
+
+    def _seal(self, next_bucket):
+        """
+        Append the open bars (and flat bars) of the current bucket and move
+        to next_bucket, without yielding. Returns (bucket, [(symbol, bar), ...])
+        with bar = (ts, open, high, low, close, volume, full): 'full' is
+        False when any of the volume is sampled ltpc trade quantities.
+        """
+        bucket = self.bucket
+        opened = self._open
+        last_close = self._last_close
+        buffers = self.buffers
+        closed = []
+
+        for symbol, bar in opened.items():
+            buffer = buffers.get(symbol)
+            if buffer is None:
+                buffer = buffers[symbol] = CandleBuffer(self.capacity)
+            buffer.append(bucket, bar[0], bar[1], bar[2], bar[3], bar[4])
+            last_close[symbol] = bar[3]
+            closed.append((symbol, buffer.last() + (bar[5],)))
+
+        # Flat bars for symbols that traded before but not in this bucket
+        # (no trades: full mode if the symbol has a day-volume baseline)
+        for symbol, close in last_close.items():
+            if symbol not in opened:
+                buffer = buffers[symbol]
+                buffer.append(bucket, close, close, close, close, 0.0)
+                closed.append((symbol, buffer.last() + (symbol in self._last_vtt,)))
+
+        opened.clear()
+        self.bucket = next_bucket
+        return bucket, closed
+
+    async def _notify(self, bucket, closed):
+        if self.on_close and closed:
+            try:
+                await self.on_close(bucket, closed)
+            except Exception as e:
+                logger.error(f"on_close failed ({self.timeframe}): {e}")
+
+        if self.on_bar:
+            for symbol, bar in closed:
+                try:
+                    await self.on_bar(symbol, bar)
+                except Exception as e:
+                    logger.error(f"on_bar failed for {symbol} ({self.timeframe}): {e}")
+
+        if self.on_candle:
+            for symbol, _ in closed:
+                try:
+                    await self.on_candle(symbol, self.buffers[symbol].to_frame())
+                except Exception as e:
+                    logger.error(f"on_candle failed for {symbol} ({self.timeframe}): {e}")
+
+    async def run(self):
+        """
+        Close bars on the wall clock so on_candle fires at the boundary even
+        when no ticks arrive.
+        """
+        while True:
+            now = int(self.clock() * 1000)
+            if self.bucket is None:
+                self.bucket = now // self.interval * self.interval
+            boundary = self.bucket + self.interval
+            delay = (boundary - now) / 1000 + self.close_delay
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.close_until(boundary)
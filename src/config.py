@@ -12,8 +12,39 @@ def load_config():
         "UPSTOX_API_SECRET": os.getenv("UPSTOX_API_SECRET"),
         "UPSTOX_REDIRECT_URI": os.getenv("UPSTOX_REDIRECT_URI", "http://localhost:3000"),
         "ACCESS_TOKEN": os.getenv("ACCESS_TOKEN"),  # Optionally store token to reuse
-        "RISK_MAX_DAILY_LOSS": float(os.getenv("RISK_MAX_DAILY_LOSS", 2.0)), # Percentage
+        "UPSTOX_API_URL": os.getenv("UPSTOX_API_URL", "https://api.upstox.com/v2"),
+        "UPSTOX_HFT_URL": os.getenv("UPSTOX_HFT_URL", "https://api-hft.upstox.com/v2"), # Order endpoints
+        "UPSTOX_FEED_URL": os.getenv("UPSTOX_FEED_URL", "wss://api.upstox.com/v2/feed/market-data-feed"),
+        "RISK_MAX_DAILY_LOSS": float(os.getenv("RISK_MAX_DAILY_LOSS", 2.0)), # Percentage of TRADING_CAPITAL
+        "TRADING_CAPITAL": float(os.getenv("TRADING_CAPITAL", 100000)), # Session capital in INR
+        "RISK_MAX_OPEN_POSITIONS": int(os.getenv("RISK_MAX_OPEN_POSITIONS", 20)), # Across all feed shards
+        "FEED_MODE": os.getenv("FEED_MODE", "ltpc"), # Base feed mode; positions / forming signals get "full"
+        "DISPATCH_QUEUE": int(os.getenv("DISPATCH_QUEUE", 10000)), # Tick batches buffered for candle building before dropping
+        "FEED_RECONNECT_MIN": float(os.getenv("FEED_RECONNECT_MIN", 0.005)), # First reconnect backoff (seconds, jittered)
+        "FEED_RECONNECT_MAX": float(os.getenv("FEED_RECONNECT_MAX", 5.0)), # Backoff cap (seconds)
+        "FEED_STANDBY": os.getenv("FEED_STANDBY", "true").lower() in ("1", "true", "yes"), # Spare open connection, promoted on a drop
+        "FEED_PING_INTERVAL": float(os.getenv("FEED_PING_INTERVAL", 1.0)), # Dead connection noticed within 2x this
+        "RESYNC_POLL_INTERVAL": float(os.getenv("RESYNC_POLL_INTERVAL", 1.0)), # REST LTP polling for open positions while the feed is down
+        # Split TRADING_SYMBOL_LIST across this many feed connections / worker processes (1 = single process)
+        "FEED_SHARDS": int(os.getenv("FEED_SHARDS", 1)),
+        # Broker order rate limits (requests per second / minute / 30 minutes)
+        "ORDER_LIMIT_PER_SEC": int(os.getenv("ORDER_LIMIT_PER_SEC", 50)),
+        "ORDER_LIMIT_PER_MIN": int(os.getenv("ORDER_LIMIT_PER_MIN", 500)),
+        "ORDER_LIMIT_PER_30MIN": int(os.getenv("ORDER_LIMIT_PER_30MIN", 2000)),
+        # Merge identical orders queued at the same time into one broker order (both callers get its id)
+        "ORDER_COALESCE": os.getenv("ORDER_COALESCE", "false").lower() in ("1", "true", "yes"),
+        "SENTIMENT_LEXICON": os.getenv("SENTIMENT_LEXICON"), # Extra keyword weights file (optional)
+        "SENTIMENT_ALIASES": os.getenv("SENTIMENT_ALIASES"), # CSV: instrument_key,alias[,alias...] (optional)
+        "SENTIMENT_HALF_LIFE": float(os.getenv("SENTIMENT_HALF_LIFE", 1800)), # Seconds
+        "LATENCY_STATS": os.getenv("LATENCY_STATS", "true").lower() in ("1", "true", "yes"), # Per-stage latency histograms
+        "JOURNAL_DIR": os.getenv("JOURNAL_DIR"), # Record raw frames + ticks here (disabled if unset)
         "TRADING_SYMBOL_LIST": os.getenv("TRADING_SYMBOL_LIST", "NSE_EQ|RELIANCE,NSE_EQ|TCS").split(","),
+        "WARMUP_DAYS": int(os.getenv("WARMUP_DAYS", 2)), # Past sessions of 1-min candles loaded at startup (0: off)
+        "WARMUP_DAILY_DAYS": int(os.getenv("WARMUP_DAILY_DAYS", 20)), # Daily candles loaded at startup
+        "WARMUP_CONCURRENCY": int(os.getenv("WARMUP_CONCURRENCY", 8)), # Parallel historical candle requests
+        "CANDLE_CACHE_DIR": os.getenv("CANDLE_CACHE_DIR", "data/candles"), # Per-day columnar candle cache
+        "INSTRUMENTS_FILE": os.getenv("INSTRUMENTS_FILE"), # Upstox instruments file (CSV / JSON, .gz ok); rebuilt into the store when newer
+        "INSTRUMENTS_DIR": os.getenv("INSTRUMENTS_DIR", "data/instruments"), # Memory-mapped instrument master store
     }
     
     if not config["UPSTOX_API_KEY"] or not config["UPSTOX_API_SECRET"]:
@@ -0,0 +1,427 @@
+import struct
+
+try:
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+except ImportError:  # Pure-Python wire walker only
+    descriptor_pb2 = None
+
+# Upstox V2 market data feed (MarketDataFeed.proto, package
+# com.upstox.marketdatafeeder.rpc.proto). Only the fields the bot trades on are
+# decoded; market depth, greeks and OHLC sub-messages are skipped by length,
+# which is where most of the bytes of a 'full' mode frame live.
+#
+#   FeedResponse        { Type type = 1; map<string, Feed> feeds = 2; }
+#   Feed                { oneof { LTPC ltpc = 1; FullFeed ff = 2; OptionChain oc = 3; } }
+#   FullFeed            { oneof { MarketFullFeed marketFF = 1; IndexFullFeed indexFF = 2; } }
+#   MarketFullFeed      { LTPC ltpc = 1; MarketLevel marketLevel = 2; OptionGreeks optionGreeks = 3;
+#                         MarketOHLC marketOHLC = 4; ExtendedFeedDetails eFeedDetails = 5; }
+#   IndexFullFeed       { LTPC ltpc = 1; MarketOHLC marketOHLC = 2; ... }
+#   OptionChain         { LTPC ltpc = 1; Quote bidAskQuote = 2; OptionGreeks optionGreeks = 3;
+#                         ExtendedFeedDetails eFeedDetails = 4; }
+#   LTPC                { double ltp = 1; int64 ltt = 2; int64 ltq = 3; double cp = 4; }
+#   ExtendedFeedDetails { double atp = 1; double cp = 2; int64 vtt = 3; double oi = 4; ... }
+
+FEED_TYPE_INITIAL = 0
+FEED_TYPE_LIVE = 1
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LEN = 2
+_WIRE_FIXED32 = 5
+
+_unpack_double = struct.Struct("<d").unpack_from
+_pack_double = struct.Struct("<d").pack
+_frame_len = struct.Struct("<I")
+
+
+class Tick:
+    """
+    Compact decoded tick. One instance per instrument per frame.
+    'symbol' is the Upstox instrument key (e.g. NSE_EQ|INE002A01018).
+    """
+    __slots__ = ("symbol", "ltp", "ltt", "ltq", "cp", "vtt", "oi", "atp")
+
+    def __init__(self, symbol, ltp=0.0, ltt=0, ltq=0, cp=0.0, vtt=0, oi=0.0, atp=0.0):
+        self.symbol = symbol
+        self.ltp = ltp
+        self.ltt = ltt      # Last trade time (epoch millis)
+        self.ltq = ltq      # Last trade quantity
+        self.cp = cp        # Previous close
+        self.vtt = vtt      # Volume traded today (full mode only)
+        self.oi = oi
+        self.atp = atp      # Average traded price (full mode only)
+
+    def __repr__(self):
+        return f"Tick({self.symbol} ltp={self.ltp} ltt={self.ltt} ltq={self.ltq} vtt={self.vtt})"
+
+
+def _read_varint(buf, pos):
+    b = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+    result = b & 0x7F
+    shift = 7
+    pos += 1
+    while True:
+        b = buf[pos]
+        result |= (b & 0x7F) << shift
+        pos += 1
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_int64(buf, pos):
+    value, pos = _read_varint(buf, pos)
+    if value >= 0x8000000000000000:
+        value -= 0x10000000000000000
+    return value, pos
+
+
+def _skip(buf, pos, wire_type):
+    if wire_type == _WIRE_VARINT:
+        while buf[pos] >= 0x80:
+            pos += 1
+        return pos + 1
+    if wire_type == _WIRE_FIXED64:
+        return pos + 8
+    if wire_type == _WIRE_LEN:
+        length, pos = _read_varint(buf, pos)
+        return pos + length
+    if wire_type == _WIRE_FIXED32:
+        return pos + 4
+    raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+
+
+def _parse_ltpc(buf, pos, end, tick):
+    while pos < end:
+        tag = buf[pos]
+        pos += 1
+        if tag == 0x09:    # 1: ltp (double)
+            tick.ltp = _unpack_double(buf, pos)[0]
+            pos += 8
+        elif tag == 0x10:  # 2: ltt (int64)
+            tick.ltt, pos = _read_int64(buf, pos)
+        elif tag == 0x18:  # 3: ltq (int64)
+            if buf[pos] < 0x80:
+                tick.ltq = buf[pos]
+                pos += 1
+            else:
+                tick.ltq, pos = _read_int64(buf, pos)
+        elif tag == 0x21:  # 4: cp (double)
+            tick.cp = _unpack_double(buf, pos)[0]
+            pos += 8
+        else:
+            pos = _skip_field(buf, pos - 1)
+
+
+def _parse_extended(buf, pos, end, tick):
+    while pos < end:
+        tag = buf[pos]
+        pos += 1
+        if tag == 0x09:    # 1: atp (double)
+            tick.atp = _unpack_double(buf, pos)[0]
+            pos += 8
+        elif tag == 0x18:  # 3: vtt (int64)
+            tick.vtt, pos = _read_int64(buf, pos)
+        elif tag == 0x21:  # 4: oi (double)
+            tick.oi = _unpack_double(buf, pos)[0]
+            pos += 8
+        elif tag < 0x80 and tag & 0x07 == _WIRE_FIXED64:
+            pos += 8       # Other double fields (cp, tbq, tsq, ...)
+        else:
+            pos = _skip_field(buf, pos - 1)
+
+
+def _skip_field(buf, pos):
+    tag, pos = _read_varint(buf, pos)
+    return _skip(buf, pos, tag & 0x07)
+
+
+def _parse_message(buf, pos, end, tick, ltpc_tag, extended_tag):
+    # MarketFullFeed / IndexFullFeed / OptionChain share the same shape for our
+    # purposes: an LTPC sub-message and (optionally) ExtendedFeedDetails.
+    # Tags of interest are single-byte; lengths are inlined for the 1-2 byte case.
+    while pos < end:
+        tag = buf[pos]
+        if tag & 0x07 != _WIRE_LEN or tag >= 0x80:
+            pos = _skip_field(buf, pos)
+            continue
+        b = buf[pos + 1]
+        if b < 0x80:
+            length = b
+            pos += 2
+        else:
+            length, pos = _read_varint(buf, pos + 1)
+        sub_end = pos + length
+        if tag == ltpc_tag:
+            _parse_ltpc(buf, pos, sub_end, tick)
+        elif tag == extended_tag:
+            _parse_extended(buf, pos, sub_end, tick)
+        pos = sub_end
+
+
+def _parse_feed(buf, pos, end, tick):
+    while pos < end:
+        tag, pos = _read_varint(buf, pos)
+        if tag & 0x07 != _WIRE_LEN:
+            pos = _skip(buf, pos, tag & 0x07)
+            continue
+        length, pos = _read_varint(buf, pos)
+        sub_end = pos + length
+        if tag == 0x0A:    # 1: ltpc
+            _parse_ltpc(buf, pos, sub_end, tick)
+        elif tag == 0x12 and length:  # 2: ff (FullFeed)
+            ff_tag, ff_pos = _read_varint(buf, pos)
+            ff_len, ff_pos = _read_varint(buf, ff_pos)
+            if ff_tag == 0x0A:    # marketFF: ltpc=1, eFeedDetails=5
+                _parse_message(buf, ff_pos, ff_pos + ff_len, tick, 0x0A, 0x2A)
+            elif ff_tag == 0x12:  # indexFF: ltpc=1
+                _parse_message(buf, ff_pos, ff_pos + ff_len, tick, 0x0A, -1)
+        elif tag == 0x1A:  # 3: oc (OptionChain): ltpc=1, eFeedDetails=4
+            _parse_message(buf, pos, sub_end, tick, 0x0A, 0x22)
+        pos = sub_end
+
+
+def _build_feed_response_class():
+    """
+    Build a FeedResponse message class for the C (upb) protobuf runtime
+    without needing protoc or a generated _pb2 module. Only the fields the
+    bot reads are declared; depth, greeks and OHLC stay unknown fields.
+    """
+    F = descriptor_pb2.FieldDescriptorProto
+    fd = descriptor_pb2.FileDescriptorProto(name="nkbot_feed.proto", package="nkbot.feed", syntax="proto3")
+
+    def message(name, fields, oneof=None):
+        msg = fd.message_type.add(name=name)
+        if oneof:
+            msg.oneof_decl.add(name=oneof)
+        for field_name, number, field_type, type_name in fields:
+            field = msg.field.add(name=field_name, number=number, type=field_type, label=F.LABEL_OPTIONAL)
+            if type_name:
+                field.type_name = f".nkbot.feed.{type_name}"
+            if oneof:
+                field.oneof_index = 0
+        return msg
+
+    message("LTPC", [("ltp", 1, F.TYPE_DOUBLE, None), ("ltt", 2, F.TYPE_INT64, None),
+                     ("ltq", 3, F.TYPE_INT64, None), ("cp", 4, F.TYPE_DOUBLE, None)])
+    message("ExtendedFeedDetails", [("atp", 1, F.TYPE_DOUBLE, None), ("vtt", 3, F.TYPE_INT64, None),
+                                    ("oi", 4, F.TYPE_DOUBLE, None)])
+    message("MarketFullFeed", [("ltpc", 1, F.TYPE_MESSAGE, "LTPC"),
+                               ("eFeedDetails", 5, F.TYPE_MESSAGE, "ExtendedFeedDetails")])
+    message("IndexFullFeed", [("ltpc", 1, F.TYPE_MESSAGE, "LTPC")])
+    message("FullFeed", [("marketFF", 1, F.TYPE_MESSAGE, "MarketFullFeed"),
+                         ("indexFF", 2, F.TYPE_MESSAGE, "IndexFullFeed")], oneof="FullFeedUnion")
+    message("OptionChain", [("ltpc", 1, F.TYPE_MESSAGE, "LTPC"),
+                            ("eFeedDetails", 4, F.TYPE_MESSAGE, "ExtendedFeedDetails")])
+    message("Feed", [("ltpc", 1, F.TYPE_MESSAGE, "LTPC"), ("ff", 2, F.TYPE_MESSAGE, "FullFeed"),
+                     ("oc", 3, F.TYPE_MESSAGE, "OptionChain")], oneof="FeedUnion")
+    response = message("FeedResponse", [("type", 1, F.TYPE_INT32, None)])
+    response.field.add(name="feeds", number=2, type=F.TYPE_MESSAGE, label=F.LABEL_REPEATED,
+                       type_name=".nkbot.feed.FeedResponse.FeedsEntry")
+    entry = response.nested_type.add(name="FeedsEntry")
+    entry.options.map_entry = True
+    entry.field.add(name="key", number=1, type=F.TYPE_STRING, label=F.LABEL_OPTIONAL)
+    entry.field.add(name="value", number=2, type=F.TYPE_MESSAGE, label=F.LABEL_OPTIONAL,
+                    type_name=".nkbot.feed.Feed")
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(fd)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("nkbot.feed.FeedResponse"))
+
+
+class FeedDecoder:
+    """
+    Decoder for Upstox V2 FeedResponse protobuf frames.
+    Produces one Tick per instrument, without dicts or JSON in between.
+
+    backend='native' parses with the protobuf C runtime (google.protobuf/upb),
+    backend='python' walks the wire format directly. 'auto' prefers native.
+    """
+    def __init__(self, backend="auto"):
+        if backend == "auto":
+            backend = "native" if descriptor_pb2 is not None else "python"
+        if backend == "native":
+            if descriptor_pb2 is None:
+                raise ImportError("backend='native' requires the 'protobuf' package")
+            self._response_cls = _build_feed_response_class()
+            self._decode = self._decode_native
+        else:
+            self._decode = self._decode_python
+        self.backend = backend
+        self._keys = {}  # raw key bytes -> interned str
+        self.frames = 0
+        self.ticks = 0
+        self.last_feed_type = FEED_TYPE_LIVE
+
+    def decode(self, frame):
+        """
+        Decode one binary frame into a list of Tick records.
+        """
+        return self._decode(frame)
+
+    def _decode_native(self, frame):
+        response = self._response_cls()
+        response.ParseFromString(frame)
+        batch = []
+        append = batch.append
+
+        for symbol, feed in response.feeds.items():
+            kind = feed.WhichOneof("FeedUnion")
+            if kind == "ff":
+                ff = feed.ff
+                if ff.WhichOneof("FullFeedUnion") == "marketFF":
+                    mff = ff.marketFF
+                    ltpc = mff.ltpc
+                    ext = mff.eFeedDetails
+                    append(Tick(symbol, ltpc.ltp, ltpc.ltt, ltpc.ltq, ltpc.cp, ext.vtt, ext.oi, ext.atp))
+                    continue
+                ltpc = ff.indexFF.ltpc
+            elif kind == "oc":
+                ltpc = feed.oc.ltpc
+                ext = feed.oc.eFeedDetails
+                append(Tick(symbol, ltpc.ltp, ltpc.ltt, ltpc.ltq, ltpc.cp, ext.vtt, ext.oi, ext.atp))
+                continue
+            else:
+                ltpc = feed.ltpc
+            append(Tick(symbol, ltpc.ltp, ltpc.ltt, ltpc.ltq, ltpc.cp))
+
+        self.last_feed_type = response.type
+        self.frames += 1
+        self.ticks += len(batch)
+        return batch
+
+    def _decode_python(self, frame):
+        buf = frame if isinstance(frame, bytes) else bytes(frame)
+        keys = self._keys
+        batch = []
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            tag, pos = _read_varint(buf, pos)
+            if tag == 0x08:    # 1: type (enum)
+                self.last_feed_type, pos = _read_varint(buf, pos)
+                continue
+            if tag != 0x12:    # Anything but 2: feeds (map entry)
+                pos = _skip(buf, pos, tag & 0x07)
+                continue
+
+            length, pos = _read_varint(buf, pos)
+            entry_end = pos + length
+            symbol = None
+            feed_pos = feed_end = 0
+            while pos < entry_end:
+                entry_tag, pos = _read_varint(buf, pos)
+                field_len, pos = _read_varint(buf, pos)
+                if entry_tag == 0x0A:    # key
+                    raw = buf[pos:pos + field_len]
+                    symbol = keys.get(raw)
+                    if symbol is None:
+                        symbol = keys[raw] = raw.decode("utf-8")
+                elif entry_tag == 0x12:  # value (Feed)
+                    feed_pos = pos
+                    feed_end = pos + field_len
+                pos += field_len
+
+            if symbol is not None:
+                tick = Tick(symbol)
+                _parse_feed(buf, feed_pos, feed_end, tick)
+                batch.append(tick)
+
+        self.frames += 1
+        self.ticks += len(batch)
+        return batch
+
+
+# --- Encoding (fixtures, replay and fake feed servers) ---
+
+def _encode_varint(value):
+    if value < 0:
+        value += 0x10000000000000000
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field_len(field, payload):
+    return _encode_varint((field << 3) | _WIRE_LEN) + _encode_varint(len(payload)) + payload
+
+
+def _field_double(field, value):
+    return _encode_varint((field << 3) | _WIRE_FIXED64) + _pack_double(value)
+
+
+def _field_varint(field, value):
+    return _encode_varint((field << 3) | _WIRE_VARINT) + _encode_varint(value)
+
+
+def _encode_ltpc(tick):
+    return (_field_double(1, tick.ltp) + _field_varint(2, tick.ltt)
+            + _field_varint(3, tick.ltq) + _field_double(4, tick.cp))
+
+
+def _encode_market_full_feed(tick, depth):
+    spread = max(round(tick.ltp * 0.0001, 2), 0.05)
+    quotes = b""
+    for level in range(depth):
+        quote = (_field_varint(1, 100 * (level + 1)) + _field_double(2, tick.ltp - spread * (level + 1))
+                 + _field_varint(3, level + 1) + _field_varint(4, 90 * (level + 1))
+                 + _field_double(5, tick.ltp + spread * (level + 1)) + _field_varint(6, level + 1))
+        quotes += _field_len(1, quote)
+    ohlc = b""
+    for interval in ("1d", "I1"):
+        ohlc += _field_len(1, (_field_len(1, interval.encode()) + _field_double(2, tick.cp)
+                               + _field_double(3, max(tick.cp, tick.ltp)) + _field_double(4, min(tick.cp, tick.ltp))
+                               + _field_double(5, tick.ltp) + _field_varint(6, tick.vtt)
+                               + _field_varint(7, tick.ltt)))
+    extended = (_field_double(1, tick.atp) + _field_double(2, tick.cp) + _field_varint(3, tick.vtt)
+                + _field_double(4, tick.oi) + _field_double(7, 1000.0) + _field_double(8, 1000.0))
+    return (_field_len(1, _encode_ltpc(tick)) + _field_len(2, quotes)
+            + _field_len(4, ohlc) + _field_len(5, extended))
+
+
+def encode_feed_response(ticks, mode="full", depth=5, feed_type=FEED_TYPE_LIVE):
+    """
+    Encode Ticks into a FeedResponse frame, the inverse of FeedDecoder.decode.
+    mode='ltpc' emits LTPC-only feeds; mode='full' emits MarketFullFeed with
+    'depth' bid/ask levels, OHLC and extended details like the live feed.
+    """
+    out = _field_varint(1, feed_type) if feed_type else b""
+    for tick in ticks:
+        if mode == "full":
+            feed = _field_len(2, _field_len(1, _encode_market_full_feed(tick, depth)))
+        else:
+            feed = _field_len(1, _encode_ltpc(tick))
+        entry = _field_len(1, tick.symbol.encode("utf-8")) + _field_len(2, feed)
+        out += _field_len(2, entry)
+    return out
+
+
+# --- Recorded frame files (4-byte little-endian length prefix + raw frame) ---
+
+def read_frames(path):
+    """
+    Load a recorded frames file into a list of raw frames.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    frames = []
+    pos = 0
+    while pos + 4 <= len(data):
+        (length,) = _frame_len.unpack_from(data, pos)
+        pos += 4
+        frames.append(data[pos:pos + length])
+        pos += length
+    return frames
+
+
+def write_frames(path, frames):
+    with open(path, "wb") as f:
+        for frame in frames:
+            f.write(_frame_len.pack(len(frame)))
+            f.write(frame)
@@ -0,0 +1,295 @@
+import logging
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+from candles import parse_timeframe
+from streaming_indicators import session_day, SESSION_UTC_OFFSET_MS
+
+logger = logging.getLogger("History")
+
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+
+# Candle timeframe -> Upstox candle interval
+INTERVALS = {60_000: "1minute", 1_800_000: "30minute"}
+
+
+def empty_bars():
+    return {name: np.zeros(0, dtype=np.int64 if name == "ts" else np.float64) for name in COLUMNS}
+
+
+def concat_bars(parts):
+    parts = [p for p in parts if len(p["ts"])]
+    if not parts:
+        return empty_bars()
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+
+
+def day_name(day):
+    """
+    YYYY-MM-DD of a session day number (see streaming_indicators.session_day).
+    """
+    return time.strftime("%Y-%m-%d", time.gmtime(day * 86_400))
+
+
+def weekdays_before(day, n):
+    """
+    The n weekdays before 'day', oldest first (exchange holidays included;
+    they come back empty and are cached as such).
+    """
+    out = []
+    while len(out) < n:
+        day -= 1
+        if (day + 3) % 7 < 5:  # Day 0 (1970-01-01) was a Thursday
+            out.append(day)
+    return out[::-1]
+
+
+def parse_candles(rows):
+    """
+    Upstox candle rows [[timestamp, open, high, low, close, volume, oi], ...]
+    (newest first) -> bar columns oldest first, ts in epoch millis.
+    """
+    if not rows:
+        return empty_bars()
+    if rows[0][0] > rows[-1][0]:  # ISO timestamps in one offset sort as strings
+        rows = rows[::-1]
+    stamps = [row[0] for row in rows]
+    if stamps[0].endswith("+05:30") and stamps[-1].endswith("+05:30"):
+        local = np.array([s[:19] for s in stamps], dtype="datetime64[s]").astype(np.int64)
+        ts = local * 1000 - SESSION_UTC_OFFSET_MS
+    else:
+        ts = np.array([int(datetime.fromisoformat(s).timestamp() * 1000) for s in stamps], dtype=np.int64)
+    values = np.array([row[1:6] for row in rows], dtype=np.float64)
+    return {"ts": ts, "open": values[:, 0], "high": values[:, 1], "low": values[:, 2],
+            "close": values[:, 3], "volume": values[:, 4]}
+
+
+def _split_days(bars):
+    """
+    {session day: bar columns} for bars spanning several days.
+    """
+    days = (bars["ts"] + SESSION_UTC_OFFSET_MS) // 86_400_000
+    out = {}
+    for day in np.unique(days).tolist():
+        mask = days == day
+        out[day] = {name: bars[name][mask] for name in COLUMNS}
+    return out
+
+
+class UpstoxHistorySource:
+    """
+    Candles from the Upstox V2 historical / intraday candle API, over the
+    order gateway's pooled session. fetch() returns bar columns or None on
+    failure (logged by the gateway).
+    """
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+    async def fetch(self, symbol, interval, first_day, last_day):
+        rows = await self.gateway.historical_candles(symbol, interval, day_name(last_day), day_name(first_day))
+        return None if rows is None else parse_candles(rows)
+
+    async def fetch_intraday(self, symbol, interval):
+        rows = await self.gateway.intraday_candles(symbol, interval)
+        return None if rows is None else parse_candles(rows)
+
+
+class CandleCache:
+    """
+    Per-day columnar candle cache:
+
+        <root>/<interval>/<YYYY-MM-DD>/ts.npy, open.npy, ... volume.npy
+        <root>/<interval>/<YYYY-MM-DD>/offsets.npy   symbol i = rows offsets[i]:offsets[i + 1]
+        <root>/<interval>/<YYYY-MM-DD>/meta.json     symbols, per-symbol 'complete' flag
+
+    A day holds every cached symbol's bars, one file per column. A symbol
+    is 'complete' for a past session once fetched (an empty entry marks a
+    holiday); today's entries are partial snapshots. meta.json is written
+    last, after the column files, and marks the day consistent.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, interval, day):
+        return os.path.join(self.root, interval, day_name(day))
+
+    def read_day(self, interval, day):
+        """
+        {symbol: (bar columns, complete)} for one day ({} when not cached).
+        """
+        path = self._path(interval, day)
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            offsets = np.load(os.path.join(path, "offsets.npy"))
+            columns = {name: np.load(os.path.join(path, f"{name}.npy")) for name in COLUMNS}
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                logger.warning(f"Ignoring unreadable candle cache {path}: {e}")
+            return {}
+        symbols = meta["symbols"]
+        if len(offsets) != len(symbols) + 1 or offsets[-1] != len(columns["ts"]):
+            logger.warning(f"Ignoring inconsistent candle cache {path}")
+            return {}
+        bounds = offsets.tolist()
+        return {symbol: ({name: col[bounds[i]:bounds[i + 1]] for name, col in columns.items()}, complete)
+                for i, (symbol, complete) in enumerate(zip(symbols, meta["complete"]))}
+
+    def write_day(self, interval, day, entries):
+        """
+        Merge {symbol: (bar columns, complete)} into the cached day.
+        """
+        merged = self.read_day(interval, day)
+        merged.update(entries)
+        symbols = sorted(merged)
+        path = self._path(interval, day)
+        os.makedirs(path, exist_ok=True)
+        sizes = [len(merged[s][0]["ts"]) for s in symbols]
+        offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        arrays = {"offsets": offsets}
+        for name in COLUMNS:
+            arrays[name] = (np.concatenate([merged[s][0][name] for s in symbols]) if symbols
+                            else empty_bars()[name])
+        for name, array in arrays.items():
+            tmp = os.path.join(path, f"{name}.npy.tmp-{os.getpid()}")
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, os.path.join(path, f"{name}.npy"))
+        tmp = os.path.join(path, f"meta.json.tmp-{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump({"symbols": symbols, "complete": [merged[s][1] for s in symbols]}, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+class HistoryWarmup:
+    """
+    Loads recent candles for the universe at startup: 1-min bars for today
+    and the previous 'days' sessions, plus 'daily_days' daily bars.
+
+    Past sessions come from the cache; only the (symbol, day) ranges missing
+    from it are fetched, one request per contiguous run of missing days, at
+    most 'concurrency' requests at a time. Today's bars are always fetched
+    when there is a source (the cache then only serves as a fallback, e.g.
+    for sharded workers that have no REST session).
+    """
+    def __init__(self, cache, source=None, timeframe="1min", days=2, daily_days=20, concurrency=8,
+                 clock=time.time):
+        self.cache = cache
+        self.source = source
+        self.interval_ms = parse_timeframe(timeframe)
+        self.interval = INTERVALS.get(self.interval_ms)
+        self.days = days
+        self.daily_days = daily_days
+        self.concurrency = concurrency
+        self.clock = clock
+        self.requests = 0
+        self.failures = 0
+
+    async def load(self, symbols):
+        """
+        Returns (intraday, daily): {symbol: bar columns oldest first}.
+        Intraday bars stop before the bar that is open now.
+        """
+        if self.interval is None:
+            logger.warning(f"No historical candles for a {self.interval_ms} ms timeframe. Warm-up skipped.")
+            return {}, {}
+        start = time.perf_counter()
+        now_ms = int(self.clock() * 1000)
+        today = session_day(now_ms)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        intraday, daily = await asyncio.gather(
+            self._load(symbols, self.interval, weekdays_before(today, self.days), today, semaphore),
+            self._load(symbols, "day", weekdays_before(today, self.daily_days), None, semaphore),
+        )
+        open_bar = now_ms // self.interval_ms * self.interval_ms
+        for symbol, bars in intraday.items():
+            if len(bars["ts"]) and bars["ts"][-1] >= open_bar:
+                keep = bars["ts"] < open_bar
+                intraday[symbol] = {name: col[keep] for name, col in bars.items()}
+        logger.info(f"Warm-up: {sum(len(b['ts']) for b in intraday.values())} intraday and "
+                    f"{sum(len(b['ts']) for b in daily.values())} daily bars for {len(symbols)} symbols "
+                    f"({self.requests} requests, {self.failures} failed) in {time.perf_counter() - start:.2f}s")
+        return intraday, daily
+
+    async def _load(self, symbols, interval, days, today, semaphore):
+        cached = {day: self.cache.read_day(interval, day) for day in days}
+        if today is not None:
+            cached[today] = self.cache.read_day(interval, today)
+        fetched = {day: {} for day in cached}  # day -> {symbol: (bars, complete)}
+
+        async def fetch(symbol, run):
+            async with semaphore:
+                self.requests += 1
+                if run is None:
+                    bars = await self.source.fetch_intraday(symbol, interval)
+                else:
+                    bars = await self.source.fetch(symbol, interval, run[0], run[-1])
+            if bars is None:
+                self.failures += 1
+                return
+            if run is None:
+                fetched[today][symbol] = (bars, False)
+                return
+            by_day = _split_days(bars)
+            for day in run:
+                fetched[day][symbol] = (by_day.get(day, empty_bars()), True)
+
+        tasks = []
+        if self.source is not None:
+            for symbol in symbols:
+                run = []
+                for day in days:
+                    entry = cached[day].get(symbol)
+                    if entry is not None and entry[1]:
+                        if run:
+                            tasks.append(fetch(symbol, run))
+                            run = []
+                    else:
+                        run.append(day)
+                if run:
+                    tasks.append(fetch(symbol, run))
+                if today is not None:
+                    tasks.append(fetch(symbol, None))
+            await asyncio.gather(*tasks)
+            for day, entries in fetched.items():
+                if entries:
+                    self.cache.write_day(interval, day, entries)
+
+        out = {}
+        for symbol in symbols:
+            parts = []
+            for day in sorted(cached):
+                entry = fetched[day].get(symbol) or cached[day].get(symbol)
+                if entry is not None:
+                    parts.append(entry[0])
+            out[symbol] = concat_bars(parts)
+        return out
+
+    @classmethod
+    def from_config(cls, config, source=None, timeframe="1min"):
+        """
+        None when WARMUP_DAYS is 0.
+        """
+        if not config.get("WARMUP_DAYS"):
+            return None
+        return cls(CandleCache(config.get("CANDLE_CACHE_DIR", "data/candles")), source, timeframe,
+                   days=config["WARMUP_DAYS"], daily_days=config.get("WARMUP_DAILY_DAYS", 20),
+                   concurrency=config.get("WARMUP_CONCURRENCY", 8))
+
+
+def seed(candles, strategy, intraday):
+    """
+    Load warm-up bars into the candle builder's buffers and rebuild the
+    strategy's indicator state from them, so signals are live from the
+    first bar close. Synchronous: no live bar can close in between.
+    """
+    for symbol, bars in intraday.items():
+        if len(bars["ts"]):
+            candles.seed(symbol, bars)
+            strategy.seed(symbol, candles.buffers[symbol].arrays())
@@ -0,0 +1,443 @@
+import logging
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import zlib
+import numpy as np
+
+logger = logging.getLogger("Instruments")
+
+STORE_VERSION = 2  # 2: CSV tick sizes kept in rupees, CSV instrument types mapped
+
+# One instrument = one fixed-size record. Longer values are rejected at build
+# time rather than silently truncated.
+INSTRUMENT_DTYPE = np.dtype([
+    ("instrument_key", "S40"),   # e.g. NSE_EQ|INE002A01018, NSE_FO|43919
+    ("trading_symbol", "S48"),
+    ("isin", "S12"),
+    ("segment", "S12"),          # NSE_EQ, NSE_FO, BSE_EQ, MCX_FO, NSE_INDEX, ...
+    ("instrument_type", "S12"),  # EQ, FUT, CE, PE, INDEX, ...
+    ("name", "S64"),
+    ("lot_size", "<i4"),
+    ("tick_size", "<f8"),        # Rupees
+])
+
+# Segments tried, in order, for names given without one ("RELIANCE")
+DEFAULT_SEGMENTS = ("NSE_EQ", "BSE_EQ", "NSE_INDEX")
+
+_INDEXES = ("key", "symbol", "isin")
+
+# CSV master instrument types -> the JSON master's (options take option_type: CE / PE)
+CSV_INSTRUMENT_TYPES = {"EQUITY": "EQ", "FUTIDX": "FUT", "FUTSTK": "FUT", "FUTCOM": "FUT", "FUTCUR": "FUT",
+                        "FUTIRC": "FUT", "FUTIRT": "FUT", "INDEX": "INDEX"}
+
+
+def _looks_like_isin(code):
+    return len(code) == 12 and code[:2].isalpha() and code[2:].isalnum() and code[-1].isdigit()
+
+
+def _slot(text_bytes, mask):
+    return zlib.crc32(text_bytes) & mask
+
+
+class Instrument:
+    """
+    One resolved instrument (a copy of its store record).
+    """
+    __slots__ = ("instrument_key", "trading_symbol", "isin", "segment", "instrument_type", "name",
+                 "lot_size", "tick_size")
+
+    def __init__(self, instrument_key, trading_symbol, isin, segment, instrument_type, name, lot_size, tick_size):
+        self.instrument_key = instrument_key
+        self.trading_symbol = trading_symbol
+        self.isin = isin
+        self.segment = segment
+        self.instrument_type = instrument_type
+        self.name = name
+        self.lot_size = lot_size
+        self.tick_size = tick_size
+
+    def __repr__(self):
+        return (f"Instrument({self.instrument_key} {self.segment}:{self.trading_symbol} "
+                f"lot={self.lot_size} tick={self.tick_size})")
+
+
+def _open_source(path):
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    raw = gzip.open(path, "rb") if gzipped else open(path, "rb")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def _read_source(path):
+    """
+    Rows of the Upstox instruments file as dicts, and its format: the BOD
+    JSON ("json": a list of objects, optionally .gz) or the CSV ("csv":
+    instrument_key, tradingsymbol, tick_size, lot_size, instrument_type,
+    option_type, exchange, ...).
+    """
+    with _open_source(path) as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        if head == "[":
+            return json.loads(head + f.read()), "json"
+        return list(csv.DictReader(io.StringIO(head + f.read()))), "csv"
+
+
+def _instrument_type(row, fmt):
+    kind = (row.get("instrument_type") or "").strip().upper()
+    if fmt != "csv":
+        return kind
+    if kind.startswith("OPT"):
+        return (row.get("option_type") or kind).strip().upper()
+    return CSV_INSTRUMENT_TYPES.get(kind, kind)
+
+
+def _record(row, fmt="json"):
+    key = (row.get("instrument_key") or "").strip()
+    segment = key.split("|", 1)[0] if "|" in key else (row.get("segment") or row.get("exchange") or "")
+    isin = (row.get("isin") or "").strip()
+    if not isin and segment.endswith("_EQ") and _looks_like_isin(key.split("|", 1)[-1]):
+        isin = key.split("|", 1)[-1]
+    # The JSON master gives tick_size in paise, the CSV one in rupees
+    tick = row.get("tick_size")
+    tick = (float(tick) / 100.0 if fmt == "json" else float(tick)) if tick not in (None, "") else 0.0
+    return (
+        key,
+        (row.get("trading_symbol") or row.get("tradingsymbol") or "").strip().upper(),
+        isin.upper(),
+        segment,
+        _instrument_type(row, fmt),
+        (row.get("name") or "").strip(),
+        int(float(row.get("lot_size") or 0)),
+        tick,
+    )
+
+
+def _index(keys):
+    """
+    Open-addressing (linear probing) table of row + 1 by crc32 of the key,
+    at most half full. Duplicate keys keep their first row.
+    """
+    size = 16
+    while size < 2 * len(keys):
+        size <<= 1
+    mask = size - 1
+    table = [0] * size
+    duplicates = 0
+    for row, key in enumerate(keys):
+        if not key:
+            continue
+        slot = _slot(key, mask)
+        while table[slot]:
+            if keys[table[slot] - 1] == key:
+                duplicates += 1
+                break
+            slot = (slot + 1) & mask
+        else:
+            table[slot] = row + 1
+    return np.array(table, dtype=np.int32), duplicates
+
+
+def _write_npy(path, array):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+class InstrumentMaster:
+    """
+    Memory-mapped instrument master.
+
+    build() parses the Upstox instruments file once into a store directory:
+
+        <store>/instruments.npy    INSTRUMENT_DTYPE records
+        <store>/index-key.npy      instrument_key -> row
+        <store>/index-symbol.npy   "SEGMENT|TRADING_SYMBOL" -> row
+        <store>/index-isin.npy     "SEGMENT|ISIN" -> row
+        <store>/meta.json          source path / size / mtime, record count
+
+    Opening the store maps the arrays read-only (no parsing, pages are read
+    on demand), and every lookup is one crc32 plus a short probe of an
+    open-addressing table, whatever the size of the master.
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Instrument store {store_dir} has version {self.meta.get('version')}; rebuild it")
+        self.records = np.load(os.path.join(store_dir, "instruments.npy"), mmap_mode="r")
+        if len(self.records) != self.meta["count"]:
+            raise ValueError(f"Instrument store {store_dir} is incomplete; rebuild it")
+        # Probing reads the mapped bytes through memoryviews (plain ints and
+        # bytes slices, no NumPy scalars on the lookup path)
+        self._tables = {name: memoryview(np.load(os.path.join(store_dir, f"index-{name}.npy"), mmap_mode="r"))
+                        for name in _INDEXES}
+        self._buffer = memoryview(self.records).cast("B")
+        self._keys = self._field("instrument_key")
+        self._symbols = self._field("trading_symbol")
+        self._isins = self._field("isin")
+        self._segments = self._field("segment")
+
+    def __len__(self):
+        return len(self.records)
+
+    # --- Building ---
+
+    @staticmethod
+    def build(source, store_dir):
+        """
+        Parse the instruments file at 'source' into 'store_dir'. Rows without
+        an instrument_key are skipped; duplicate keys keep the first row.
+        Raises ValueError for values that don't fit the record layout.
+        """
+        start = time.perf_counter()
+        records = []
+        skipped = 0
+        rows, fmt = _read_source(source)
+        for n, row in enumerate(rows):
+            try:
+                record = _record(row, fmt)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{source}: row {n + 1}: {e}") from None
+            if not record[0]:
+                skipped += 1
+                continue
+            records.append(record)
+        if not records:
+            raise ValueError(f"{source}: no instruments")
+
+        array = np.empty(len(records), dtype=INSTRUMENT_DTYPE)
+        for field in ("instrument_key", "trading_symbol", "isin", "segment", "instrument_type", "name"):
+            limit = INSTRUMENT_DTYPE[field].itemsize
+            i = INSTRUMENT_DTYPE.names.index(field)
+            column = [r[i].encode() for r in records]
+            too_long = next((v for v in column if len(v) > limit), None)
+            if too_long is not None:
+                raise ValueError(f"{source}: {field} {too_long.decode()!r} is longer than {limit} bytes")
+            array[field] = column
+        array["lot_size"] = [r[6] for r in records]
+        array["tick_size"] = [r[7] for r in records]
+
+        keys = array["instrument_key"].tolist()
+        segments = array["segment"].tolist()
+        symbols = [s + b"|" + t if t else b"" for s, t in zip(segments, array["trading_symbol"].tolist())]
+        isins = [s + b"|" + i if i else b"" for s, i in zip(segments, array["isin"].tolist())]
+
+        os.makedirs(store_dir, exist_ok=True)
+        _write_npy(os.path.join(store_dir, "instruments.npy"), array)
+        for name, column in zip(_INDEXES, (keys, symbols, isins)):
+            table, duplicates = _index(column)
+            if duplicates:
+                logger.warning(f"{source}: {duplicates} duplicate {name} entries (first one kept)")
+            _write_npy(os.path.join(store_dir, f"index-{name}.npy"), table)
+
+        # meta.json last: it is what marks the store complete
+        stat = os.stat(source)
+        meta = {"version": STORE_VERSION, "source": os.path.abspath(source), "source_size": stat.st_size,
+                "source_mtime": stat.st_mtime, "count": len(array), "built": time.time()}
+        tmp = os.path.join(store_dir, f"meta.json.tmp-{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(store_dir, "meta.json"))
+        logger.info(f"Built instrument store {store_dir}: {len(array)} instruments "
+                    f"({skipped} rows skipped) in {time.perf_counter() - start:.2f}s")
+
+    @staticmethod
+    def is_stale(store_dir, source):
+        """
+        True when the store is missing, from an older layout, or built from a
+        different version of 'source'.
+        """
+        try:
+            with open(os.path.join(store_dir, "meta.json")) as f:
+                meta = json.load(f)
+            stat = os.stat(source)
+        except (OSError, ValueError):
+            return True
+        return (meta.get("version") != STORE_VERSION or meta.get("source_size") != stat.st_size
+                or meta.get("source_mtime") != stat.st_mtime)
+
+    @classmethod
+    def open(cls, store_dir, source=None):
+        """
+        Map the store, (re)building it first from 'source' when given and newer.
+        """
+        if source and cls.is_stale(store_dir, source):
+            cls.build(source, store_dir)
+        return cls(store_dir)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        The master for INSTRUMENTS_DIR / INSTRUMENTS_FILE, or None when
+        neither a store nor a source file is configured.
+        """
+        store_dir = config.get("INSTRUMENTS_DIR")
+        source = config.get("INSTRUMENTS_FILE")
+        if not store_dir or not (source or os.path.exists(os.path.join(store_dir, "meta.json"))):
+            return None
+        return cls.open(store_dir, source)
+
+    def _field(self, name):
+        """
+        row -> raw bytes of a string field (trailing NULs stripped).
+        """
+        buffer = self._buffer
+        itemsize = INSTRUMENT_DTYPE.itemsize
+        offset = INSTRUMENT_DTYPE.fields[name][1]
+        end = offset + INSTRUMENT_DTYPE[name].itemsize
+
+        def value(row):
+            base = row * itemsize
+            return bytes(buffer[base + offset:base + end]).rstrip(b"\0")
+        return value
+
+    # --- Lookups ---
+
+    def _find(self, index, key, column, segments=None):
+        table = self._tables[index]
+        mask = len(table) - 1
+        slot = _slot(key, mask)
+        while True:
+            row = table[slot]
+            if not row:
+                return None
+            row -= 1
+            if segments is None:
+                if column(row) == key:
+                    return row
+            elif segments(row) + b"|" + column(row) == key:
+                return row
+            slot = (slot + 1) & mask
+
+    def row(self, name):
+        """
+        Record index for an instrument key ("NSE_EQ|INE002A01018"), a
+        segment-qualified trading symbol or ISIN ("NSE_EQ|RELIANCE",
+        "NSE_EQ|INE002A01018") or a bare one ("RELIANCE", tried in
+        DEFAULT_SEGMENTS order). None when unknown.
+        """
+        name = name.strip()
+        encoded = name.encode()
+        row = self._find("key", encoded, self._keys)
+        if row is not None:
+            return row
+        if "|" in name:
+            qualified = (name.upper().encode(),)
+        else:
+            qualified = tuple(f"{segment}|{name.upper()}".encode() for segment in DEFAULT_SEGMENTS)
+        for key in qualified:
+            row = self._find("symbol", key, self._symbols, self._segments)
+            if row is None:
+                row = self._find("isin", key, self._isins, self._segments)
+            if row is not None:
+                return row
+        return None
+
+    def _instrument(self, row):
+        r = self.records[row]
+        return Instrument(r["instrument_key"].decode(), r["trading_symbol"].decode(), r["isin"].decode(),
+                          r["segment"].decode(), r["instrument_type"].decode(), r["name"].decode(),
+                          int(r["lot_size"]), float(r["tick_size"]))
+
+    def get(self, name):
+        row = self.row(name)
+        return None if row is None else self._instrument(row)
+
+    def __getitem__(self, name):
+        instrument = self.get(name)
+        if instrument is None:
+            raise KeyError(name)
+        return instrument
+
+    def __contains__(self, name):
+        return self.row(name) is not None
+
+    def instrument_key(self, name):
+        row = self.row(name)
+        return None if row is None else self._keys(row).decode()
+
+    def lookup_many(self, names):
+        """
+        [Instrument or None] for each name.
+        """
+        return [self.get(name) for name in names]
+
+    def instrument_keys(self, names):
+        """
+        Instrument keys for a symbol list, e.g. to build subscriptions.
+        Raises KeyError naming every unknown entry.
+        """
+        keys, unknown = [], []
+        for name in names:
+            key = self.instrument_key(name)
+            if key is None:
+                unknown.append(name)
+            keys.append(key)
+        if unknown:
+            raise KeyError(f"Unknown instruments: {', '.join(unknown)}")
+        return keys
+
+    def names(self, instrument_keys):
+        """
+        {instrument_key: company name} for the keys the master knows (for
+        AliasIndex.for_universe).
+        """
+        out = {}
+        for key in instrument_keys:
+            row = self._find("key", key.encode(), self._keys)
+            if row is not None and self.records[row]["name"]:
+                out[key] = self.records[row]["name"].decode()
+        return out
+
+    def select(self, segment=None, instrument_type=None):
+        """
+        Instrument keys of every instrument in a segment and/or of a type,
+        e.g. select("NSE_EQ", "EQ"), as one vectorized scan. Types are the
+        JSON master's (EQ, FUT, CE, PE, INDEX) whatever the source format.
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        if segment:
+            mask &= self.records["segment"] == segment.encode()
+        if instrument_type:
+            mask &= self.records["instrument_type"] == instrument_type.encode()
+        return [key.decode() for key in self.records["instrument_key"][mask].tolist()]
+
+
+def resolve_universe(config):
+    """
+    Replace config["TRADING_SYMBOL_LIST"] entries (symbols, ISINs or keys) by
+    instrument keys when an instrument master is configured. Returns the
+    master (or None); raises KeyError for symbols it doesn't know.
+    """
+    master = InstrumentMaster.from_config(config)
+    if master is not None:
+        config["TRADING_SYMBOL_LIST"] = master.instrument_keys(config["TRADING_SYMBOL_LIST"])
+        logger.info(f"Instrument master: {len(master)} instruments, universe resolved.")
+    return master
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local instrument master store.")
+    parser.add_argument("--store", default="data/instruments", help="Store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Parse an Upstox instruments file (CSV / JSON, optionally .gz)")
+    build.add_argument("source")
+    lookup = commands.add_parser("lookup", help="Resolve symbols, ISINs or instrument keys")
+    lookup.add_argument("names", nargs="+")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "build":
+        InstrumentMaster.build(args.source, args.store)
+    else:
+        master = InstrumentMaster(args.store)
+        for name, instrument in zip(args.names, master.lookup_many(args.names)):
+            print(f"{name:<24} {instrument}")
@@ -1,116 +1,176 @@
 import logging
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
-from textblob import TextBlob
+import time
+from concurrent.futures import ProcessPoolExecutor
 import datetime
+from sentiment_lexicon import KeywordScorer, ScoreCache
+from sentiment_index import AliasIndex, SentimentIndex
+from news_fetcher import NewsFetcher, NewsSource, extract_headlines, MONEYCONTROL_RULES, ECONOMICTIMES_RULES
 
 logger = logging.getLogger("Intelligence")
 
+
+# Worker process state: one scorer whose headline cache survives between scrapes
+_worker_brain = None
+
+
+def _init_worker(lexicon_path, cache_size, aliases):
+    global _worker_brain
+    _worker_brain = IntelligenceModule(lexicon_path, cache_size, workers=0, aliases=aliases)
+
+
+def _parse_and_score(pages):
+    return _worker_brain.parse_and_score(pages)
+
+
 class IntelligenceModule:
-    def __init__(self):
-        self.news_sources = [
-            "https://www.moneycontrol.com/news/business/markets/",
-            "https://economictimes.indiatimes.com/markets/stocks/news",
+    def __init__(self, lexicon_path=None, cache_size=4096, workers=1, news_sources=None, aliases=None,
+                 half_life=1800.0, clock=time.time):
+        self.news_sources = news_sources or [
+            NewsSource("moneycontrol", "https://www.moneycontrol.com/news/business/markets/",
+                       rules=MONEYCONTROL_RULES),
+            NewsSource("economictimes", "https://economictimes.indiatimes.com/markets/stocks/news",
+                       rules=ECONOMICTIMES_RULES),
         ]
+        self.news = NewsFetcher(self.news_sources)
+        # Strategy-facing view of the sentiment index: {"market": v, instrument_key: v}
         self.sentiment_cache = {}
+        self.aliases = aliases or AliasIndex()
+        self.index = SentimentIndex(half_life, clock)
+        self._seen = {}        # source name -> headline hashes on its previous page (parser side)
+        self.keyword_scorer = KeywordScorer.from_file(lexicon_path) if lexicon_path else KeywordScorer()
+        self.score_cache = ScoreCache(cache_size)
+
+        # HTML parsing + NLP run in a worker process so a scrape never stalls
+        # the trading event loop (workers=0: parse inline)
+        self.lexicon_path = lexicon_path
+        self.cache_size = cache_size
+        self.workers = workers
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.lexicon_path, self.cache_size, self.aliases),
+            )
+        return self._pool
 
-    async def fetch_url(self, session, url):
-        try:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.warning(f"Failed to fetch {url}: Status {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
+    async def close(self):
+        await self.news.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     def analyze_sentiment(self, text):
         """
         Analyze sentiment using TextBlob + Financial Keyword Dictionary.
+        Scores are memoized per headline, so a re-scraped headline costs one
+        cache lookup instead of a TextBlob parse.
         """
         if not text:
             return 0.0
-            
-        text_lower = text.lower()
-        score = 0.0
-        
-        # 1. Financial Keyword Dictionary (The "Edge")
-        # Standard NLP often fails on jargon like "Guidance cut" or "Beat estimates"
-        keywords = {
-            # Positive
-            "surge": 0.5, "jump": 0.5, "high": 0.3, "gain": 0.4, "bull": 0.5,
-            "buy": 0.4, "outperform": 0.6, "beat": 0.6, "profit": 0.4,
-            "upgrade": 0.7, "acquisition": 0.4, "growth": 0.3, "record": 0.5,
-            # Negative
-            "slump": -0.5, "drop": -0.4, "fall": -0.4, "loss": -0.5, "bear": -0.5,
-            "sell": -0.4, "underperform": -0.6, "miss": -0.6, "debt": -0.3,
-            "downgrade": -0.7, "lawsuit": -0.8, "investigation": -0.8, "crash": -0.9
-        }
-        
-        # Keyword matching
-        for word, val in keywords.items():
-            if word in text_lower:
-                score += val
-        
+
+        cached = self.score_cache.get(text)
+        if cached is not None:
+            return cached
+
+        # 1. Financial Keyword Dictionary (The "Edge"), compiled once
+        score = self.keyword_scorer.score(text)
+
         # 2. Base NLP (TextBlob) as baseline
+        from textblob import TextBlob  # Deferred: NLTK import is slow and only scoring needs it
         blob_score = TextBlob(text).sentiment.polarity
-        
+
         # Weighted Average: Keywords matter more (70%) than generic NLP (30%)
         final_score = (score * 0.7) + (blob_score * 0.3)
-        
+
         # Clamp between -1 and 1
-        return max(-1.0, min(1.0, final_score))
+        final_score = max(-1.0, min(1.0, final_score))
+        self.score_cache.put(text, final_score)
+        return final_score
 
     async def scrape_news(self):
         """
-        Scrape news from defined sources and calculate aggregate sentiment.
+        Poll the news sources that are due and update the aggregate sentiment
+        from the pages that changed.
         """
-        logger.info("Scraping news for market sentiment...")
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.fetch_url(session, url) for url in self.news_sources]
-            responses = await asyncio.gather(*tasks)
-
-        headlines = []
-        for html in responses:
-            if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                # MoneyControl specific parsing (example)
-                for item in soup.find_all('h2'):
-                    headlines.append(item.get_text().strip())
-                # Economic Times specific parsing (example)
-                for item in soup.find_all('div', class_='eachStory'):
-                     h3 = item.find('h3')
-                     if h3:
-                         headlines.append(h3.get_text().strip())
-
-        # Filter empty
-        headlines = [h for h in headlines if len(h) > 10]
-        
-        total_sentiment = 0.0
-        count = 0
-        
-        logger.info(f"Found {len(headlines)} headlines.")
-        
-        for headline in headlines:
-            score = self.analyze_sentiment(headline)
-            if score != 0:
-                total_sentiment += score
-                count += 1
-                # logger.debug(f"Headline: {headline[:50]}... | Score: {score}")
-
-        market_sentiment = total_sentiment / count if count > 0 else 0.0
-        logger.info(f"Market Sentiment Score: {market_sentiment:.4f} (based on {count} headlines)")
-        
+        changed = await self.news.fetch_due()
+        if changed:
+            pages = [(source.name, html, source.rules) for source, html in changed]
+            if self.workers:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self._get_pool(), _parse_and_score, pages)
+            else:
+                results = self.parse_and_score(pages)
+
+            now = self.index.clock()
+            new_headlines = tagged = 0
+            for (source, _), result in zip(changed, results):
+                self.news.record_parse(source, result["parse_seconds"])
+                for headline, score, instruments in result["new"]:
+                    if score != 0:
+                        self.index.add(score, instruments, now)
+                        tagged += bool(instruments)
+                new_headlines += len(result["new"])
+            logger.info(f"{len(changed)} news pages changed, {new_headlines} new headlines "
+                        f"({tagged} mention an instrument).")
+
+        # Publish decayed values (one dict swap; readers never see a partial update)
+        self.sentiment_cache = self.index.snapshot()
+        market_sentiment = self.sentiment_cache.get("market", 0.0)
+        logger.info(f"Market Sentiment Score: {market_sentiment:.4f} "
+                    f"({len(self.sentiment_cache) - 1} instruments with news)")
+
         return market_sentiment
 
+    def parse_and_score(self, pages):
+        """
+        CPU-bound half of scrape_news: extract and score the headlines of
+        changed pages, given as (source name, html, extractor rules).
+        Returns one dict per page: the headlines not on the source's previous
+        page as (headline, score, instrument keys) in "new", the page's
+        sentiment "total" over "count" scored headlines, and "parse_seconds".
+        """
+        results = []
+        for name, html, rules in pages:
+            start = time.perf_counter()
+            # Filter empty
+            headlines = [h for h in extract_headlines(html, rules) if len(h) > 10]
+
+            previous = self._seen.get(name, set())
+            current = set()
+            new = []
+            total_sentiment = 0.0
+            count = 0
+            for headline in headlines:
+                score = self.analyze_sentiment(headline)
+                if score != 0:
+                    total_sentiment += score
+                    count += 1
+                key = hash(headline)
+                if key not in previous and key not in current:
+                    new.append((headline, score, self.aliases.match(headline)))
+                current.add(key)
+            self._seen[name] = current
+
+            results.append({
+                "new": new,
+                "total": total_sentiment,
+                "count": count,
+                "headlines": len(headlines),
+                "parse_seconds": time.perf_counter() - start,
+            })
+        return results
+
 # Test run
 if __name__ == "__main__":
     async def test():
         brain = IntelligenceModule()
         score = await brain.scrape_news()
         print(f"Final Sentiment: {score}")
+        print(brain.news.stats())
+        await brain.close()
     
     asyncio.run(test())
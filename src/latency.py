@@ -0,0 +1,158 @@
+import time
+from array import array
+import numpy as np
+
+now_ns = time.perf_counter_ns
+
+# Per-stage durations, each from the start of the stage (or from frame receipt
+# for decode / frame / tick_to_trade):
+STAGES = (
+    "decode",         # feed frame received -> Ticks decoded
+    "candle",         # CandleAggregator.on_ticks (per frame)
+    "risk",           # GodfatherStrategy.on_ticks: mark-to-market + SL/target bands (per frame)
+    "frame",          # feed frame received -> handed to the dispatcher (inline: every tick handler done)
+    "queue",          # feed frame received -> its ticks picked up for candle building (ordered queue wait)
+    "slot",           # oldest pending tick received -> latest-value ticks picked up for risk (conflation wait)
+    "indicator",      # bar close: indicator state updates for the universe
+    "signal",         # bar close: vectorized entry evaluation
+    "submit",         # order submitted -> handed to the gateway (rate-limit queue wait)
+    "ack",            # gateway request -> broker response
+    "tick_to_trade",  # feed frame received -> order handed to the gateway
+)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket log-linear histogram of nanosecond durations (HDR style).
+
+    Values below 2**sub_bits get a bucket each; above that, every power of
+    two is split into 2**sub_bits equal buckets, so a bucket is within
+    1 / 2**sub_bits (about 6% at the default 4 bits) of any value in it.
+
+    record() only appends the raw value; samples are bucketed with NumPy
+    'batch' at a time (and before any read), which keeps the hot path to
+    one array append.
+    """
+    def __init__(self, sub_bits=4, max_bits=40, batch=4096):
+        self.sub_bits = sub_bits
+        self.sub = 1 << sub_bits
+        self.batch = batch
+        self.counts = np.zeros(self.sub * (max_bits - sub_bits + 1), dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._pending = array("q")
+
+    def record(self, ns):
+        pending = self._pending
+        pending.append(ns)
+        if len(pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        values = np.maximum(np.frombuffer(self._pending, dtype=np.int64), 0)
+        self._pending = array("q")
+        _, bits = np.frexp(values.astype(np.float64))  # bits == int.bit_length() below 2**53
+        shift = np.maximum(bits.astype(np.int64) - self.sub_bits - 1, 0)
+        index = np.where(values < self.sub, values, ((shift + 1) << self.sub_bits) + (values >> shift) - self.sub)
+        self.counts += np.bincount(np.minimum(index, len(self.counts) - 1), minlength=len(self.counts))
+        self.count += len(values)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def bucket_high(self, i):
+        """
+        Largest value that falls in bucket i.
+        """
+        if i < self.sub:
+            return i
+        shift = (i >> self.sub_bits) - 1
+        mantissa = (i & (self.sub - 1)) + self.sub
+        return ((mantissa + 1) << shift) - 1
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile (0 < q <= 1), in ns.
+        """
+        self.flush()
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        i = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self.bucket_high(i), self.max)
+
+    def merge(self, other):
+        self.flush()
+        other.flush()
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self._pending = array("q")
+        self.counts[:] = 0
+        self.count = self.total = self.max = 0
+
+
+class LatencyRecorder:
+    """
+    One histogram per pipeline stage. Call sites take t = now_ns() at the start
+    of a stage and record(stage, t) at the end; with enabled=False record()
+    returns straight away, so instrumentation can be switched off at runtime.
+
+    frame_ns is the receive time of the feed frame being processed (0 when
+    none); orders submitted while it is set are attributed to that frame for
+    the tick_to_trade stage.
+    """
+    QUANTILES = ((0.5, "p50"), (0.9, "p90"), (0.99, "p99"), (0.999, "p999"))
+
+    def __init__(self, stages=STAGES, enabled=True):
+        self.enabled = enabled
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+        self.frame_ns = 0
+
+    def record(self, stage, start_ns):
+        if self.enabled:
+            self.histograms[stage].record(now_ns() - start_ns)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def snapshot(self):
+        """
+        {stage: {count, mean_us, p50_us, p90_us, p99_us, p999_us, max_us}}
+        """
+        out = {}
+        for stage, h in self.histograms.items():
+            h.flush()
+            row = {"count": h.count, "mean_us": round(h.total / h.count / 1e3, 2) if h.count else 0.0}
+            for q, label in self.QUANTILES:
+                row[f"{label}_us"] = round(h.percentile(q) / 1e3, 2)
+            row["max_us"] = round(h.max / 1e3, 2)
+            out[stage] = row
+        return out
+
+    def prometheus(self, name="nkbot_latency_seconds"):
+        """
+        Prometheus text exposition: one summary per stage.
+        """
+        gauge = name.replace("_seconds", "_enabled")
+        lines = [f"# HELP {name} Tick-to-trade pipeline stage latency.", f"# TYPE {name} summary"]
+        for stage, h in self.histograms.items():
+            h.flush()
+            for q, _ in self.QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {h.percentile(q) / 1e9:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.total / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        lines.append(f"# HELP {gauge} Latency instrumentation switched on.")
+        lines.append(f"# TYPE {gauge} gauge")
+        lines.append(f"{gauge} {int(self.enabled)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide recorder shared by the feed, candle, strategy and order paths
+LATENCY = LatencyRecorder()
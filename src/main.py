@@ -1,10 +1,21 @@
+import time
+_STARTED = time.perf_counter()  # Before the component imports below (--profile-startup)
 import logging
 import asyncio
+import argparse
 from config import load_config
 from upstox_client import UpstoxHandler
 from market_data import MarketDataStreamer
 from intelligence import IntelligenceModule
+from sentiment_index import AliasIndex
+from instruments import resolve_universe
+from history import HistoryWarmup, UpstoxHistorySource, seed
+from resync import StateResync
 from strategy import GodfatherStrategy
+from candles import CandleAggregator
+from tick_journal import TickJournal
+from sharding import ShardCoordinator
+from latency import LATENCY
 
 # Configure logging
 logging.basicConfig(
@@ -17,7 +28,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger("MAIN")
 
-async def main():
+
+class StartupProfile:
+    """
+    Wall-clock timing of the startup phases, from the first line of this
+    module to the first processed tick. Phases that overlap (feed connect and
+    session validation) are timed from their own start.
+    """
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.phases = []  # (name, start, end)
+
+    def mark(self, name, start=None):
+        """
+        End a phase: sequential phases start where the previous one ended.
+        """
+        end = time.perf_counter()
+        if start is None:
+            start, self.last = self.last, end
+        self.phases.append((name, start, end))
+
+    def report(self):
+        lines = ["Startup profile (ms):", f"  {'phase':<20} {'took':>9} {'done at':>9}"]
+        for name, start, end in self.phases:
+            lines.append(f"  {name:<20} {(end - start) * 1e3:9.1f} {(end - self.started) * 1e3:9.1f}")
+        return "\n".join(lines)
+
+
+async def main(profile_startup=False, profile_timeout=30.0):
+    profile = StartupProfile(_STARTED)
+    profile.mark("imports")
     logger.info("=== INITIALIZING HFT GODFATHER BOT ===")
     
     # 1. Load Configuration
@@ -27,61 +68,162 @@ async def main():
         logger.critical(f"Config Error: {e}")
         return
 
+    LATENCY.enabled = config["LATENCY_STATS"]
+    profile.mark("config")
+
+    # Symbols / ISINs -> instrument keys (feed subscriptions and orders use keys)
+    try:
+        instruments = resolve_universe(config)
+    except (KeyError, ValueError, OSError) as e:
+        logger.critical(f"Instrument Master Error: {e}")
+        return
+    profile.mark("instruments")
+
     # 2. Initialize Components
-    upstox = UpstoxHandler(config)
-    brain = IntelligenceModule()
+    upstox = UpstoxHandler(config, instruments)
+    brain = IntelligenceModule(
+        config.get("SENTIMENT_LEXICON"),
+        aliases=AliasIndex.for_universe(config["TRADING_SYMBOL_LIST"],
+                                        names=instruments.names(config["TRADING_SYMBOL_LIST"]) if instruments else None,
+                                        alias_path=config.get("SENTIMENT_ALIASES")),
+        half_life=config["SENTIMENT_HALF_LIFE"],
+    )
     market_data = MarketDataStreamer(config)
-    
-    # 3. Authenticate
-    if not upstox.validate_session():
-        logger.error("Authentication Failed. Please run 'python src/auth_flow.py' first.")
+    profile.mark("components")
+
+    # Sharded mode: N worker processes, each with its own feed connection and
+    # strategy over a slice of the universe; this process keeps the news
+    # scraper, the order path and global risk.
+    if config["FEED_SHARDS"] > 1:
+        coordinator = ShardCoordinator(config, upstox, brain)
+        logger.info(f"Starting {len(coordinator.shards)} feed shards...")
+        shards = asyncio.create_task(coordinator.run())
+        # 3. Authenticate while the shards start
+        if not await authenticate(upstox, profile):
+            shards.cancel()
+            return
+        # Fill the candle cache once here; the shards seed themselves from it
+        warmup = HistoryWarmup.from_config(config, UpstoxHistorySource(upstox.gateway))
+        if warmup:
+            warming = time.perf_counter()
+            await warmup.load(config["TRADING_SYMBOL_LIST"])
+            coordinator.warmed_up()
+            profile.mark("warm-up", warming)
+        asyncio.create_task(run_intelligence_loop(brain))
+        if profile_startup:
+            print(profile.report())
+            shards.cancel()
+            return
+        await shards
         return
-    else:
-        logger.info("Upstox Session Validated.")
 
     # 4. Initialize Strategy
     # We pass the 'upstox' handler to strategy for execution
     strategy = GodfatherStrategy(upstox, brain, config)
+    # Positions and forming signals switch their symbols to full feed mode
+    strategy.change_handlers.append(market_data.subscriptions.on_change)
     
-    # 5. Connect Brain (Start Background News Scraper)
-    asyncio.create_task(run_intelligence_loop(brain))
-    
-    # 6. Start Market Data Stream
-    # We need to hook the strategy's 'on_tick' to the market data stream
-    # For this simplified version, let's assume MarketDataStreamer calls a callback
-    # But since I implemented MarketDataStreamer with a loop, let's modify it or inject logic here.
-    
-    # Ideally, MarketDataStreamer should take a callback.
-    # Let's start the stream and handle ticks.
-    # Since we can't easily modify MarketDataStreamer's inner loop from here without passing callback,
-    # I should have added a callback to MarketDataStreamer. 
-    # For now, let's re-instantiate it properly or Monkey-Patch the on_message (Pythonic hack for speed).
-    
-    async def strategy_tick_callback(message):
-        # Decode message (assuming JSON for now per previous impl)
-        # In real V2, this is Protobuf.
-        # strategy.on_tick(decoded_tick)
-        pass 
-    
-    market_data.on_message = strategy.on_tick # Direct hook!
-    
+    # 5. Start Market Data Stream
+    # MarketDataStreamer decodes each Protobuf frame into a batch of Ticks.
+    # The candle builder turns them into bars (-> on_bar_close), the strategy
+    # uses them for risk management. Neither runs in the socket reader: the
+    # candle builder drains an ordered queue, risk gets the latest tick per symbol.
+    candles = CandleAggregator(strategy.timeframe, config["TRADING_SYMBOL_LIST"], on_close=strategy.on_bar_close)
+    market_data.tick_handlers.append(candles.on_ticks)
+    market_data.latest_handlers.append(strategy.on_ticks) # Risk acts on the freshest price per symbol
+    # Feed outages: bars they overlap are flagged partial; positions are guarded over
+    # REST meanwhile and orders / positions reconciled with the broker on reconnect
+    market_data.gap_handlers += [candles.mark_gap, strategy.on_gap]
+    resync = StateResync.from_config(config, upstox.gateway, strategy)
+    market_data.disconnect_handlers.append(resync.on_disconnect)
+    market_data.connect_handlers.append(resync.on_connect)
+    if config.get("JOURNAL_DIR"):
+        journal = TickJournal(config["JOURNAL_DIR"])
+        journal.start()
+        market_data.frame_handlers.append(journal.record_frame)
+        market_data.tick_handlers.append(journal.on_ticks)
+    asyncio.create_task(candles.run())
+    asyncio.create_task(strategy.risk.run())
+    profile.mark("strategy")
+
+    connecting = time.perf_counter()
+    first_tick = asyncio.Event()
+    market_data.connect_handlers.append(lambda: profile.mark("feed connected", connecting))
+
+    async def on_first_tick(ticks):
+        market_data.tick_handlers = [h for h in market_data.tick_handlers if h is not on_first_tick]
+        profile.mark("first tick", connecting)
+        first_tick.set()
+    market_data.tick_handlers.append(on_first_tick)
+
     logger.info("Starting Strategy Engine & Market Stream...")
-    await market_data.connect() # This blocks the main loop
+    feed = asyncio.create_task(market_data.connect())
+
+    # 3. Authenticate while the feed connects
+    if not await authenticate(upstox, profile, connecting):
+        feed.cancel()
+        return
+
+    # Seed candles and indicators from recent history (in front of any bars the
+    # feed has built meanwhile), so signals don't wait for min_bars live bars
+    warmup = HistoryWarmup.from_config(config, UpstoxHistorySource(upstox.gateway), strategy.timeframe)
+    if warmup:
+        warming = time.perf_counter()
+        intraday, _ = await warmup.load(config["TRADING_SYMBOL_LIST"])
+        seed(candles, strategy, intraday)
+        profile.mark("warm-up", warming)
 
-async def run_intelligence_loop(brain):
+    # 6. Connect Brain (Start Background News Scraper) once ticks flow, so its
+    # imports and parsing worker don't compete with the first ticks
+    asyncio.create_task(run_intelligence_loop(brain, first_tick))
+
+    if profile_startup:
+        try:
+            await asyncio.wait_for(first_tick.wait(), profile_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No tick within {profile_timeout:g}s.")
+        print(profile.report())
+        feed.cancel()
+        await upstox.gateway.close()
+        await brain.close()
+        return
+
+    await feed # This blocks the main loop
+
+async def authenticate(upstox, profile, start=None):
+    if not await upstox.validate_session_async():
+        logger.error("Authentication Failed. Please run 'python src/auth_flow.py' first.")
+        return False
+    logger.info("Upstox Session Validated.")
+    profile.mark("session validated", start)
+    return True
+
+async def run_intelligence_loop(brain, ready=None, max_wait=5.0):
     """
-    Periodically scrape news every 60 seconds.
+    Poll each news source on its own interval (60 seconds by default),
+    starting when 'ready' is set (or after max_wait seconds).
     """
+    if ready is not None:
+        try:
+            await asyncio.wait_for(ready.wait(), max_wait)
+        except asyncio.TimeoutError:
+            pass
     while True:
         try:
             await brain.scrape_news()
         except Exception as e:
             logger.error(f"Intelligence Loop Error: {e}")
-        await asyncio.sleep(60)
+        await asyncio.sleep(max(1.0, brain.news.seconds_until_due()))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HFT Godfather bot.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print a per-phase startup timing breakdown after the first tick and exit")
+    parser.add_argument("--profile-timeout", type=float, default=30.0,
+                        help="Give up waiting for the first tick after this many seconds")
+    args = parser.parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.profile_startup, args.profile_timeout))
     except KeyboardInterrupt:
         logger.info("Bot stopped by user.")
     except Exception as e:
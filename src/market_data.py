@@ -1,9 +1,9 @@
 import logging
 import asyncio
-import json
+import random
 import ssl
-from upstox_client.api_client import ApiClient
-from upstox_client.configuration import Configuration
+import time
+from collections import deque
 # upstox-python-sdk doesn't always expose the websocket client directly in a standardized way across versions.
 # We will use the V2 Feed API approach or the standard websocket URL if the SDK is limited.
 # For V2, Upstox recommends using the ProtoBuf format, but for simplicity in this initial version, 
@@ -12,17 +12,226 @@ from upstox_client.configuration import Configuration
 # using the 'websockets' library which is robust.
 
 import websockets
+from feed_decoder import FeedDecoder
+from subscriptions import SubscriptionManager
+from latency import LATENCY, now_ns
 
 logger = logging.getLogger("MarketData")
 
+# websockets >= 14 renamed connect(extra_headers=) to additional_headers=
+_HEADERS_KWARG = "additional_headers" if int(websockets.__version__.split(".")[0]) >= 14 else "extra_headers"
+
+
+class Backoff:
+    """
+    Jittered exponential backoff: the n-th retry in a row waits a uniform
+    random time up to min(cap, base * 2**n) seconds ("full jitter"). The
+    first retry comes within milliseconds; clients dropped by the same
+    outage don't all come back at the same instant.
+    """
+    def __init__(self, base=0.005, cap=5.0, rng=random.random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.attempts = 0
+
+    def next(self):
+        delay = min(self.cap, self.base * (1 << min(self.attempts, 30))) * self.rng()
+        self.attempts += 1
+        return delay
+
+    def reset(self):
+        self.attempts = 0
+
+
+def _is_open(websocket):
+    # State enum on both the legacy and the new websockets client
+    return getattr(getattr(websocket, "state", None), "name", None) == "OPEN"
+
+
+class TickDispatcher:
+    """
+    Hands decoded ticks from the socket reader to the handlers without
+    making the reader wait for them. Two paths, each drained by its own task:
+
+    - Ordered: every batch, in order, through a bounded queue to the
+      streamer's tick_handlers (candle building, journal). Batches that
+      would overflow the queue are dropped; the trade times they spanned
+      go through as a feed gap once the queue has room again, so the bars
+      missing those ticks are flagged partial (no entries on them).
+    - Latest: one slot per symbol holding its newest tick; the
+      latest_handlers (risk checks, mark-to-market) get the freshest tick
+      of every symbol that moved since their previous run. Ticks replaced
+      before the handlers got to them are counted as conflated.
+
+    Feed gaps (put_gap) go through the ordered queue, so the candle builder
+    hears of a gap after the last tick before it and before the first after.
+    """
+    def __init__(self, streamer, max_queue=10_000):
+        self.streamer = streamer
+        self.max_queue = max_queue
+        self.queue = deque()      # (receive ns, ticks)
+        self.latest = {}          # symbol -> newest undispatched Tick
+        self._latest_ns = 0       # Receive time of the newest tick in 'latest'
+        self._latest_since = 0    # Receive time of the oldest undispatched update in 'latest'
+        self._queued = asyncio.Event()
+        self._fresh = asyncio.Event()
+        self._tasks = []
+        self._dropped_span = None # (first, last) trade time of ticks dropped since the queue filled
+
+        self.ticks = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.queue_high = 0
+        self.max_queue_age_ns = 0
+        self.max_slot_age_ns = 0
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run_ordered()), asyncio.create_task(self._run_latest())]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def put(self, received, ticks):
+        """
+        Reader side: O(ticks), never awaits.
+        """
+        self.ticks += len(ticks)
+        queue = self.queue
+        if len(queue) < self.max_queue:
+            if self._dropped_span is not None:
+                self.put_gap(*self._dropped_span)
+                self._dropped_span = None
+            queue.append((received, ticks))
+            if len(queue) > self.queue_high:
+                self.queue_high = len(queue)
+            self._queued.set()
+        elif ticks:
+            now_ms = int(time.time() * 1000)
+            first = min(tick.ltt for tick in ticks) or now_ms
+            last = max(tick.ltt for tick in ticks) or now_ms
+            if self._dropped_span is None:
+                self.overflows += 1
+                logger.warning(f"Tick queue full ({self.max_queue} batches): dropping candle ticks")
+                self._dropped_span = (first, last)
+            else:
+                self._dropped_span = (min(self._dropped_span[0], first), max(self._dropped_span[1], last))
+            self.dropped += len(ticks)
+
+        latest = self.latest
+        if not latest:
+            self._latest_since = received
+        before = len(latest)
+        for tick in ticks:
+            latest[tick.symbol] = tick
+        self.conflated += len(ticks) - (len(latest) - before)
+        self._latest_ns = received
+        self._fresh.set()
+
+    def put_gap(self, start_ms, end_ms):
+        self.queue.append((None, (start_ms, end_ms)))  # Never dropped
+        self._queued.set()
+
+    async def _call(self, handlers, ticks):
+        for handler in handlers:
+            try:
+                await handler(ticks)
+            except Exception as e:
+                logger.error(f"Tick handler {getattr(handler, '__qualname__', handler)} failed: {e}")
+
+    async def _run_ordered(self):
+        queue = self.queue
+        while True:
+            if not queue:
+                self._queued.clear()
+                await self._queued.wait()
+                continue
+            received, ticks = queue.popleft()
+            if received is None:
+                self.streamer.notify_gap(*ticks)
+                continue
+            age = now_ns() - received
+            if age > self.max_queue_age_ns:
+                self.max_queue_age_ns = age
+            LATENCY.record("queue", received)
+            LATENCY.frame_ns = received
+            await self._call(self.streamer.tick_handlers, ticks)
+            LATENCY.frame_ns = 0
+
+    async def _run_latest(self):
+        while True:
+            if not self.latest:
+                self._fresh.clear()
+                await self._fresh.wait()
+                continue
+            ticks = list(self.latest.values())
+            self.latest = {}
+            received = self._latest_ns
+            age = now_ns() - self._latest_since
+            if age > self.max_slot_age_ns:
+                self.max_slot_age_ns = age
+            LATENCY.record("slot", self._latest_since)
+            LATENCY.frame_ns = received  # Orders are attributed to the freshest tick acted on
+            await self._call(self.streamer.latest_handlers, ticks)
+            LATENCY.frame_ns = 0
+
+    def stats(self):
+        oldest = next((received for received, _ in self.queue if received is not None), None)
+        return {
+            "ticks": self.ticks,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "overflows": self.overflows,
+            "queue": len(self.queue),
+            "queue_high": self.queue_high,
+            "queue_age_us": round((now_ns() - oldest) / 1e3, 1) if oldest is not None else 0.0,
+            "max_queue_age_us": round(self.max_queue_age_ns / 1e3, 1),
+            "max_slot_age_us": round(self.max_slot_age_ns / 1e3, 1),
+        }
+
+
 class MarketDataStreamer:
     def __init__(self, config):
         self.config = config
         self.api_version = '2.0'
         self.access_token = self.config.get("ACCESS_TOKEN")
-        self.websocket_url = "wss://api.upstox.com/v2/feed/market-data-feed"
+        self.websocket_url = self.config.get("UPSTOX_FEED_URL", "wss://api.upstox.com/v2/feed/market-data-feed")
         self.subscribed_symbols = self.config.get("TRADING_SYMBOL_LIST", [])
+        # Per-symbol feed modes: FEED_MODE (ltpc) unless held in full mode (positions, forming signals)
+        self.subscriptions = SubscriptionManager(self.subscribed_symbols, self.config.get("FEED_MODE", "ltpc"))
         self.running = False
+        self.decoder = FeedDecoder()
+        self.tick_handlers = [] # async callbacks(list[Tick]) with every tick in order: candle builders, journal
+        self.latest_handlers = [] # async callbacks(list[Tick]) with the newest tick per symbol: risk checks
+        self.frame_handlers = [] # sync, non-blocking callbacks(raw message), e.g. TickJournal.record_frame
+        self.connect_handlers = [] # sync callbacks() once connected and subscribed
+        self.disconnect_handlers = [] # sync callbacks() when the connection drops, e.g. StateResync.on_disconnect
+        self.gap_handlers = [] # sync callbacks(start_ms, end_ms) per feed outage (or dropped candle ticks), in tick order: candle builder
+        # Started by connect(); without it (replays, benchmarks) on_message runs the handlers inline
+        self.dispatcher = TickDispatcher(self, self.config.get("DISPATCH_QUEUE", 10_000))
+
+        # Reconnects: jittered backoff from FEED_RECONNECT_MIN up to FEED_RECONNECT_MAX seconds, and
+        # (FEED_STANDBY) a second connection kept open and authorized, promoted when the live one drops
+        self.backoff = Backoff(self.config.get("FEED_RECONNECT_MIN", 0.005), self.config.get("FEED_RECONNECT_MAX", 5.0))
+        self.use_standby = self.config.get("FEED_STANDBY", True)
+        self._standby = None
+        self._standby_taken = asyncio.Event()
+        self.last_frame_ns = 0
+        self._gap_since_ns = 0 # Last frame before the connection dropped (0: no gap pending)
+        self.connects = 0
+        self.disconnects = 0
+        self.promotions = 0
+        self.gaps = 0
+        self.last_gap_ms = 0.0
+        self.max_gap_ms = 0.0
         
     async def connect(self):
         """
@@ -47,45 +256,195 @@ class MarketDataStreamer:
         ssl_context = ssl.create_default_context()
         
         logger.info(f"Connecting to Market Data Stream: {self.websocket_url}")
-        
+        self.dispatcher.start()
+        try:
+            await self._connect_loop(headers)
+        finally:
+            self.dispatcher.stop()
+
+    async def _connect_loop(self, headers):
+        keeper = asyncio.create_task(self._keep_standby(headers)) if self.use_standby else None
+        try:
+            while True:
+                websocket = self._take_standby()
+                try:
+                    if websocket is None:
+                        websocket = await self._open(headers)
+                    else:
+                        logger.info("Promoting the standby connection.")
+                    await self._stream(websocket)
+                    error = "closed by the server"
+                except Exception as e:
+                    error = e
+                self._disconnected()
+                first = not self.backoff.attempts
+                delay = self.backoff.next()
+                if first and _is_open(self._standby):
+                    # Only straight after a connection that carried data: a server that
+                    # drops every connection gets the backoff, not a promotion loop
+                    logger.error(f"WebSocket Connection Failed: {error}. Switching to the standby connection.")
+                    continue
+                logger.error(f"WebSocket Connection Failed: {error}. Retrying in {delay * 1000:.0f}ms...")
+                await asyncio.sleep(delay)
+        finally:
+            if keeper is not None:
+                keeper.cancel()
+            if self._standby is not None:
+                await self._standby.close()
+                self._standby = None
+
+    async def _open(self, headers):
+        # Pings every FEED_PING_INTERVAL seconds: a silently dead connection is
+        # noticed within two intervals instead of the library's 40s default
+        ping = self.config.get("FEED_PING_INTERVAL", 1.0)
+        return await websockets.connect(self.websocket_url, ping_interval=ping, ping_timeout=2 * ping,
+                                        close_timeout=1.0, **{_HEADERS_KWARG: headers})
+
+    async def _stream(self, websocket):
+        try:
+            logger.info("Connected to WebSocket.")
+            self.running = True
+            self.connects += 1
+
+            # Subscribe to instruments
+            await self.subscribe_instruments(websocket)
+            for handler in self.connect_handlers:
+                handler()
+
+            backoff = self.backoff
+            async for message in websocket:
+                await self.on_message(message)
+                if backoff.attempts:
+                    backoff.reset() # Data is flowing: the next drop retries fast again
+        finally:
+            await websocket.close()
+
+    def _disconnected(self):
+        self.running = False
+        self.disconnects += 1
+        self.subscriptions.detach()
+        if self.last_frame_ns and not self._gap_since_ns:
+            self._gap_since_ns = self.last_frame_ns
+        for handler in self.disconnect_handlers:
+            handler()
+
+    def _take_standby(self):
+        websocket = self._standby
+        if websocket is None:
+            return None
+        self._standby = None
+        self._standby_taken.set()
+        if not _is_open(websocket):
+            return None
+        self.promotions += 1
+        return websocket
+
+    async def _keep_standby(self, headers):
+        """
+        Keep one spare connection open (handshake and authorization done,
+        nothing subscribed); replace it when it is promoted or drops.
+        """
+        backoff = Backoff(self.backoff.base, self.backoff.cap) # Reset only by a promotion
         while True:
+            if self._standby is None:
+                try:
+                    self._standby = await self._open(headers)
+                except Exception as e:
+                    delay = backoff.next()
+                    logger.warning(f"Standby connection failed: {e}. Retrying in {delay * 1000:.0f}ms...")
+                    await asyncio.sleep(delay)
+                    continue
+            standby = self._standby
+            self._standby_taken.clear()
+            waits = [asyncio.create_task(self._standby_taken.wait()), asyncio.create_task(standby.wait_closed())]
             try:
-                async with websockets.connect(self.websocket_url, extra_headers=headers) as websocket:
-                    logger.info("Connected to WebSocket.")
-                    self.running = True
-                    
-                    # Subscribe to instruments
-                    await self.subscribe_instruments(websocket)
-                    
-                    async for message in websocket:
-                         await self.on_message(message)
-                         
-            except Exception as e:
-                logger.error(f"WebSocket Connection Failed: {e}. Retrying in 5s...")
-                await asyncio.sleep(5)
+                await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in waits:
+                    task.cancel()
+            if self._standby is standby:
+                # Dropped while idle: the server may be refusing connections
+                self._standby = None
+                delay = backoff.next()
+                logger.warning(f"Standby connection dropped. Reopening in {delay * 1000:.0f}ms...")
+                await asyncio.sleep(delay)
+            else:
+                backoff.reset()
 
     async def subscribe_instruments(self, websocket):
         """
-        Send subscription payload.
+        Send subscription payload: the whole subscription set, one sub per
+        mode. Later mode changes go out as diffs on the same connection.
         """
-        # Example payload for V2
-        payload = {
-            "guid": "some_guid",
-            "method": "sub",
-            "data": {
-                "instrumentKeys": self.subscribed_symbols,
-                "mode": "full"
-            }
-        }
-        await websocket.send(json.dumps(payload).encode('utf-8'))
-        logger.info(f"Subscribed to: {self.subscribed_symbols}")
+        await self.subscriptions.attach(websocket)
 
     async def on_message(self, message):
         """
         Handle incoming market data.
+        Binary frames are V2 FeedResponse protobufs; one frame carries many
+        instruments and is handed to the strategy as a single batch.
+        """
+        if isinstance(message, str):
+            # Text frames are control/ack messages, not market data
+            return
+        received = LATENCY.frame_ns = self.last_frame_ns = now_ns()
+        if self._gap_since_ns:
+            self._end_gap(received)
+
+        for handler in self.frame_handlers:
+            handler(message)
+
+        try:
+            ticks = self.decoder.decode(message)
+        except Exception as e:
+            logger.error(f"Failed to decode feed frame ({len(message)} bytes): {e}")
+            return
+        LATENCY.record("decode", received)
+
+        if ticks:
+            if self.dispatcher.running:
+                self.dispatcher.put(received, ticks)
+            else:
+                for handler in self.tick_handlers:
+                    await handler(ticks)
+                for handler in self.latest_handlers:
+                    await handler(ticks)
+        LATENCY.record("frame", received)
+        LATENCY.frame_ns = 0
+
+    def _end_gap(self, received):
+        """
+        First frame after a reconnect: the feed was silent since the last
+        frame before the drop. Tells the gap_handlers (in tick order).
         """
-        # TODO: Implement Protobuf decoding for V2
-        # For now, just logging the size or raw info
-        # logger.info(f"Received tick: {len(message)} bytes")
-        pass
+        gap_ms = (received - self._gap_since_ns) / 1e6
+        self._gap_since_ns = 0
+        end_ms = int(time.time() * 1000)
+        self.gaps += 1
+        self.last_gap_ms = gap_ms
+        self.max_gap_ms = max(self.max_gap_ms, gap_ms)
+        logger.warning(f"Feed gap: {gap_ms:.1f}ms without data")
+        if self.dispatcher.running:
+            self.dispatcher.put_gap(end_ms - int(gap_ms), end_ms)
+        else:
+            self.notify_gap(end_ms - int(gap_ms), end_ms)
+
+    def notify_gap(self, start_ms, end_ms):
+        for handler in self.gap_handlers:
+            try:
+                handler(start_ms, end_ms)
+            except Exception as e:
+                logger.error(f"Gap handler failed: {e}")
+
+    def stats(self):
+        return {
+            "connected": self.running,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "standby": _is_open(self._standby),
+            "promotions": self.promotions,
+            "gaps": self.gaps,
+            "last_gap_ms": round(self.last_gap_ms, 1),
+            "max_gap_ms": round(self.max_gap_ms, 1),
+        }
 
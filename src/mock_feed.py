@@ -0,0 +1,233 @@
+import logging
+import asyncio
+import argparse
+import json
+import multiprocessing
+import random
+import time
+import websockets
+from feed_decoder import Tick, encode_feed_response, FEED_TYPE_INITIAL, FEED_TYPE_LIVE
+
+logger = logging.getLogger("MockFeed")
+
+
+class MockFeedServer:
+    """
+    Local stand-in for the Upstox V2 market data feed WebSocket.
+
+    Clients send the usual sub / unsub / change_mode messages; each
+    connection then receives FeedResponse frames for its subscribed
+    instruments ('ticks_per_frame' instruments per frame, rotating through
+    the subscription) at 'frame_rate' frames per second. Prices follow a
+    random walk per instrument ('volatility' per tick; set_price() moves
+    one). Point UPSTOX_FEED_URL at ws://host:port/.
+
+    Encoding full-mode ticks in Python is far slower than decoding them, so
+    for scaling tests precompute=N encodes N ticks per instrument up front
+    and replays them in a loop. reuse_port=True lets several server
+    processes share one port (the kernel spreads connections across them).
+
+    For reconnect tests it can be flaky: drop() cuts connections (all of
+    them, or only those with subscriptions, leaving idle standbys up) and
+    refuses new ones for 'down' seconds; drop_every > 0 does that on a timer.
+    """
+    def __init__(self, host="127.0.0.1", port=0, frame_rate=10.0, ticks_per_frame=50, seed=1,
+                 precompute=0, reuse_port=False, drop_every=0.0, downtime=0.0, drop_subscribed=False,
+                 volatility=0.0005):
+        self.host = host
+        self.port = port
+        self.frame_rate = frame_rate
+        self.ticks_per_frame = ticks_per_frame
+        self.precompute = precompute
+        self.reuse_port = reuse_port
+        self.volatility = volatility
+        self.drop_every = drop_every
+        self.downtime = downtime
+        self.drop_subscribed = drop_subscribed
+        self._live = {}             # websocket -> its subscriptions
+        self._down_until = 0.0
+        self._flaky = None
+        self.rng = random.Random(seed)
+        self._prices = {}  # symbol -> [ltp, vtt]
+        self._rings = {}   # (symbol, mode) -> [pre-encoded entries, next index]
+        self._header = encode_feed_response([], feed_type=FEED_TYPE_LIVE)
+        self._server = None
+
+        # Stats
+        self.connections = 0
+        self.frames_sent = 0
+        self.ticks_sent = 0
+        self.drops = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port, reuse_port=self.reuse_port or None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Mock feed listening on {self.url}")
+        if self.drop_every > 0:
+            self._flaky = asyncio.create_task(self._drop_periodically())
+
+    async def stop(self):
+        if self._flaky is not None:
+            self._flaky.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop(self, down=0.0, subscribed_only=False):
+        """
+        Cut connections without a close handshake (as a network failure
+        would) and refuse new ones for 'down' seconds.
+        """
+        self._down_until = time.monotonic() + down
+        dropped = 0
+        for websocket, subscribed in list(self._live.items()):
+            if subscribed or not subscribed_only:
+                websocket.transport.abort()
+                dropped += 1
+        self.drops += 1
+        logger.info(f"Dropped {dropped} connections (down for {down:g}s)")
+        return dropped
+
+    async def _drop_periodically(self):
+        while True:
+            await asyncio.sleep(self.drop_every)
+            self.drop(self.downtime, self.drop_subscribed)
+
+    def set_price(self, symbol, ltp):
+        self._prices.setdefault(symbol, [ltp, 0])[0] = ltp
+
+    def _tick(self, symbol, now_ms):
+        state = self._prices.get(symbol)
+        if state is None:
+            state = self._prices[symbol] = [self.rng.uniform(100, 3000), 0]
+        state[0] = round(state[0] * (1 + self.rng.gauss(0, self.volatility)), 2)
+        qty = self.rng.randint(1, 500)
+        state[1] += qty
+        return Tick(symbol, ltp=state[0], ltt=now_ms, ltq=qty, cp=state[0] * 0.99, vtt=state[1], oi=0.0, atp=state[0])
+
+    def _entry(self, symbol, mode, now_ms):
+        """
+        One instrument's encoded feed entry; frames are the header plus entries.
+        """
+        if not self.precompute:
+            return encode_feed_response([self._tick(symbol, now_ms)], mode=mode, feed_type=0)
+        ring = self._rings.get((symbol, mode))
+        if ring is None:
+            ring = self._rings[(symbol, mode)] = [
+                [encode_feed_response([self._tick(symbol, now_ms + i)], mode=mode, feed_type=0)
+                 for i in range(self.precompute)], 0]
+        entries, i = ring
+        ring[1] = (i + 1) % len(entries)
+        return entries[i]
+
+    async def _handle(self, websocket, *args):
+        if time.monotonic() < self._down_until:
+            websocket.transport.abort()
+            return
+        self.connections += 1
+        subscribed = {}  # symbol -> mode, in subscription order
+        self._live[websocket] = subscribed
+        sender = asyncio.create_task(self._stream(websocket, subscribed))
+        try:
+            async for message in websocket:
+                try:
+                    request = json.loads(message)
+                    keys = request.get("data", {}).get("instrumentKeys", [])
+                    method = request.get("method")
+                    mode = request.get("data", {}).get("mode", "full")
+                except (ValueError, AttributeError):
+                    continue
+                if method == "sub":
+                    fresh = [k for k in keys if k not in subscribed]
+                    subscribed.update((k, mode) for k in keys)
+                    if fresh:
+                        # Snapshot for newly subscribed instruments, like the live feed
+                        now_ms = int(time.time() * 1000)
+                        await websocket.send(encode_feed_response(
+                            [self._tick(k, now_ms) for k in fresh], mode=mode, feed_type=FEED_TYPE_INITIAL))
+                elif method == "unsub":
+                    for k in keys:
+                        subscribed.pop(k, None)
+                elif method == "change_mode":
+                    for k in keys:
+                        if k in subscribed:
+                            subscribed[k] = mode
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            sender.cancel()
+            self._live.pop(websocket, None)
+            self.connections -= 1
+
+    async def _stream(self, websocket, subscribed):
+        interval = 1.0 / self.frame_rate
+        cursor = 0
+        next_send = time.monotonic()
+        try:
+            while True:
+                next_send += interval
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    await asyncio.sleep(0)  # Behind schedule: still let other connections run
+                    if delay < -1.0:
+                        next_send = time.monotonic()  # Fell behind (slow client); don't burst
+                if not subscribed:
+                    continue
+                symbols = list(subscribed)
+                n = min(self.ticks_per_frame, len(symbols))
+                batch = [symbols[(cursor + i) % len(symbols)] for i in range(n)]
+                cursor = (cursor + n) % len(symbols)
+                now_ms = int(time.time() * 1000)
+                entries = [self._entry(s, subscribed[s], now_ms) for s in batch if s in subscribed]
+                if entries:
+                    await websocket.send(self._header + b"".join(entries))
+                    self.frames_sent += 1
+                    self.ticks_sent += len(entries)
+        except (websockets.ConnectionClosed, asyncio.CancelledError):
+            pass
+
+
+def serve_forever(port, frame_rate=10.0, ticks_per_frame=50, precompute=0, reuse_port=False, seed=1, **flaky):
+    """
+    Run a MockFeedServer until the process is killed (multiprocessing target).
+    """
+    async def serve():
+        server = MockFeedServer(port=port, frame_rate=frame_rate, ticks_per_frame=ticks_per_frame,
+                                seed=seed, precompute=precompute, reuse_port=reuse_port, **flaky)
+        await server.start()
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock Upstox market data feed.")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--frame-rate", type=float, default=10.0, help="Frames per second per connection")
+    parser.add_argument("--ticks-per-frame", type=int, default=50)
+    parser.add_argument("--precompute", type=int, default=0, help="Pre-encoded ticks per instrument (0: live)")
+    parser.add_argument("--processes", type=int, default=1, help="Server processes sharing the port")
+    parser.add_argument("--drop-every", type=float, default=0.0, help="Cut connections every N seconds (0: never)")
+    parser.add_argument("--downtime", type=float, default=0.0, help="Refuse connections for N seconds after a cut")
+    parser.add_argument("--drop-subscribed", action="store_true", help="Only cut connections with subscriptions")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    reuse = args.processes > 1
+    flaky = {"drop_every": args.drop_every, "downtime": args.downtime, "drop_subscribed": args.drop_subscribed}
+    extra = [multiprocessing.Process(target=serve_forever, daemon=True, kwargs=flaky,
+                                     args=(args.port, args.frame_rate, args.ticks_per_frame, args.precompute, True, i + 2))
+             for i in range(args.processes - 1)]
+    for p in extra:
+        p.start()
+    serve_forever(args.port, args.frame_rate, args.ticks_per_frame, args.precompute, reuse, **flaky)
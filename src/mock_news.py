@@ -0,0 +1,94 @@
+import logging
+import asyncio
+import argparse
+import hashlib
+import os
+from email.utils import formatdate
+from aiohttp import web
+
+logger = logging.getLogger("MockNews")
+
+
+class MockNewsServer:
+    """
+    Local stand-in for the news sites. Serves pages set with set_page() at
+    http://host:port/<name>, with an ETag and Last-Modified per version and
+    304 responses to matching conditional requests. conditional=False
+    ignores validators (always 200), like sites without cache support.
+    """
+    def __init__(self, pages=None, host="127.0.0.1", port=0, conditional=True):
+        self.host = host
+        self.port = port
+        self.conditional = conditional
+        self.pages = {}  # name -> (body bytes, etag, last_modified)
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._runner = None
+        for name, html in (pages or {}).items():
+            self.set_page(name, html)
+
+        self.app = web.Application()
+        self.app.router.add_get("/{name}", self.page)
+
+    def url(self, name):
+        return f"http://{self.host}:{self.port}/{name}"
+
+    def set_page(self, name, html):
+        body = html.encode("utf-8")
+        version = self.pages.get(name, (None, None, None))
+        if version[0] == body:
+            return
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self.pages[name] = (body, etag, formatdate(usegmt=True))
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Mock news listening on http://{self.host}:{self.port}/")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def page(self, request):
+        self.requests += 1
+        version = self.pages.get(request.match_info["name"])
+        if version is None:
+            return web.Response(status=404)
+        body, etag, last_modified = version
+        if self.conditional:
+            if request.headers.get("If-None-Match") == etag or (
+                    "If-None-Match" not in request.headers
+                    and request.headers.get("If-Modified-Since") == last_modified):
+                self.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_modified})
+            headers = {"ETag": etag, "Last-Modified": last_modified}
+        else:
+            headers = {}
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="text/html", charset="utf-8", headers=headers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved *.html news pages with ETag support.")
+    parser.add_argument("pages", help="Directory of *.html pages")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--no-conditional", action="store_true", help="Never answer 304")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        pages = {}
+        for name in sorted(os.listdir(args.pages)):
+            if name.endswith(".html"):
+                with open(os.path.join(args.pages, name), encoding="utf-8", errors="replace") as f:
+                    pages[name] = f.read()
+        server = MockNewsServer(pages, port=args.port, conditional=not args.no_conditional)
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
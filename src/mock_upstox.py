@@ -0,0 +1,212 @@
+import logging
+import asyncio
+import argparse
+import itertools
+import time
+import zlib
+import numpy as np
+from aiohttp import web
+
+logger = logging.getLogger("MockUpstox")
+
+_IST_MS = 19_800_000
+_DAY_MS = 86_400_000
+_SESSION_OPEN_MS = (9 * 60 + 15) * 60_000  # 09:15 IST
+_SESSION_BARS = {"1minute": 375, "30minute": 13}
+
+
+def _day_number(date):
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def synthetic_candle_rows(instrument_key, interval, day, until_ms=None):
+    """
+    Deterministic random-walk candles for one session (IST day number), in
+    the Upstox response shape: [[timestamp, open, high, low, close, volume, 0], ...]
+    newest first. Weekends have none; until_ms cuts the session short.
+    """
+    if (day + 3) % 7 >= 5:
+        return []
+    seed = zlib.crc32(instrument_key.encode())
+    rng = np.random.default_rng([seed, day, zlib.crc32(interval.encode())])
+    base = 100 + seed % 2900
+    start = day * _DAY_MS + _SESSION_OPEN_MS - _IST_MS
+    if interval == "day":
+        ts = np.array([start], dtype=np.int64)
+        step = 375
+    else:
+        n = _SESSION_BARS.get(interval, 375)
+        step = 375 // n
+        ts = start + np.arange(n, dtype=np.int64) * step * 60_000
+    if until_ms is not None:
+        ts = ts[ts + step * 60_000 <= until_ms]
+    n = len(ts)
+    if not n:
+        return []
+    close = base * (1 + 0.01 * np.sin(day)) * np.exp(np.cumsum(rng.normal(0, 0.0012 * step ** 0.5, n)))
+    spread = close * rng.uniform(0.0003, 0.002, n)
+    high = close + spread * rng.random(n)
+    low = close - spread * rng.random(n)
+    open_ = low + (high - low) * rng.random(n)
+    volume = rng.integers(1_000, 20_000, n) * step
+    stamps = (ts + _IST_MS).astype("datetime64[ms]").astype("datetime64[s]").astype(str)
+    rows = [[f"{s}+05:30", round(o, 2), round(h, 2), round(l, 2), round(c, 2), int(v), 0]
+            for s, o, h, l, c, v in zip(stamps.tolist(), open_.tolist(), high.tolist(), low.tolist(),
+                                        close.tolist(), volume.tolist())]
+    return rows[::-1]
+
+
+class MockUpstoxServer:
+    """
+    Local stand-in for the Upstox REST API (orders, order book, positions,
+    LTP quotes, profile, candles). Orders fill immediately at the
+    instrument's price in 'prices' (set it to move the market).
+    Point UPSTOX_API_URL / UPSTOX_HFT_URL at http://host:port/v2 to run the
+    bot or the benchmarks against it.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, clock=time.time):
+        self.host = host
+        self.port = port
+        self.latency = latency  # Seconds added to every response
+        self.clock = clock      # 'Now' for intraday candles
+        self.orders = {}        # order_id -> order dict
+        self.prices = {}        # instrument key -> last price (default: a fixed per-instrument level)
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/v2/user/profile", self.profile)
+        self.app.router.add_post("/v2/order/place", self.place_order)
+        self.app.router.add_put("/v2/order/modify", self.modify_order)
+        self.app.router.add_delete("/v2/order/cancel", self.cancel_order)
+        self.app.router.add_get("/v2/order/retrieve-all", self.order_book)
+        self.app.router.add_get("/v2/portfolio/short-term-positions", self.positions)
+        self.app.router.add_get("/v2/market-quote/ltp", self.ltp)
+        self.app.router.add_get("/v2/historical-candle/intraday/{key}/{interval}", self.intraday_candles)
+        self.app.router.add_get("/v2/historical-candle/{key}/{interval}/{to_date}/{from_date}", self.historical_candles)
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v2"
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Mock Upstox listening on {self.base_url}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _respond(self, data, status=200):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if status != 200:
+            return web.json_response({"status": "error", "errors": [data]}, status=status)
+        return web.json_response({"status": "success", "data": data})
+
+    def _authorized(self, request):
+        return request.headers.get("Authorization", "").startswith("Bearer ")
+
+    async def profile(self, request):
+        if not self._authorized(request):
+            return await self._respond({"errorCode": "UDAPI100050", "message": "Invalid token"}, 401)
+        return await self._respond({"user_name": "MOCK USER", "user_id": "MOCK01", "is_active": True})
+
+    def price(self, instrument_key):
+        price = self.prices.get(instrument_key)
+        return price if price is not None else float(100 + zlib.crc32(instrument_key.encode()) % 2900)
+
+    async def place_order(self, request):
+        if not self._authorized(request):
+            return await self._respond({"errorCode": "UDAPI100050", "message": "Invalid token"}, 401)
+        body = await request.json()
+        order_id = f"MOCK{next(self._ids):012d}"
+        self.orders[order_id] = dict(body, order_id=order_id, status="complete", filled_quantity=body.get("quantity", 0),
+                                     average_price=self.price(body.get("instrument_token", "")))
+        return await self._respond({"order_id": order_id})
+
+    async def order_book(self, request):
+        return await self._respond(list(self.orders.values()))
+
+    async def positions(self, request):
+        """
+        Net day positions from the filled orders.
+        """
+        book = {}  # key -> [net qty, buy qty, buy value, sell qty, sell value]
+        for order in self.orders.values():
+            if order["status"] != "complete":
+                continue
+            entry = book.setdefault(order["instrument_token"], [0, 0, 0.0, 0, 0.0])
+            qty = order["filled_quantity"]
+            if order["transaction_type"] == "BUY":
+                entry[0] += qty
+                entry[1] += qty
+                entry[2] += qty * order["average_price"]
+            else:
+                entry[0] -= qty
+                entry[3] += qty
+                entry[4] += qty * order["average_price"]
+        rows = []
+        for key, (net, buy_qty, buy_value, sell_qty, sell_value) in book.items():
+            buy_price = buy_value / buy_qty if buy_qty else 0.0
+            sell_price = sell_value / sell_qty if sell_qty else 0.0
+            rows.append({"instrument_token": key, "quantity": net, "product": "I",
+                         "average_price": buy_price if net > 0 else sell_price if net < 0 else 0.0,
+                         "buy_price": buy_price, "sell_price": sell_price, "last_price": self.price(key),
+                         "day_buy_quantity": buy_qty, "day_sell_quantity": sell_qty})
+        return await self._respond(rows)
+
+    async def ltp(self, request):
+        keys = [k for k in request.query.get("instrument_key", "").split(",") if k]
+        return await self._respond({key.replace("|", ":"): {"instrument_token": key, "last_price": self.price(key)}
+                                    for key in keys})
+
+    async def modify_order(self, request):
+        body = await request.json()
+        order = self.orders.get(body.get("order_id"))
+        if order is None:
+            return await self._respond({"errorCode": "UDAPI100010", "message": "Order not found"}, 400)
+        order.update(body)
+        return await self._respond({"order_id": order["order_id"]})
+
+    async def historical_candles(self, request):
+        info = request.match_info
+        first, last = _day_number(info["from_date"]), _day_number(info["to_date"])
+        rows = []
+        for day in range(last, first - 1, -1):
+            rows += synthetic_candle_rows(info["key"], info["interval"], day)
+        return await self._respond({"candles": rows})
+
+    async def intraday_candles(self, request):
+        info = request.match_info
+        now = int(self.clock() * 1000)
+        rows = synthetic_candle_rows(info["key"], info["interval"], (now + _IST_MS) // _DAY_MS, until_ms=now)
+        return await self._respond({"candles": rows})
+
+    async def cancel_order(self, request):
+        order = self.orders.get(request.query.get("order_id"))
+        if order is None:
+            return await self._respond({"errorCode": "UDAPI100010", "message": "Order not found"}, 400)
+        order["status"] = "cancelled"
+        return await self._respond({"order_id": order["order_id"]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock Upstox REST server.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        server = MockUpstoxServer(port=args.port, latency=args.latency)
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
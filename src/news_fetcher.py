@@ -0,0 +1,173 @@
+import logging
+import asyncio
+import hashlib
+import time
+from collections import namedtuple
+
+logger = logging.getLogger("NewsFetcher")
+
+
+class ExtractRule(namedtuple("ExtractRule", ("tag", "class_", "child"), defaults=(None, None))):
+    """
+    One headline selector: every <tag class="class_"> on the page, taking the
+    text of its first <child> element (or of the element itself if child is None).
+    """
+
+
+# MoneyControl specific parsing (example)
+MONEYCONTROL_RULES = (ExtractRule("h2"),)
+# Economic Times specific parsing (example)
+ECONOMICTIMES_RULES = (ExtractRule("div", "eachStory", "h3"),)
+
+
+def extract_headlines(html, rules):
+    """
+    Headlines from one page. rules is a tuple of ExtractRule, or a callable
+    html -> list of headlines for pages the rules can't describe (it must be a
+    module-level function so it can be sent to the parsing worker).
+    """
+    if callable(rules):
+        return rules(html)
+    from bs4 import BeautifulSoup, SoupStrainer  # Deferred: only the parsing worker needs it
+    # Only build tree nodes for the tags the rules look at
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(sorted({rule.tag for rule in rules})))
+    headlines = []
+    for rule in rules:
+        for item in soup.find_all(rule.tag, class_=rule.class_) if rule.class_ else soup.find_all(rule.tag):
+            if rule.child:
+                item = item.find(rule.child)
+                if item is None:
+                    continue
+            headlines.append(item.get_text().strip())
+    return headlines
+
+
+class NewsSource:
+    """
+    A news page polled every 'interval' seconds and parsed with 'rules'.
+    Keeps the HTTP validators and body hash of the last version fetched.
+    """
+    def __init__(self, name, url, interval=60.0, rules=MONEYCONTROL_RULES):
+        self.name = name
+        self.url = url
+        self.interval = interval
+        self.rules = rules
+        self.etag = None
+        self.last_modified = None
+        self.body_hash = None
+        self.body_bytes = 0
+        self.next_due = 0.0
+        self.parse_seconds = 0.0  # Last parse time, reported back by the parser
+
+
+class NewsFetcher:
+    """
+    Conditional news page fetcher over one persistent session.
+
+    Sends If-None-Match / If-Modified-Since; a 304, or a 200 whose body hash
+    matches the previous version, returns nothing so the page is not parsed.
+    Each source is only fetched once its own interval has elapsed.
+    """
+    def __init__(self, sources, timeout=10.0, clock=time.monotonic):
+        self.sources = sources
+        self.timeout = timeout
+        self.clock = clock
+        self._session = None
+
+        # Stats
+        self.requests = 0
+        self.changed = 0
+        self.not_modified = 0   # 304 responses
+        self.unchanged = 0      # 200 with the same body as last time
+        self.errors = 0
+        self.bytes_fetched = 0
+        self.bytes_saved = 0           # Body bytes not transferred thanks to 304s
+        self.parse_seconds = 0.0
+        self.parse_seconds_saved = 0.0  # Estimated from each source's last parse time
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            import aiohttp  # Deferred to the first scrape (slow import)
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def seconds_until_due(self):
+        now = self.clock()
+        return max(0.0, min((source.next_due - now for source in self.sources), default=60.0))
+
+    async def fetch_due(self):
+        """
+        Fetch every source whose interval has elapsed.
+        Returns [(source, html)] for the pages that changed.
+        """
+        now = self.clock()
+        due = [source for source in self.sources if source.next_due <= now]
+        for source in due:
+            source.next_due = now + source.interval
+        if not due:
+            return []
+        await self.start()
+        pages = await asyncio.gather(*(self.fetch(source) for source in due))
+        return [(source, html) for source, html in zip(due, pages) if html is not None]
+
+    async def fetch(self, source):
+        """
+        The page's HTML if it changed since the last fetch, else None.
+        """
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+        self.requests += 1
+        try:
+            async with self._session.get(source.url, headers=headers) as response:
+                if response.status == 304:
+                    self.not_modified += 1
+                    self.bytes_saved += source.body_bytes
+                    self.parse_seconds_saved += source.parse_seconds
+                    return None
+                if response.status != 200:
+                    logger.warning(f"Failed to fetch {source.url}: Status {response.status}")
+                    self.errors += 1
+                    return None
+                body = await response.read()
+                encoding = response.get_encoding()
+                source.etag = response.headers.get("ETag")
+                source.last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            logger.error(f"Error fetching {source.url}: {e}")
+            self.errors += 1
+            return None
+
+        self.bytes_fetched += len(body)
+        source.body_bytes = len(body)
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if body_hash == source.body_hash:
+            self.unchanged += 1
+            self.parse_seconds_saved += source.parse_seconds
+            return None
+        source.body_hash = body_hash
+        self.changed += 1
+        return body.decode(encoding, errors="replace")
+
+    def record_parse(self, source, seconds):
+        source.parse_seconds = seconds
+        self.parse_seconds += seconds
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "changed": self.changed,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "bytes_fetched": self.bytes_fetched,
+            "bytes_saved": self.bytes_saved,
+            "parse_ms": round(self.parse_seconds * 1e3, 1),
+            "parse_ms_saved": round(self.parse_seconds_saved * 1e3, 1),
+        }
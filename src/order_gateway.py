@@ -0,0 +1,218 @@
+import logging
+import asyncio
+import json
+from urllib.parse import quote
+
+logger = logging.getLogger("OrderGateway")
+
+aiohttp = None  # Imported by start(): keeps it off the startup path until the first request
+
+
+def _import_aiohttp():
+    global aiohttp
+    if aiohttp is None:
+        import aiohttp as module
+        aiohttp = module
+    return aiohttp
+
+
+class OrderGateway:
+    """
+    Async Upstox order gateway.
+    One long-lived aiohttp session (keep-alive connection pool) for all
+    order traffic, with headers and order bodies pre-built once, so placing
+    an order is a dict copy + one pooled HTTP round-trip and never blocks the
+    event loop that consumes the market feed.
+    """
+    def __init__(self, config, pool_size=32, timeout=5.0):
+        self.config = config
+        self.api_url = config.get("UPSTOX_API_URL", "https://api.upstox.com/v2").rstrip("/")
+        self.hft_url = config.get("UPSTOX_HFT_URL", "https://api-hft.upstox.com/v2").rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self.set_access_token(config.get("ACCESS_TOKEN"))
+
+        # Request templates
+        self._place_url = f"{self.hft_url}/order/place"
+        self._modify_url = f"{self.hft_url}/order/modify"
+        self._cancel_url = f"{self.hft_url}/order/cancel"
+        self._profile_url = f"{self.api_url}/user/profile"
+        self._order_template = {
+            "quantity": 0,
+            "product": "I",  # I = Intraday, D = Delivery
+            "validity": "DAY",
+            "price": 0.0,
+            "tag": "NKBot_Algo",
+            "instrument_token": "",
+            "order_type": "MARKET",
+            "transaction_type": "",
+            "disclosed_quantity": 0,
+            "trigger_price": 0.0,
+            "is_amo": False,
+        }
+
+    def set_access_token(self, access_token):
+        self.access_token = access_token
+        self._headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Api-Version": "2.0",
+        }
+
+    async def start(self):
+        """
+        Open the connection pool (idempotent).
+        """
+        if self.session is None or self.session.closed:
+            _import_aiohttp()
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def warm_up(self, connections=4):
+        """
+        Pre-open pooled connections (TLS handshake included) before the first order.
+        """
+        await asyncio.gather(*[self.validate_session() for _ in range(connections)])
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, method, url, body=None, params=None):
+        """
+        Send one request on the pooled session. Returns the response 'data'
+        on success, None on any failure (logged).
+        """
+        if not self.access_token:
+            logger.error(f"Cannot call {url}: No Access Token.")
+            return None
+        if self.session is None:
+            await self.start()
+
+        data = json.dumps(body) if body is not None else None
+        try:
+            async with self.session.request(method, url, data=data, params=params, headers=self._headers) as response:
+                payload = await response.json(content_type=None)
+                if response.status == 200 and payload.get("status") == "success":
+                    return payload.get("data")
+                logger.error(f"{method} {url} failed: {response.status} {payload.get('errors', payload)}")
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"{method} {url} failed: {e!r}")
+            return None
+
+    async def validate_session(self):
+        data = await self._request("GET", self._profile_url)
+        if data is None:
+            return False
+        logger.info(f"Session Valid. User: {data.get('user_name')}")
+        return True
+
+    async def historical_candles(self, instrument_key, interval, to_date, from_date):
+        """
+        Candle rows [[timestamp, open, high, low, close, volume, oi], ...]
+        for whole sessions from_date..to_date (YYYY-MM-DD), newest first.
+        """
+        data = await self._request(
+            "GET", f"{self.api_url}/historical-candle/{quote(instrument_key, safe='')}/{interval}/{to_date}/{from_date}")
+        return None if data is None else data.get("candles", [])
+
+    async def intraday_candles(self, instrument_key, interval):
+        """
+        Today's candle rows so far, newest first.
+        """
+        data = await self._request(
+            "GET", f"{self.api_url}/historical-candle/intraday/{quote(instrument_key, safe='')}/{interval}")
+        return None if data is None else data.get("candles", [])
+
+    async def order_book(self):
+        """
+        Today's orders (Upstox order book entries), or None on failure.
+        """
+        return await self._request("GET", f"{self.api_url}/order/retrieve-all")
+
+    async def positions(self):
+        """
+        Today's positions (net 'quantity' per instrument, shorts negative), or None.
+        """
+        return await self._request("GET", f"{self.api_url}/portfolio/short-term-positions")
+
+    async def ltp(self, instrument_keys, batch=500):
+        """
+        {instrument key: last traded price}, up to 'batch' keys per request
+        (requests in parallel). None if any request fails.
+        """
+        keys = list(instrument_keys)
+        results = await asyncio.gather(*[
+            self._request("GET", f"{self.api_url}/market-quote/ltp", params={"instrument_key": ",".join(keys[i:i + batch])})
+            for i in range(0, len(keys), batch)])
+        if any(data is None for data in results):
+            return None
+        return {quote["instrument_token"]: quote["last_price"] for data in results for quote in data.values()}
+
+    async def place_order(self, symbol, side, quantity, product='I', order_type='MARKET', price=0.0,
+                          trigger_price=0.0, tag=None):
+        """
+        Place an order. 'symbol' must be the instrument key. Returns the order id or None.
+        """
+        body = self._order_template.copy()
+        body["quantity"] = quantity
+        body["product"] = product
+        body["price"] = price if order_type in ('LIMIT', 'SL') else 0.0
+        body["instrument_token"] = symbol
+        body["order_type"] = order_type
+        body["transaction_type"] = side
+        body["trigger_price"] = trigger_price
+        if tag:
+            body["tag"] = tag
+
+        data = await self._request("POST", self._place_url, body)
+        if data is None:
+            return None
+        logger.info(f"Order Placed: {data.get('order_id')}")
+        return data.get("order_id")
+
+    async def modify_order(self, order_id, quantity=None, price=None, order_type=None, trigger_price=None,
+                           validity='DAY'):
+        """
+        Modify an open order. Only the given fields are sent. Returns the order id or None.
+        """
+        body = {"order_id": order_id, "validity": validity}
+        if quantity is not None:
+            body["quantity"] = quantity
+        if price is not None:
+            body["price"] = price
+        if order_type is not None:
+            body["order_type"] = order_type
+        if trigger_price is not None:
+            body["trigger_price"] = trigger_price
+
+        data = await self._request("PUT", self._modify_url, body)
+        if data is None:
+            return None
+        logger.info(f"Order Modified: {order_id}")
+        return data.get("order_id", order_id)
+
+    async def cancel_order(self, order_id):
+        """
+        Cancel an open order.
+        """
+        data = await self._request("DELETE", self._cancel_url, params={"order_id": order_id})
+        if data is None:
+            return False
+        logger.info(f"Order Cancelled: {order_id}")
+        return True
+
+    async def place_orders(self, orders):
+        """
+        Fire several orders concurrently over the pool.
+        orders: iterable of dicts with place_order keyword arguments.
+        Returns order ids (None for failures) in the same order.
+        """
+        return await asyncio.gather(*[self.place_order(**order) for order in orders])
@@ -0,0 +1,198 @@
+import logging
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from latency import LATENCY, now_ns
+
+logger = logging.getLogger("OrderScheduler")
+
+# Lower value = sent first
+PRIORITY_EXIT = 0   # SL Hit / Target Hit / Time Stop
+PRIORITY_ENTRY = 1  # New positions
+
+PRIORITY_NAMES = {PRIORITY_EXIT: "exit", PRIORITY_ENTRY: "entry"}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: 'rate' tokens per 'per' seconds, burst of 'rate'.
+    """
+    __slots__ = ("capacity", "fill_rate", "tokens", "updated")
+
+    def __init__(self, rate, per, now):
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+
+    def delay(self, now, reserve=0.0):
+        """
+        Seconds until one token can be taken while leaving 'reserve' behind.
+        """
+        self._refill(now)
+        missing = 1.0 + min(reserve, self.capacity - 1.0) - self.tokens
+        return missing / self.fill_rate if missing > 0 else 0.0
+
+    def consume(self, now):
+        self._refill(now)
+        self.tokens -= 1.0
+
+
+class _QueuedOrder:
+    __slots__ = ("priority", "key", "send", "order", "future", "enqueued", "submitted_ns", "origin_ns")
+
+    def __init__(self, priority, key, send, order, future, enqueued):
+        self.priority = priority
+        self.key = key
+        self.send = send
+        self.order = order
+        self.future = future
+        self.enqueued = enqueued
+        self.submitted_ns = now_ns()
+        self.origin_ns = LATENCY.frame_ns  # Receive time of the feed frame that triggered it (0: none)
+
+
+class OrderScheduler:
+    """
+    Rate-limit-aware order queue in front of the order gateway.
+
+    Orders wait in a priority queue until every broker token bucket (per
+    second / minute / 30 minutes) has a token. Exits always go first, and
+    entries may only use a bucket while 'exit_reserve' tokens remain in it,
+    so a burst of entry signals can never starve a stop-loss exit.
+    Optionally (coalesce=True, off by default) identical pending orders
+    (every argument and the priority equal) share one submission and one
+    order id. Modifications and cancellations
+    go through call() and share the same buckets (never coalesced).
+    """
+    def __init__(self, send, limits=((50, 1.0), (500, 60.0), (2000, 1800.0)), exit_reserve=2,
+                 coalesce=False, clock=time.monotonic, stats_window=1000):
+        self.send = send  # async callable(**order) -> order_id or None
+        self.clock = clock
+        now = clock()
+        self.buckets = [TokenBucket(rate, per, now) for rate, per in limits]
+        self.exit_reserve = exit_reserve
+        self.coalesce = coalesce
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = {}  # coalescing key -> _QueuedOrder
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        # Stats
+        self.depth = {p: 0 for p in PRIORITY_NAMES}
+        self.sent = {p: 0 for p in PRIORITY_NAMES}
+        self.coalesced = 0
+        self._waits = {p: deque(maxlen=stats_window) for p in PRIORITY_NAMES}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, priority=PRIORITY_ENTRY, **order):
+        """
+        Queue an order (place_order keyword arguments) and wait until it has
+        been sent. Returns the order id, or None if it failed.
+        """
+        key = (priority, frozenset(order.items()))
+        if self.coalesce:
+            queued = self._pending.get(key)
+            if queued is not None:
+                self.coalesced += 1
+                return await asyncio.shield(queued.future)
+            return await self._enqueue(priority, key, self.send, order)
+        return await self._enqueue(priority, None, self.send, order)
+
+    async def call(self, send, priority=PRIORITY_EXIT, **kwargs):
+        """
+        Queue any other rate-limited broker request (modify / cancel:
+        'send' is the async gateway method) and wait for its result.
+        """
+        return await self._enqueue(priority, None, send, kwargs)
+
+    async def _enqueue(self, priority, key, send, order):
+        self.start()
+        queued = _QueuedOrder(priority, key, send, order, asyncio.get_running_loop().create_future(), self.clock())
+        heapq.heappush(self._heap, (priority, next(self._seq), queued))
+        if key is not None:
+            self._pending[key] = queued
+        self.depth[priority] += 1
+        self._wakeup.set()
+        return await asyncio.shield(queued.future)
+
+    async def run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            priority = self._heap[0][0]
+            reserve = 0 if priority == PRIORITY_EXIT else self.exit_reserve
+            now = self.clock()
+            delay = max(bucket.delay(now, reserve) for bucket in self.buckets)
+            if delay > 0:
+                # Sleep until a token frees up, or until a higher-priority order arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for bucket in self.buckets:
+                bucket.consume(now)
+            _, _, queued = heapq.heappop(self._heap)
+            if queued.key is not None and self._pending.get(queued.key) is queued:
+                del self._pending[queued.key]
+            self.depth[priority] -= 1
+            self.sent[priority] += 1
+            self._waits[priority].append(now - queued.enqueued)
+            LATENCY.record("submit", queued.submitted_ns)
+            if queued.origin_ns:
+                LATENCY.record("tick_to_trade", queued.origin_ns)
+            asyncio.create_task(self._send(queued))
+
+    async def _send(self, queued):
+        started = now_ns()
+        try:
+            result = await queued.send(**queued.order)
+        except Exception as e:
+            logger.error(f"Order send failed for {queued.order}: {e}")
+            result = None
+        LATENCY.record("ack", started)
+        if not queued.future.done():
+            queued.future.set_result(result)
+
+    def stats(self):
+        """
+        Queue depth, sent counts and queue wait percentiles (ms) per priority.
+        """
+        out = {"coalesced": self.coalesced}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            out[name] = {
+                "depth": self.depth[priority],
+                "sent": self.sent[priority],
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1e3, 3) if waits else 0.0,
+                "wait_p99_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1e3, 3) if waits else 0.0,
+                "wait_max_ms": round(waits[-1] * 1e3, 3) if waits else 0.0,
+            }
+        return out
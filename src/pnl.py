@@ -0,0 +1,142 @@
+import logging
+
+logger = logging.getLogger("PnL")
+
+
+class PnLEngine:
+    """
+    Session mark-to-market as running aggregates.
+
+    Each position keeps its signed quantity (short < 0), entry price and last
+    mark. A tick for a held symbol moves unrealized PnL, gross exposure
+    (sum |qty| * ltp) and net exposure (sum qty * ltp) by the change since
+    the previous mark, so mark() is O(1) whatever the number of positions.
+    Fills (rare) re-sum the aggregates, which also stops float drift from
+    building up.
+
+    Equity is realized + unrealized PnL; the session high-water mark and
+    drawdown follow it. With max_loss set, equity at or below -max_loss
+    marks the engine breached and calls on_breach(reason) once.
+    """
+    def __init__(self, max_loss=None, on_breach=None):
+        self.max_loss = max_loss      # Currency; None disables the check
+        self.on_breach = on_breach
+        self.positions = {}           # symbol -> [qty, entry_price, mark]
+
+        self.realized = 0.0
+        self.unrealized = 0.0
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.high_water = 0.0
+        self.max_drawdown = 0.0
+        self.breached = False
+        self.fills = 0
+
+    @classmethod
+    def from_config(cls, config, on_breach=None):
+        """
+        RISK_MAX_DAILY_LOSS is a percentage of TRADING_CAPITAL.
+        """
+        capital = config.get("TRADING_CAPITAL")
+        pct = config.get("RISK_MAX_DAILY_LOSS")
+        max_loss = capital * pct / 100.0 if capital and pct else None
+        return cls(max_loss, on_breach)
+
+    @property
+    def equity(self):
+        return self.realized + self.unrealized
+
+    @property
+    def drawdown(self):
+        return self.high_water - self.equity
+
+    def mark(self, symbol, ltp):
+        """
+        Hot path: revalue one position at the latest traded price.
+        """
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return
+        move = ltp - pos[2]
+        if move == 0.0:
+            return
+        qty = pos[0]
+        pos[2] = ltp
+        self.unrealized += qty * move
+        self.net_exposure += qty * move
+        self.gross_exposure += abs(qty) * move
+        self._update_equity()
+
+    def _update_equity(self):
+        equity = self.realized + self.unrealized
+        if equity > self.high_water:
+            self.high_water = equity
+        elif self.high_water - equity > self.max_drawdown:
+            self.max_drawdown = self.high_water - equity
+        if self.max_loss is not None and not self.breached and equity <= -self.max_loss:
+            self.breached = True
+            reason = f"Daily loss limit hit: {equity:.2f} <= -{self.max_loss:.2f}"
+            logger.critical(reason)
+            if self.on_breach:
+                self.on_breach(reason)
+
+    def fill(self, symbol, side, quantity, price):
+        """
+        Apply an executed order. Adding to a position averages the entry;
+        reducing it realizes PnL on the reduced quantity against the entry.
+        """
+        signed = quantity if side == "BUY" else -quantity
+        pos = self.positions.get(symbol)
+        if pos is None:
+            self.positions[symbol] = [signed, price, price]
+        else:
+            qty, entry, _ = pos
+            if qty * signed > 0:
+                pos[1] = (entry * qty + price * signed) / (qty + signed)
+                pos[0] = qty + signed
+            else:
+                closed = min(abs(qty), abs(signed))
+                self.realized += closed * (price - entry) * (1 if qty > 0 else -1)
+                remaining = qty + signed
+                if remaining == 0:
+                    del self.positions[symbol]
+                elif remaining * qty > 0:
+                    pos[0] = remaining
+                else:
+                    pos[0], pos[1] = remaining, price  # Flipped through zero
+            if symbol in self.positions:
+                self.positions[symbol][2] = price
+        self.fills += 1
+        self._resum()
+
+    def _resum(self):
+        unrealized = gross = net = 0.0
+        for qty, entry, mark in self.positions.values():
+            unrealized += qty * (mark - entry)
+            gross += abs(qty) * mark
+            net += qty * mark
+        self.unrealized, self.gross_exposure, self.net_exposure = unrealized, gross, net
+        self._update_equity()
+
+    def position_pnl(self, symbol):
+        pos = self.positions.get(symbol)
+        return 0.0 if pos is None else pos[0] * (pos[2] - pos[1])
+
+    def last_price(self, symbol, default=None):
+        pos = self.positions.get(symbol)
+        return default if pos is None else pos[2]
+
+    def stats(self):
+        return {
+            "realized": round(self.realized, 2),
+            "unrealized": round(self.unrealized, 2),
+            "total": round(self.equity, 2),
+            "gross_exposure": round(self.gross_exposure, 2),
+            "net_exposure": round(self.net_exposure, 2),
+            "high_water": round(self.high_water, 2),
+            "drawdown": round(self.drawdown, 2),
+            "max_drawdown": round(self.max_drawdown, 2),
+            "max_loss": self.max_loss,
+            "breached": self.breached,
+            "positions": {symbol: round(self.position_pnl(symbol), 2) for symbol in self.positions},
+        }
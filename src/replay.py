@@ -0,0 +1,318 @@
+import logging
+import asyncio
+import argparse
+import itertools
+import json
+import os
+import time
+import numpy as np
+from market_data import MarketDataStreamer
+from candles import CandleAggregator
+from strategy import GodfatherStrategy
+from feed_decoder import Tick, read_frames
+
+logger = logging.getLogger("Replay")
+
+
+class SimClock:
+    """
+    Simulated wall clock (epoch seconds), advanced by the replayed data.
+    """
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance_to(self, now):
+        if now > self.now:
+            self.now = now
+
+
+class ReplayIntelligence:
+    """
+    Fixed sentiment in place of the news scraper.
+    """
+    def __init__(self, market_sentiment=0.0):
+        self.sentiment_cache = {"market": market_sentiment}
+
+
+class SimulatedUpstoxHandler:
+    """
+    Drop-in for UpstoxHandler's async order path. Market orders fill at the
+    first price seen 'latency' seconds after submission, moved against us by
+    'slippage_bps'. Keeps per-symbol net positions and a round-trip trade log.
+    """
+    def __init__(self, clock, slippage_bps=2.0, latency=0.0):
+        self.clock = clock
+        self.slippage = slippage_bps / 10_000
+        self.latency = latency
+        self.last_price = {}
+        self.pending = []        # [(due, order_id, symbol, side, quantity)]
+        self.fills = []
+        self.trades = []         # Closed round trips
+        self.open = {}           # symbol -> [side, quantity, avg_price, entry_time]
+        self.realized = 0.0
+        self._ids = itertools.count(1)
+
+    async def validate_session(self):
+        return True
+
+    async def place_order_async(self, symbol, side, quantity, product='I', order_type='MARKET', price=0.0,
+                                trigger_price=0.0, priority=None):
+        order_id = f"SIM{next(self._ids):08d}"
+        due = self.clock() + self.latency
+        if self.latency <= 0 and symbol in self.last_price:
+            self._fill(order_id, symbol, side, quantity, self.last_price[symbol])
+        else:
+            self.pending.append((due, order_id, symbol, side, quantity))
+        return order_id
+
+    async def place_orders_async(self, orders):
+        return [await self.place_order_async(**order) for order in orders]
+
+    async def modify_order_async(self, order_id, quantity=None, price=None, order_type=None, trigger_price=None):
+        return order_id
+
+    async def cancel_order_async(self, order_id):
+        before = len(self.pending)
+        self.pending = [p for p in self.pending if p[1] != order_id]
+        return len(self.pending) < before
+
+    async def on_ticks(self, ticks):
+        """
+        Tick handler: track prices and fill due orders.
+        """
+        last_price = self.last_price
+        for tick in ticks:
+            last_price[tick.symbol] = tick.ltp
+        if self.pending:
+            now = self.clock()
+            waiting = []
+            for order in self.pending:
+                due, order_id, symbol, side, quantity = order
+                if due <= now and symbol in last_price:
+                    self._fill(order_id, symbol, side, quantity, last_price[symbol])
+                else:
+                    waiting.append(order)
+            self.pending = waiting
+
+    def _fill(self, order_id, symbol, side, quantity, price):
+        price = price * (1 + self.slippage) if side == "BUY" else price * (1 - self.slippage)
+        now = self.clock()
+        self.fills.append({"order_id": order_id, "symbol": symbol, "side": side,
+                           "quantity": quantity, "price": price, "time": now})
+
+        pos = self.open.get(symbol)
+        if pos is None:
+            self.open[symbol] = [side, quantity, price, now, order_id]
+            return
+        if pos[0] == side:
+            pos[2] = (pos[2] * pos[1] + price * quantity) / (pos[1] + quantity)
+            pos[1] += quantity
+            return
+
+        closed = min(quantity, pos[1])
+        direction = 1 if pos[0] == "BUY" else -1
+        pnl = (price - pos[2]) * closed * direction
+        self.realized += pnl
+        self.trades.append({
+            "symbol": symbol, "side": pos[0], "quantity": closed,
+            "entry_price": round(pos[2], 4), "exit_price": round(price, 4),
+            "entry_time": pos[3], "exit_time": now, "pnl": round(pnl, 4),
+            "entry_order": pos[4], "exit_order": order_id,
+        })
+        pos[1] -= closed
+        if pos[1] == 0:
+            del self.open[symbol]
+        if quantity > closed:
+            self.open[symbol] = [side, quantity - closed, price, now, order_id]
+
+    def unrealized(self):
+        total = 0.0
+        for symbol, (side, quantity, avg, _, _) in self.open.items():
+            direction = 1 if side == "BUY" else -1
+            total += (self.last_price.get(symbol, avg) - avg) * quantity * direction
+        return total
+
+
+class ReplayEngine:
+    """
+    Deterministic replay of recorded frames or candles through the live
+    code path (MarketDataStreamer.on_message -> CandleAggregator -> strategy),
+    driven by a simulated clock and a simulated broker. Runs as fast as the
+    CPU allows.
+    """
+    def __init__(self, symbols, timeframe="1min", market_sentiment=0.0, slippage_bps=2.0, latency=0.0,
+                 config=None):
+        self.clock = SimClock()
+        self.config = dict(config or {}, TRADING_SYMBOL_LIST=list(symbols), ACCESS_TOKEN="replay")
+        self.broker = SimulatedUpstoxHandler(self.clock, slippage_bps, latency)
+        self.brain = ReplayIntelligence(market_sentiment)
+        self.strategy = GodfatherStrategy(self.broker, self.brain, self.config, clock=self.clock)
+        self.candles = CandleAggregator(timeframe, self.config["TRADING_SYMBOL_LIST"],
+                                        on_close=self.strategy.on_bar_close, clock=self.clock)
+        self.market_data = MarketDataStreamer(self.config)
+        self.market_data.tick_handlers = [self._on_ticks, self.broker.on_ticks,
+                                          self.candles.on_ticks, self.strategy.on_ticks]
+        self.ticks = 0
+        self.elapsed = 0.0
+
+    async def _on_ticks(self, ticks):
+        # Advance simulated time to the newest trade in the batch, then fire due timers
+        latest = max(tick.ltt for tick in ticks)
+        if latest:
+            self.clock.advance_to(latest / 1000)
+        self.strategy.risk.advance(self.clock.now)
+        self.ticks += len(ticks)
+
+    async def replay_frames(self, frames):
+        """
+        Replay raw WebSocket frames (bytes) in order.
+        """
+        start = time.perf_counter()
+        on_message = self.market_data.on_message
+        settle = self.strategy.settle
+        for frame in frames:
+            await on_message(frame)
+            await settle()  # Entries placed at a bar close fill before the next frame
+        await self.candles.close_until(int(self.clock.now * 1000) + self.candles.interval)
+        await settle()
+        self.elapsed += time.perf_counter() - start
+
+    async def replay_candles(self, candles):
+        """
+        Replay closed bars. candles: {symbol: {"ts","open","high","low","close","volume"}}
+        arrays aligned on the same bar timestamps. Each bar is expanded into
+        open/high/low/close ticks for the risk path before the bar closes.
+        """
+        start = time.perf_counter()
+        symbols = list(candles)
+        ts = candles[symbols[0]]["ts"]
+        interval = self.candles.interval
+        cols = {s: [candles[s][k].tolist() for k in ("open", "high", "low", "close", "volume")] for s in symbols}
+        handlers = [self._on_ticks, self.broker.on_ticks, self.strategy.on_ticks]
+
+        for i, bar_ts in enumerate(ts.tolist()):
+            # Intrabar path: open, then the extreme nearer the open, the other extreme, close
+            legs = [[], [], [], []]
+            for s in symbols:
+                o, h, l, c, _ = (col[i] for col in cols[s])
+                first, second = (l, h) if c >= o else (h, l)
+                for leg, (price, offset) in enumerate(((o, 0), (first, interval // 3),
+                                                       (second, 2 * interval // 3), (c, interval - 1))):
+                    legs[leg].append(Tick(s, price, bar_ts + offset))
+            for batch in legs:
+                for handler in handlers:
+                    await handler(batch)
+
+            bars = [(s, (bar_ts, *(col[i] for col in cols[s]))) for s in symbols]
+            self.clock.advance_to((bar_ts + interval) / 1000)
+            await self.strategy.on_bar_close(bar_ts, bars)
+            await self.strategy.settle()
+        self.elapsed += time.perf_counter() - start
+
+    def report(self):
+        """
+        Trade log + PnL summary.
+        """
+        broker = self.broker
+        purposes = self.strategy.active_orders
+        trades = [dict(t, reason=purposes.get(t["exit_order"], {}).get("purpose")) for t in broker.trades]
+        pnls = np.array([t["pnl"] for t in trades]) if trades else np.zeros(0)
+        equity = np.cumsum(pnls) if len(pnls) else np.zeros(1)
+        drawdown = float(np.max(np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity]))
+        summary = {
+            "trades": len(trades),
+            "wins": int((pnls > 0).sum()),
+            "losses": int((pnls <= 0).sum()),
+            "win_rate": round(float((pnls > 0).mean()), 4) if len(pnls) else 0.0,
+            "realized_pnl": round(broker.realized, 2),
+            "unrealized_pnl": round(broker.unrealized(), 2),
+            "max_drawdown": round(drawdown, 2),
+            "open_positions": len(broker.open),
+            "ticks": self.ticks,
+            "elapsed_sec": round(self.elapsed, 3),
+            "ticks_per_sec": round(self.ticks / self.elapsed) if self.elapsed else 0,
+        }
+        return trades, summary
+
+
+def load_candles(path):
+    """
+    Load candles from a directory of <symbol>.npz / <symbol>.csv files with
+    ts (epoch millis), open, high, low, close, volume columns.
+    """
+    candles = {}
+    for name in sorted(os.listdir(path)):
+        stem, ext = os.path.splitext(name)
+        full = os.path.join(path, name)
+        if ext == ".npz":
+            with np.load(full) as data:
+                candles[stem] = {k: data[k] for k in ("ts", "open", "high", "low", "close", "volume")}
+        elif ext == ".csv":
+            data = np.genfromtxt(full, delimiter=",", names=True)
+            candles[stem] = {k: data[k].astype(np.int64 if k == "ts" else np.float64)
+                             for k in ("ts", "open", "high", "low", "close", "volume")}
+    return candles
+
+
+def synthetic_candles(n_symbols, n_bars=375, seed=7, start_ms=1_700_019_900_000, sessions=1):
+    """
+    Random-walk 1-min bars with volume bursts per symbol: 'sessions'
+    consecutive days of n_bars bars each.
+    """
+    rng = np.random.default_rng(seed)
+    days = start_ms + np.arange(sessions, dtype=np.int64) * 86_400_000
+    ts = (days[:, None] + np.arange(n_bars, dtype=np.int64) * 60_000).ravel()
+    n_bars = len(ts)
+    candles = {}
+    for i in range(n_symbols):
+        close = rng.uniform(100, 3000) * np.exp(np.cumsum(rng.normal(0, 0.0012, n_bars)))
+        spread = close * rng.uniform(0.0003, 0.002, n_bars)
+        high = close + spread * rng.random(n_bars)
+        low = close - spread * rng.random(n_bars)
+        open_ = low + (high - low) * rng.random(n_bars)
+        volume = rng.integers(1_000, 20_000, n_bars).astype(float)
+        burst = rng.random(n_bars) < 0.04
+        volume[burst] *= rng.uniform(2, 6, burst.sum())
+        candles[f"NSE_EQ|SYN{i:04d}"] = {"ts": ts, "open": open_, "high": high, "low": low,
+                                         "close": close, "volume": volume}
+    return candles
+
+
+async def _main(args):
+    engine = None
+    if args.frames:
+        frames = read_frames(args.frames)
+        engine = ReplayEngine(args.symbols.split(",") if args.symbols else [], args.timeframe,
+                              args.sentiment, args.slippage_bps, args.latency)
+        await engine.replay_frames(frames)
+    else:
+        candles = load_candles(args.candles) if args.candles else synthetic_candles(args.synthetic)
+        engine = ReplayEngine(list(candles), args.timeframe, args.sentiment, args.slippage_bps, args.latency)
+        await engine.replay_candles(candles)
+
+    trades, summary = engine.report()
+    if args.trades:
+        with open(args.trades, "w") as f:
+            json.dump(trades, f, indent=1)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded market data through the Godfather strategy.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--frames", help="Recorded feed frames file (length-prefixed)")
+    source.add_argument("--candles", help="Directory of <symbol>.npz/.csv candle files")
+    source.add_argument("--synthetic", type=int, default=200, help="Symbols of synthetic candles (default)")
+    parser.add_argument("--symbols", help="Comma-separated instrument keys (frames mode)")
+    parser.add_argument("--timeframe", default="1min")
+    parser.add_argument("--sentiment", type=float, default=0.5, help="Fixed market sentiment")
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated order latency (s)")
+    parser.add_argument("--trades", help="Write the trade log (JSON) here")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(_main(args))
@@ -0,0 +1,144 @@
+import logging
+import asyncio
+import time
+from feed_decoder import Tick
+from market_data import Backoff
+
+logger = logging.getLogger("Resync")
+
+
+def parse_positions(rows):
+    """
+    Upstox short-term positions -> {instrument key: (net quantity, average price)}.
+    """
+    out = {}
+    for row in rows or []:
+        qty = int(row.get("quantity") or 0)
+        price = row.get("average_price") or (row.get("buy_price") if qty > 0 else row.get("sell_price")) or 0.0
+        out[row["instrument_token"]] = (qty, float(price))
+    return out
+
+
+def parse_orders(rows):
+    """
+    Upstox order book -> {order_id: order}.
+    """
+    return {row["order_id"]: row for row in rows or []}
+
+
+class StateResync:
+    """
+    Keeps the strategy's orders and positions honest across market feed
+    outages (MarketDataStreamer disconnect / connect handlers).
+
+    While the feed is down, the open positions' last prices are polled over
+    REST every 'poll_interval' seconds and fed through the strategy's tick
+    path (mark-to-market, SL / target bands), so a position isn't left
+    unguarded until the feed is back. On reconnect the order book, the
+    positions and the open symbols' LTPs are fetched in parallel and
+    reconciled into GodfatherStrategy.positions / active_orders; a failed
+    resync is retried with the reconnect backoff until one succeeds or the
+    feed drops again.
+    """
+    def __init__(self, gateway, strategy, poll_interval=1.0, backoff=None):
+        self.gateway = gateway
+        self.strategy = strategy
+        self.poll_interval = poll_interval
+        self.backoff = backoff or Backoff()
+        self.down = False
+        self._poller = None
+        self._resync = None
+
+        self.polls = 0
+        self.resyncs = 0
+        self.failures = 0
+        self.corrections = 0
+        self.last_resync_ms = 0.0
+
+    def on_disconnect(self):
+        self.down = True
+        if self._poller is None and self.strategy.positions:
+            self._poller = asyncio.create_task(self.poll())
+
+    def on_connect(self):
+        if not self.down:
+            return
+        self.down = False
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if self._resync is None:
+            self._resync = asyncio.create_task(self.resync_until_done())
+
+    async def _quotes(self, symbols):
+        """
+        Run REST last prices through the strategy's tick path.
+        """
+        ltps = await self.gateway.ltp(symbols) if symbols else {}
+        if ltps:
+            await self.strategy.on_ticks([Tick(symbol, ltp=ltp) for symbol, ltp in ltps.items()])
+        return ltps
+
+    async def poll(self):
+        try:
+            while self.down and self.strategy.positions:
+                self.polls += 1
+                if await self._quotes(list(self.strategy.positions)) is None:
+                    self.failures += 1
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._poller = None
+
+    async def resync_until_done(self):
+        """
+        resync() after a reconnect, retried after a jittered backoff while
+        the broker can't be reached; given up if the feed drops again (the
+        next reconnect starts over).
+        """
+        backoff = self.backoff
+        backoff.reset()
+        try:
+            while not await self.resync():
+                delay = backoff.next()
+                logger.warning(f"Retrying the resync in {delay * 1000:.0f}ms...")
+                await asyncio.sleep(delay)
+                if self.down:
+                    return
+        finally:
+            self._resync = None
+
+    async def resync(self):
+        """
+        One parallel fetch of orders, positions and LTPs, then reconcile.
+        Returns False if the broker couldn't be reached (state left as is).
+        """
+        started = time.perf_counter()
+        strategy = self.strategy
+        # Positions that change while the requests are out (orders in flight,
+        # exits from the tick path) are newer than the snapshot: left alone
+        before = dict(strategy.positions)
+        inflight = set(strategy.inflight)
+        orders, positions, _ = await asyncio.gather(
+            self.gateway.order_book(), self.gateway.positions(), self._quotes(list(before)))
+        if orders is None or positions is None:
+            self.failures += 1
+            logger.error("Resync failed: order book / positions unavailable. Keeping local state.")
+            return False
+        skip = inflight | {s for s in set(before) | set(strategy.positions)
+                           if strategy.positions.get(s) is not before.get(s)}
+        changed = strategy.reconcile(parse_positions(positions), parse_orders(orders), skip)
+        self.resyncs += 1
+        self.corrections += changed
+        self.last_resync_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Resync: {len(positions)} broker positions, {len(orders)} orders, "
+                    f"{changed} corrections in {self.last_resync_ms:.1f}ms")
+        return True
+
+    def stats(self):
+        return {"polls": self.polls, "resyncs": self.resyncs, "failures": self.failures,
+                "corrections": self.corrections, "last_resync_ms": round(self.last_resync_ms, 1)}
+
+    @classmethod
+    def from_config(cls, config, gateway, strategy):
+        backoff = Backoff(config.get("FEED_RECONNECT_MIN", 0.005), config.get("FEED_RECONNECT_MAX", 5.0))
+        return cls(gateway, strategy, config.get("RESYNC_POLL_INTERVAL", 1.0), backoff)
@@ -0,0 +1,148 @@
+import logging
+import asyncio
+import time
+
+logger = logging.getLogger("RiskEngine")
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel. schedule/cancel are O(1); advance() only visits the
+    slots for the wheel ticks that elapsed since the last call.
+    """
+    def __init__(self, tick=1.0, slots=512, now=0.0):
+        self.tick = tick
+        self.size = slots
+        self.slots = [{} for _ in range(slots)]
+        self.current = int(now // tick)  # Wheel tick processed up to (inclusive)
+        self._where = {}  # key -> absolute wheel tick
+
+    def __len__(self):
+        return len(self._where)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        t = max(int(deadline // self.tick), self.current)
+        self.slots[t % self.size][key] = deadline
+        self._where[key] = t
+
+    def cancel(self, key):
+        t = self._where.pop(key, None)
+        if t is not None:
+            self.slots[t % self.size].pop(key, None)
+
+    def advance(self, now):
+        """
+        Return the keys whose deadline is <= now, removing them from the wheel.
+        """
+        target = int(now // self.tick)
+        if target < self.current:
+            return []
+        fired = []
+        span = min(target - self.current + 1, self.size)
+        for i in range(span):
+            slot = self.slots[(self.current + i) % self.size]
+            if slot:
+                for key, deadline in list(slot.items()):
+                    if deadline <= now:
+                        del slot[key]
+                        del self._where[key]
+                        fired.append(key)
+        self.current = target
+        return fired
+
+
+class RiskEngine:
+    """
+    Per-tick position risk in one comparison.
+
+    Every open position is reduced to a safe band (lower, upper): while
+    lower < ltp < upper nothing can trigger, so the tick path is a dict
+    lookup plus one chained comparison. Only a price outside the band takes
+    the slow path, which applies the exact SL / Target / Time Stop rules.
+    The 5-minute time stop is a TimerWheel deadline; when it fires the band
+    is tightened to the minimum-profit level instead of re-checking the clock
+    on every tick.
+    """
+    def __init__(self, time_stop_after=300.0, min_profit_pct=0.002, clock=time.time, tick=1.0):
+        self.time_stop_after = time_stop_after
+        self.min_profit_pct = min_profit_pct
+        self.clock = clock
+        self.bands = {}      # symbol -> (lower, upper)
+        self.positions = {}  # symbol -> position dict (side, entry_price, sl, tgt)
+        self.time_stopped = set()  # symbols past their time-stop deadline
+        self.wheel = TimerWheel(tick=tick, now=clock())
+
+    def add(self, symbol, pos, opened_at=None):
+        """
+        Start watching a position. opened_at is epoch seconds (default: now).
+        """
+        self.positions[symbol] = pos
+        self.time_stopped.discard(symbol)
+        self._set_band(symbol)
+        opened_at = self.clock() if opened_at is None else opened_at
+        self.wheel.schedule(symbol, opened_at + self.time_stop_after)
+
+    def remove(self, symbol):
+        self.bands.pop(symbol, None)
+        self.positions.pop(symbol, None)
+        self.time_stopped.discard(symbol)
+        self.wheel.cancel(symbol)
+
+    def _set_band(self, symbol):
+        pos = self.positions[symbol]
+        if pos['side'] == "BUY":
+            lower, upper = pos['sl'], pos['tgt']
+            if symbol in self.time_stopped:
+                lower = max(lower, pos['entry_price'] * (1 + self.min_profit_pct))
+        else:
+            lower, upper = pos['tgt'], pos['sl']
+            if symbol in self.time_stopped:
+                upper = min(upper, pos['entry_price'] * (1 - self.min_profit_pct))
+        self.bands[symbol] = (lower, upper)
+
+    def check(self, symbol, ltp):
+        """
+        Hot path. Returns the exit reason, or None if the position (if any) is safe.
+        """
+        band = self.bands.get(symbol)
+        if band is None or band[0] < ltp < band[1]:
+            return None
+        return self._classify(symbol, ltp)
+
+    def _classify(self, symbol, ltp):
+        pos = self.positions[symbol]
+        if pos['side'] == "BUY":
+            if ltp <= pos['sl']:
+                return "SL Hit"
+            if ltp >= pos['tgt']:
+                return "Target Hit"
+            pnl_pct = (ltp - pos['entry_price']) / pos['entry_price']
+        else:
+            if ltp >= pos['sl']:
+                return "SL Hit"
+            if ltp <= pos['tgt']:
+                return "Target Hit"
+            pnl_pct = (pos['entry_price'] - ltp) / pos['entry_price']
+        if symbol in self.time_stopped and pnl_pct < self.min_profit_pct:
+            return "Time Stop"
+        return None
+
+    def advance(self, now=None):
+        """
+        Fire due time-stop deadlines. Returns the symbols whose band was tightened.
+        """
+        expired = self.wheel.advance(self.clock() if now is None else now)
+        for symbol in expired:
+            if symbol in self.positions:
+                self.time_stopped.add(symbol)
+                self._set_band(symbol)
+        return expired
+
+    async def run(self):
+        """
+        Drive the timer wheel from the clock.
+        """
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            self.advance()
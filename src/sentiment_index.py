@@ -0,0 +1,190 @@
+import logging
+import csv
+import math
+import re
+import time
+
+logger = logging.getLogger("SentimentIndex")
+
+_WORD = re.compile(r"[a-z0-9&]+")
+
+# Dropped when deriving aliases from a company name
+_SUFFIXES = {"ltd", "limited", "corp", "corporation", "inc", "co", "company", "plc", "pvt", "private"}
+_SMALL_WORDS = {"of", "and", "&", "the"}
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _looks_like_isin(code):
+    return len(code) == 12 and code[:2].isalpha() and code[2:].isalnum() and code[-1].isdigit()
+
+
+class AliasIndex:
+    """
+    Alias -> instrument_key lookup for tagging headlines with instruments.
+
+    Aliases are stored as word tuples, and 'starts' maps each alias's first
+    word to its longest alias length, so tagging a headline costs one dict
+    lookup per word plus a few tuple lookups at words that can start an
+    alias, no matter how many instruments are in the universe.
+
+    Explicit aliases always apply. Aliases derived from company names
+    ("Reliance Industries Ltd" -> "reliance industries", "State Bank of
+    India" -> "sbi") are dropped when they would point at more than one
+    instrument.
+    """
+    def __init__(self):
+        self.aliases = {}   # word tuple -> tuple of instrument keys
+        self.starts = {}    # first word -> longest alias (in words) starting with it
+        self._derived = {}  # word tuple -> set of instrument keys (before collision pruning)
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def add(self, instrument_key, alias):
+        words = tuple(_words(alias))
+        if not words:
+            return
+        keys = self.aliases.get(words, ())
+        if instrument_key not in keys:
+            self.aliases[words] = keys + (instrument_key,)
+        self._start(words)
+
+    def _start(self, words):
+        if len(words) > self.starts.get(words[0], 0):
+            self.starts[words[0]] = len(words)
+
+    def add_name(self, instrument_key, name):
+        """
+        Derive aliases from a company name (full name, name without corporate
+        suffix, initials of 3+ letters).
+        """
+        words = _words(name)
+        while words and words[-1] in _SUFFIXES:
+            words.pop()
+        if not words:
+            return
+        self._derived.setdefault(tuple(_words(name)), set()).add(instrument_key)
+        self._derived.setdefault(tuple(words), set()).add(instrument_key)
+        initials = "".join(w[0] for w in words if w not in _SMALL_WORDS)
+        if len(words) >= 2 and len(initials) >= 3:
+            self._derived.setdefault((initials,), set()).add(instrument_key)
+
+    def build(self):
+        """
+        Merge derived aliases, dropping ambiguous ones. Call after adding names.
+        """
+        for words, keys in self._derived.items():
+            if len(keys) == 1 and words not in self.aliases:
+                self.aliases[words] = tuple(keys)
+                self._start(words)
+        self._derived = {}
+        return self
+
+    @classmethod
+    def for_universe(cls, instrument_keys, names=None, alias_path=None):
+        """
+        Index for a universe of instrument keys ("NSE_EQ|RELIANCE" contributes
+        the ticker "reliance"; ISIN-style keys need names or an alias file).
+        names: optional {instrument_key: company name}.
+        alias_path: optional CSV of 'instrument_key,alias[,alias...]' rows.
+        """
+        index = cls()
+        for key in instrument_keys:
+            code = key.split("|", 1)[-1]
+            if not _looks_like_isin(code):
+                index.add(key, code)
+        for key, name in (names or {}).items():
+            index.add_name(key, name)
+        if alias_path:
+            with open(alias_path, newline="") as f:
+                for row in csv.reader(f):
+                    if not row or row[0].startswith("#"):
+                        continue
+                    for alias in row[1:]:
+                        index.add(row[0].strip(), alias)
+        return index.build()
+
+    def match(self, headline):
+        """
+        Instrument keys mentioned in a headline.
+        """
+        words = _words(headline)
+        aliases = self.aliases
+        starts = self.starts
+        found = set()
+        for i, word in enumerate(words):
+            longest = starts.get(word)
+            if longest:
+                for n in range(1, longest + 1):
+                    keys = aliases.get(tuple(words[i:i + n]))
+                    if keys:
+                        found.update(keys)
+        return found
+
+
+class SentimentIndex:
+    """
+    Exponentially time-decayed headline sentiment per instrument plus a
+    market aggregate ("market").
+
+    Each key keeps a decayed score sum S and headline weight W; its value is
+    S / max(W, 1). With several fresh headlines that is their average; as
+    they age past the half-life the value fades towards 0 instead of
+    holding a stale opinion.
+    """
+    MARKET = "market"
+
+    def __init__(self, half_life=1800.0, clock=time.time):
+        self.half_life = half_life
+        self.clock = clock
+        self._state = {}  # key -> [score sum, weight, last update]
+
+    def __len__(self):
+        return len(self._state)
+
+    def _decayed(self, state, now):
+        dt = now - state[2]
+        if dt > 0:
+            factor = math.exp(-dt * math.log(2) / self.half_life)
+            state[0] *= factor
+            state[1] *= factor
+            state[2] = now
+        return state
+
+    def add(self, score, instrument_keys=(), now=None):
+        """
+        Record one headline's score for the market and every instrument it mentions.
+        """
+        now = self.clock() if now is None else now
+        for key in (self.MARKET, *instrument_keys):
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [0.0, 0.0, now]
+            self._decayed(state, now)
+            state[0] += score
+            state[1] += 1.0
+
+    def value(self, key, now=None):
+        state = self._state.get(key)
+        if state is None:
+            return 0.0
+        s, w, _ = self._decayed(state, self.clock() if now is None else now)
+        return s / max(w, 1.0)
+
+    def snapshot(self, now=None, floor=1e-4):
+        """
+        {key: value} for every key with a value above 'floor'; keys whose
+        news has fully decayed are forgotten.
+        """
+        now = self.clock() if now is None else now
+        out = {}
+        for key in list(self._state):
+            v = self.value(key, now)
+            if abs(v) >= floor or key == self.MARKET:
+                out[key] = v
+            else:
+                del self._state[key]
+        return out
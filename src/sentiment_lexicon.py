@@ -0,0 +1,138 @@
+import logging
+import re
+from collections import OrderedDict
+
+logger = logging.getLogger("SentimentLexicon")
+
+# Financial Keyword Dictionary (The "Edge")
+# Standard NLP often fails on jargon like "Guidance cut" or "Beat estimates"
+DEFAULT_KEYWORDS = {
+    # Positive
+    "surge": 0.5, "jump": 0.5, "high": 0.3, "gain": 0.4, "bull": 0.5,
+    "buy": 0.4, "outperform": 0.6, "beat": 0.6, "profit": 0.4,
+    "upgrade": 0.7, "acquisition": 0.4, "growth": 0.3, "record": 0.5,
+    # Negative
+    "slump": -0.5, "drop": -0.4, "fall": -0.4, "loss": -0.5, "bear": -0.5,
+    "sell": -0.4, "underperform": -0.6, "miss": -0.6, "debt": -0.3,
+    "downgrade": -0.7, "lawsuit": -0.8, "investigation": -0.8, "crash": -0.9
+}
+
+
+def load_lexicon(path):
+    """
+    Read keyword weights from a text file, one '<keyword or phrase> <weight>'
+    per line ('#' starts a comment), e.g.:
+
+        guidance cut   -0.7
+        beat estimates  0.8
+    """
+    keywords = {}
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                phrase, weight = line.rsplit(None, 1)
+                keywords[" ".join(phrase.lower().split())] = float(weight)
+            except ValueError:
+                logger.warning(f"{path}:{n}: expected '<keyword> <weight>', got {line!r}")
+    return keywords
+
+
+def _trie_pattern(words):
+    """
+    Regex for a set of words as a character trie, e.g. {"bear", "beat", "buy"}
+    -> "b(?:ea(?:r|t)|uy)", so the engine never re-tries a shared prefix.
+    Optional tails are greedy, which makes the longest keyword win.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return emit(trie)
+
+
+class KeywordScorer:
+    """
+    Keyword lexicon compiled into one trie-shaped regex, so a headline is
+    scanned once instead of once per keyword.
+
+    Keywords match at the start of a word and may be followed by more word
+    characters ("surge" matches "surged", "bull" matches "bullish", but
+    "fall" does not match "shortfall"). Each keyword counts once per text.
+    """
+    def __init__(self, keywords=None):
+        keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+        self.keywords = {" ".join(k.lower().split()): v for k, v in keywords.items()}
+        self._regex = re.compile(rf"\b{_trie_pattern(self.keywords)}") if self.keywords else None
+        self._multiword = any(" " in k for k in self.keywords)
+
+    @classmethod
+    def from_file(cls, path, extend=True):
+        """
+        Default lexicon extended (or replaced, extend=False) by a lexicon file.
+        """
+        keywords = dict(DEFAULT_KEYWORDS) if extend else {}
+        keywords.update(load_lexicon(path))
+        return cls(keywords)
+
+    def score(self, text):
+        if self._regex is None:
+            return 0.0
+        found = set(self._regex.findall(text.lower()))
+        if self._multiword:
+            found = {" ".join(m.split()) for m in found}
+        keywords = self.keywords
+        return sum(keywords[m] for m in found)
+
+
+class ScoreCache:
+    """
+    Bounded LRU of headline hash -> score. Only the 64-bit hash is kept, not
+    the headline text, so memory stays at ~maxsize small entries.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._scores)
+
+    def get(self, text):
+        key = hash(text)
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._scores.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, text, score):
+        self._scores[hash(text)] = score
+        if len(self._scores) > self.maxsize:
+            self._scores.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._scores),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
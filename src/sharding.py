@@ -0,0 +1,391 @@
+import logging
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+import zlib
+from market_data import MarketDataStreamer
+from strategy import GodfatherStrategy
+from candles import CandleAggregator
+from tick_journal import TickJournal
+from order_scheduler import PRIORITY_EXIT, PRIORITY_ENTRY
+from pnl import PnLEngine
+from history import HistoryWarmup, seed
+from latency import LATENCY
+
+logger = logging.getLogger("Sharding")
+
+
+def partition(symbols, n):
+    """
+    Split instrument keys into n shards by a stable hash, so a symbol stays on
+    the same shard when the list grows. Empty shards are dropped.
+    """
+    shards = [[] for _ in range(n)]
+    for symbol in symbols:
+        shards[zlib.crc32(symbol.encode("utf-8")) % n].append(symbol)
+    return [shard for shard in shards if shard]
+
+
+class ShardLink:
+    """
+    Message channel over one end of a multiprocessing Pipe. Incoming
+    messages are read by an event-loop reader on the pipe's fd, so neither
+    side needs a thread; on_message(msg) gets each tuple, and ("closed",)
+    when the other process goes away.
+    """
+    def __init__(self, conn, on_message):
+        self.conn = conn
+        self.on_message = on_message
+        self._loop = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.conn.fileno(), self._readable)
+
+    def _readable(self):
+        try:
+            while self.conn.poll():
+                self.on_message(self.conn.recv())
+        except (EOFError, OSError):
+            self.close()
+            self.on_message(("closed",))
+
+    def send(self, message):
+        """
+        Send one message; False when the other end is gone.
+        """
+        try:
+            self.conn.send(message)
+            return True
+        except (BrokenPipeError, EOFError, OSError) as e:
+            logger.error(f"Shard link send failed: {e}")
+            return False
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.remove_reader(self.conn.fileno())
+            self._loop = None
+        self.conn.close()
+
+
+class ShardOrderClient:
+    """
+    Stands in for UpstoxHandler inside a shard: orders are sent to the
+    coordinator, which applies global risk and owns the broker rate limits.
+    """
+    def __init__(self, link):
+        self.link = link
+        self._ids = itertools.count()
+        self._pending = {}  # request id -> future
+
+    async def place_order_async(self, symbol, side, quantity, priority=PRIORITY_ENTRY, **kwargs):
+        request = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request] = future
+        if not self.link.send(("order", request, priority, dict(kwargs, symbol=symbol, side=side, quantity=quantity))):
+            self.resolve(request, None)  # No coordinator to answer: fail the order now
+        return await future
+
+    def resolve(self, request, order_id):
+        future = self._pending.pop(request, None)
+        if future is not None and not future.done():
+            future.set_result(order_id)
+
+    def fail_all(self):
+        for request in list(self._pending):
+            self.resolve(request, None)
+
+
+class ShardIntelligence:
+    """
+    Sentiment pushed by the coordinator (the news scraper runs there once).
+    """
+    def __init__(self):
+        self.sentiment_cache = {}
+
+
+class ShardWorker:
+    """
+    One shard's decode -> candle -> strategy pipeline for its slice of the
+    universe, on its own feed connection, in its own process.
+    """
+    def __init__(self, shard_id, config, conn, report_interval=1.0):
+        self.shard_id = shard_id
+        self.config = config
+        self.link = ShardLink(conn, self.on_message)
+        self.report_interval = report_interval
+        self.client = ShardOrderClient(self.link)
+        self.brain = ShardIntelligence()
+        self.ticks = 0
+        self._stop = None
+        self._tasks = set()  # flatten / warm-up started by coordinator messages
+
+    async def _count(self, ticks):
+        self.ticks += len(ticks)
+
+    def on_message(self, message):
+        kind = message[0]
+        if kind == "order_result":
+            self.client.resolve(message[1], message[2])
+        elif kind == "sentiment":
+            self.brain.sentiment_cache = message[1]
+        elif kind == "flatten":
+            self._spawn(self.strategy.flatten(message[1]), "Flatten")
+        elif kind == "warmup":
+            self._spawn(self.warm_up(), "Warm-up")
+        elif kind in ("stop", "closed"):
+            self.client.fail_all()
+            self._stop.set()
+
+    def _spawn(self, coro, what):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._task_done, what))
+        return task
+
+    def _task_done(self, what, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Shard {self.shard_id}: {what} failed: {task.exception()!r}")
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        self.link.start()
+        config = self.config
+        LATENCY.enabled = config.get("LATENCY_STATS", True)
+        self.market_data = MarketDataStreamer(config)
+        self.strategy = GodfatherStrategy(self.client, self.brain, config)
+        self.strategy.pnl.max_loss = None  # The daily loss limit applies to all shards together (coordinator)
+        self.strategy.change_handlers.append(self.market_data.subscriptions.on_change)
+        self.candles = CandleAggregator(self.strategy.timeframe, config["TRADING_SYMBOL_LIST"],
+                                        on_close=self.strategy.on_bar_close)
+        self.market_data.tick_handlers.append(self.candles.on_ticks)
+        self.market_data.latest_handlers.append(self.strategy.on_ticks)
+        self.market_data.tick_handlers.append(self._count)
+        # Feed gaps flag partial bars; the REST resync stays with the coordinator's session
+        self.market_data.gap_handlers += [self.candles.mark_gap, self.strategy.on_gap]
+        journal = None
+        if config.get("JOURNAL_DIR"):
+            journal = TickJournal(os.path.join(config["JOURNAL_DIR"], f"shard-{self.shard_id}"))
+            journal.start()
+            self.market_data.frame_handlers.append(journal.record_frame)
+            self.market_data.tick_handlers.append(journal.on_ticks)
+
+        tasks = [asyncio.create_task(coro) for coro in (
+            self.candles.run(), self.strategy.risk.run(), self.market_data.connect(), self.report())]
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        if journal:
+            journal.stop()
+
+    async def warm_up(self):
+        """
+        Seed candles and indicators from the candle cache the coordinator
+        has just filled (workers have no REST session of their own).
+        """
+        warmup = HistoryWarmup.from_config(self.config, timeframe=self.strategy.timeframe)
+        if warmup:
+            intraday, _ = await warmup.load(self.config["TRADING_SYMBOL_LIST"])
+            seed(self.candles, self.strategy, intraday)
+
+    async def report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            positions = {symbol: {"side": pos["side"], "quantity": pos["quantity"], "entry_price": pos["entry_price"]}
+                         for symbol, pos in self.strategy.positions.items()}
+            pnl = self.strategy.pnl
+            self.link.send(("stats", {"ticks": self.ticks, "symbols": len(self.config["TRADING_SYMBOL_LIST"]),
+                                      "dispatch": self.market_data.dispatcher.stats(),
+                                      "connection": self.market_data.stats(),
+                                      "positions": positions,
+                                      "pnl": {"realized": pnl.realized, "unrealized": pnl.unrealized,
+                                              "gross_exposure": pnl.gross_exposure, "net_exposure": pnl.net_exposure}}))
+
+
+def _shard_main(shard_id, config, conn):
+    logging.basicConfig(level=logging.INFO, format=f'%(asctime)s - shard-{shard_id} - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(ShardWorker(shard_id, config, conn).run())
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardCoordinator:
+    """
+    Runs TRADING_SYMBOL_LIST as FEED_SHARDS worker processes, each with its
+    own feed connection and strategy, and enforces risk across all of them.
+
+    Workers send every order here. Exits always go through; entries are
+    refused while trading is halted, when the symbol already has a position
+    or entry in flight, or when RISK_MAX_OPEN_POSITIONS would be exceeded.
+    Accepted orders are placed through the one UpstoxHandler, so all shards
+    share its order scheduler and broker rate limits. Shard PnL reports are
+    summed against RISK_MAX_DAILY_LOSS; a breach halts and flattens every shard.
+    """
+    def __init__(self, config, upstox, brain, shards=None, sentiment_interval=1.0):
+        self.config = config
+        self.upstox = upstox
+        self.brain = brain
+        self.shards = partition(config["TRADING_SYMBOL_LIST"], shards or config.get("FEED_SHARDS", 1))
+        self.max_open_positions = config.get("RISK_MAX_OPEN_POSITIONS", 20)
+        self.sentiment_interval = sentiment_interval
+        self.max_loss = PnLEngine.from_config(config).max_loss
+
+        self.positions = {}        # symbol -> {"shard", "side", "quantity"} from filled orders
+        self.pending_entries = set()
+        self.halted = False
+        self.shard_stats = {}      # shard -> last stats report
+        self.denied = 0
+        self._links = {}
+        self._processes = {}
+        self._stopping = False
+
+    def start(self):
+        ctx = multiprocessing.get_context("spawn")
+        for shard_id, symbols in enumerate(self.shards):
+            parent, child = ctx.Pipe()
+            config = dict(self.config, TRADING_SYMBOL_LIST=symbols)
+            process = ctx.Process(target=_shard_main, args=(shard_id, config, child),
+                                  name=f"shard-{shard_id}", daemon=True)
+            process.start()
+            child.close()
+            link = ShardLink(parent, functools.partial(self._on_message, shard_id))
+            link.start()
+            self._links[shard_id] = link
+            self._processes[shard_id] = process
+            logger.info(f"Shard {shard_id}: {len(symbols)} symbols (pid {process.pid})")
+
+    async def stop(self, timeout=5.0):
+        self._stopping = True
+        for link in self._links.values():
+            link.send(("stop",))
+        loop = asyncio.get_running_loop()
+        for process in self._processes.values():
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                process.terminate()
+        for link in self._links.values():
+            link.close()
+        self._links = {}
+        self._processes = {}
+        self._stopping = False
+
+    def _on_message(self, shard_id, message):
+        kind = message[0]
+        if kind == "order":
+            asyncio.create_task(self._order(shard_id, *message[1:]))
+        elif kind == "stats":
+            self.shard_stats[shard_id] = message[1]
+            self._check_loss()
+        elif kind == "closed":
+            if not self._stopping:
+                logger.error(f"Shard {shard_id} exited.")
+            self._links.pop(shard_id, None)
+
+    def _check_entry(self, symbol):
+        """
+        Reason to refuse a new entry, or None.
+        """
+        if self.halted:
+            return "trading halted"
+        if symbol in self.positions or symbol in self.pending_entries:
+            return "position already open"
+        if len(self.positions) + len(self.pending_entries) >= self.max_open_positions:
+            return f"max {self.max_open_positions} open positions"
+        return None
+
+    async def _order(self, shard_id, request, priority, order):
+        symbol = order["symbol"]
+        order_id = None
+        if priority == PRIORITY_EXIT:
+            order_id = await self.upstox.place_order_async(priority=priority, **order)
+            if order_id is not None:
+                self.positions.pop(symbol, None)
+        else:
+            reason = self._check_entry(symbol)
+            if reason:
+                self.denied += 1
+                logger.warning(f"Entry refused for {symbol} (shard {shard_id}): {reason}")
+            else:
+                self.pending_entries.add(symbol)
+                try:
+                    order_id = await self.upstox.place_order_async(priority=priority, **order)
+                finally:
+                    self.pending_entries.discard(symbol)
+                if order_id is not None:
+                    self.positions[symbol] = {"shard": shard_id, "side": order["side"], "quantity": order["quantity"]}
+        link = self._links.get(shard_id)
+        if link:
+            link.send(("order_result", request, order_id))
+
+    def pnl(self):
+        totals = {"realized": 0.0, "unrealized": 0.0, "gross_exposure": 0.0, "net_exposure": 0.0}
+        for s in self.shard_stats.values():
+            for key, value in s.get("pnl", {}).items():
+                totals[key] += value
+        totals["total"] = totals["realized"] + totals["unrealized"]
+        return totals
+
+    def _check_loss(self):
+        if self.max_loss is None or self.halted:
+            return
+        total = self.pnl()["total"]
+        if total <= -self.max_loss:
+            self.halt(f"Daily loss limit hit: {total:.2f} <= -{self.max_loss:.2f}", flatten=True)
+
+    def halt(self, reason, flatten=False):
+        """
+        Refuse all new entries; with flatten=True also close every open position.
+        """
+        self.halted = True
+        logger.critical(f"Trading halted: {reason}")
+        if flatten:
+            for link in self._links.values():
+                link.send(("flatten", reason))
+
+    def warmed_up(self):
+        """
+        Tell the shards the candle cache is filled for today (see ShardWorker.warm_up).
+        """
+        for link in self._links.values():
+            link.send(("warmup",))
+
+    def broadcast_sentiment(self, cache):
+        market = cache.get("market", 0.0)
+        for shard_id, link in self._links.items():
+            sliced = {symbol: cache[symbol] for symbol in self.shards[shard_id] if symbol in cache}
+            sliced["market"] = market
+            link.send(("sentiment", sliced))
+
+    async def run(self):
+        """
+        Start the shards and push sentiment updates until cancelled.
+        """
+        self.start()
+        published = None
+        try:
+            while True:
+                cache = self.brain.sentiment_cache
+                if cache is not published:
+                    self.broadcast_sentiment(cache)
+                    published = cache
+                await asyncio.sleep(self.sentiment_interval)
+        finally:
+            await self.stop()
+
+    def stats(self):
+        return {
+            "shards": len(self.shards),
+            "alive": sum(p.is_alive() for p in self._processes.values()),
+            "open_positions": len(self.positions),
+            "pending_entries": len(self.pending_entries),
+            "denied_entries": self.denied,
+            "halted": self.halted,
+            "pnl": {key: round(value, 2) for key, value in self.pnl().items()},
+            "ticks": sum(s.get("ticks", 0) for s in self.shard_stats.values()),
+            "per_shard": {shard_id: {"symbols": s["symbols"], "ticks": s["ticks"], "positions": len(s["positions"])}
+                          for shard_id, s in self.shard_stats.items()},
+        }
@@ -0,0 +1,99 @@
+import numpy as np
+
+_NAN = np.nan
+
+
+class SignalBoard:
+    """
+    Latest closed-bar values for the whole universe in aligned NumPy arrays
+    (one slot per symbol), so the Godfather entry conditions can be evaluated
+    for every symbol in a single vectorized pass at bar close.
+    """
+    def __init__(self, symbols=()):
+        self.symbols = []
+        self.index = {}  # symbol -> slot
+        self._alloc(max(len(symbols), 16))
+        for symbol in symbols:
+            self.slot(symbol)
+
+    def _alloc(self, capacity):
+        def grow(old, fill, dtype):
+            arr = np.full(capacity, fill, dtype=dtype)
+            if old is not None:
+                arr[:len(old)] = old
+            return arr
+
+        self.ts = grow(getattr(self, "ts", None), -1, np.int64)
+        self.bars = grow(getattr(self, "bars", None), 0, np.int64)
+        self.close = grow(getattr(self, "close", None), _NAN, np.float64)
+        self.vwap = grow(getattr(self, "vwap", None), _NAN, np.float64)
+        self.rsi = grow(getattr(self, "rsi", None), _NAN, np.float64)
+        self.atr = grow(getattr(self, "atr", None), _NAN, np.float64)
+        self.volume = grow(getattr(self, "volume", None), _NAN, np.float64)
+        self.vol_sma = grow(getattr(self, "vol_sma", None), _NAN, np.float64)
+        self.full = grow(getattr(self, "full", None), True, np.bool_)  # Volume is traded volume, not ltpc samples
+        self.capacity = capacity
+
+    def slot(self, symbol):
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i == self.capacity:
+                self._alloc(self.capacity * 2)
+            self.index[symbol] = i
+            self.symbols.append(symbol)
+        return i
+
+    def update(self, symbol, state):
+        """
+        Copy a symbol's IndicatorState into its slot.
+        """
+        i = self.slot(symbol)
+        self.ts[i] = state.last_ts
+        self.bars[i] = state.bars
+        self.close[i] = state.close
+        self.vwap[i] = state.vwap
+        self.rsi[i] = state.rsi
+        self.atr[i] = state.atr
+        self.volume[i] = state.volume
+        self.vol_sma[i] = state.vol_sma
+        self.full[i] = state.full
+
+    def evaluate(self, bar_ts, sentiment, min_sentiment=0.1, vol_surge=2.0,
+                 rsi_long=(50.0, 75.0), rsi_short_max=50.0, min_bars=50):
+        """
+        Evaluate the entry masks for every symbol whose latest bar is bar_ts.
+        sentiment is a scalar (market) or an array aligned with the slots.
+        The volume surge only counts on traded volume (full-mode bars).
+        Returns (long_slots, short_slots) as index arrays.
+        """
+        n = len(self.symbols)
+        close = self.close[:n]
+        vwap = self.vwap[:n]
+        rsi = self.rsi[:n]
+        if not np.isscalar(sentiment):
+            sentiment = np.asarray(sentiment)[:n]
+
+        ready = (self.ts[:n] == bar_ts) & (self.bars[:n] >= min_bars)
+        vol_surge_ok = self.full[:n] & (self.volume[:n] > self.vol_sma[:n] * vol_surge)
+        base = ready & vol_surge_ok
+
+        longs = base & (close > vwap) & (rsi > rsi_long[0]) & (rsi < rsi_long[1]) & (sentiment > min_sentiment)
+        shorts = base & (close < vwap) & (rsi < rsi_short_max) & (sentiment < -min_sentiment)
+        return np.flatnonzero(longs), np.flatnonzero(shorts)
+
+    def forming(self, bar_ts, vol_surge=2.0, near=0.75, rsi_long=50.0, rsi_short_max=50.0, min_bars=50):
+        """
+        Slots close to an entry: trend and RSI on one side and volume at
+        least 'near' of the surge threshold (sentiment ignored). Volume is
+        compared with the average on its own basis, so ltpc symbols can
+        form (and get promoted to full mode) on sampled volume.
+        """
+        n = len(self.symbols)
+        close = self.close[:n]
+        vwap = self.vwap[:n]
+        rsi = self.rsi[:n]
+        ready = (self.ts[:n] == bar_ts) & (self.bars[:n] >= min_bars)
+        volume_near = self.volume[:n] > self.vol_sma[:n] * vol_surge * near
+        sided = ((close > vwap) & (rsi > rsi_long)) | ((close < vwap) & (rsi < rsi_short_max))
+        return np.flatnonzero(ready & volume_near & sided)
@@ -1,7 +1,14 @@
 import logging
-import pandas as pd
+import numpy as np
 import asyncio
-from indicators import TechnicalIndicators
+import time
+from streaming_indicators import IndicatorState
+from signals import SignalBoard
+from order_scheduler import PRIORITY_EXIT
+from risk_engine import RiskEngine
+from pnl import PnLEngine
+from latency import LATENCY, now_ns
+from candles import SESSION_TZ
 from datetime import datetime
 
 logger = logging.getLogger("StrategyEngine")
@@ -15,83 +22,230 @@ class GodfatherStrategy:
     3. Intelligence (Sentiment)
     4. Time (Decay protection)
     """
-    def __init__(self, client, intelligence_module, config):
+    def __init__(self, client, intelligence_module, config, clock=time.time):
         self.client = client
         self.brain = intelligence_module
         self.config = config
+        self.clock = clock # Epoch seconds; replaced by a simulated clock in replays
         self.positions = {} # Symbol -> Position Data
         self.active_orders = {}
+        self.change_handlers = [] # Sync callbacks(event, symbol) on position open/close (dashboard push)
+        self.indicators = {} # Symbol -> IndicatorState (incremental VWAP/RSI/ATR/Vol SMA)
+        self.forming = set() # Symbols close to an entry at the last bar close ("forming" / "settled" events)
+        self.inflight = set() # Symbols with an entry / exit order on the wire (left alone by reconcile)
+        self.gap_until = 0 # Feed outage end (epoch millis): bars opened before it are incomplete
+        self._tasks = set() # Entry batches / flatten running off the feed path, see _spawn()
+        self._flatten_task = None
         
         # Parameters
         self.timeframe = '1min' # HFT requires fast candles
         self.rsi_period = 14
         self.atr_period = 14
         self.vol_ma_period = 20
+        self.min_bars = 50 # Need history for MA/RSI
         self.min_sentiment_score = 0.1
+        self.vol_surge_mult = 2.0
+        self.rsi_band = (50.0, 75.0) # Longs need RSI inside it, shorts below its lower edge
+        self.sl_atr_mult = 1.5 # Stop loss / target distance from the entry in ATRs
+        self.tgt_atr_mult = 3.0
+        self.forming_ratio = 0.75 # Volume at this fraction of the surge threshold counts as forming
         
-    async def on_tick(self, tick_data):
+        # SL/Target bands + 5-min time stop (min 0.2% profit) on a timer wheel
+        self.time_stop_minutes = 5.0
+        self.time_stop_min_profit = 0.002
+        self.risk = RiskEngine(self.time_stop_minutes * 60, self.time_stop_min_profit, clock=clock)
+        
+        # Mark-to-market; breaching RISK_MAX_DAILY_LOSS halts entries and flattens
+        self.pnl = PnLEngine.from_config(config, on_breach=self.halt)
+        self.halted = False
+        
+        # Batched bar-close evaluation across TRADING_SYMBOL_LIST
+        self.signal_board = SignalBoard(config.get("TRADING_SYMBOL_LIST", []))
+        
+    async def on_ticks(self, ticks):
+        """
+        Called with the batch of Ticks decoded from one feed frame.
+        """
+        started = now_ns()
+        check = self.risk.check
+        mark = self.pnl.mark
+        for tick in ticks:
+            mark(tick.symbol, tick.ltp)
+            reason = check(tick.symbol, tick.ltp)
+            if reason:
+                await self.exit_on(tick.symbol, reason)
+                started = now_ns()  # Exclude the order round trip
+        LATENCY.record("risk", started)
+
+    async def on_tick(self, tick):
         """
         Called on every WebSocket tick.
         HFT Logic: Check if we need to escape immediately.
         """
-        symbol = tick_data['symbol']
-        current_price = tick_data['ltp']
+        symbol = tick.symbol
+        current_price = tick.ltp
         
         if symbol in self.positions:
             await self.manage_risk(symbol, current_price)
 
-    async def on_candle(self, symbol, df_candles):
+    def _indicator_state(self, symbol):
+        state = self.indicators.get(symbol)
+        if state is None:
+            state = self.indicators[symbol] = IndicatorState(self.rsi_period, self.atr_period, self.vol_ma_period)
+        return state
+
+    def seed(self, symbol, bars):
+        """
+        Rebuild a symbol's indicator state from its bar history (columns
+        ts/open/high/low/close/volume, oldest first), e.g. warm-up candles.
+        """
+        state = self.indicators[symbol] = IndicatorState(self.rsi_period, self.atr_period, self.vol_ma_period)
+        for bar in zip(*(bars[name].tolist() for name in ("ts", "open", "high", "low", "close", "volume"))):
+            state.update(*bar)
+        if state.bars:
+            self.signal_board.update(symbol, state)
+
+    async def on_bar(self, symbol, bar):
         """
-        Called when a new 1-min candle is closed.
-        Main Entry Logic.
+        Called by the candle builder when a 1-min bar closes.
+        bar = (ts, open, high, low, close, volume[, full]). O(1) per bar.
         """
-        # 1. Calculate Indicators
-        df = df_candles.copy()
+        state = self._indicator_state(symbol)
+        state.update(*bar)
         
         # Check sufficient data
-        if len(df) < 50:
-            return # Need history for MA/RSI
-            
-        df['vwap'] = TechnicalIndicators.calculate_vwap(df)
-        df['rsi'] = TechnicalIndicators.calculate_rsi(df, self.rsi_period)
-        df['atr'] = TechnicalIndicators.calculate_atr(df, self.atr_period)
-        df['vol_sma'] = TechnicalIndicators.calculate_sma_volume(df, self.vol_ma_period)
+        if state.bars < self.min_bars:
+            return
+        
+        await self.evaluate_signal(symbol, state)
+
+    async def on_bar_close(self, bar_ts, bars):
+        """
+        Batched mode: called once per bar boundary with every symbol's closed
+        bar [(symbol, bar), ...]. Indicator states are updated per symbol, then
+        the entry conditions are evaluated for the whole universe at once.
+        bar = (ts, open, high, low, close, volume[, full]); full=False marks
+        ltpc-sampled volume, which never counts as a surge.
+        """
+        started = now_ns()
+        board = self.signal_board
+        for symbol, bar in bars:
+            board.update(symbol, self._indicator_state(symbol).update(*bar))
+        LATENCY.record("indicator", started)
+        
+        # Instrument sentiment where the symbol has news, market sentiment otherwise
+        cache = self.brain.sentiment_cache
+        market = cache.get('market', 0.0)
+        if len(cache) > 1:
+            sentiment_score = np.fromiter((cache.get(s, market) for s in board.symbols), float, len(board.symbols))
+        else:
+            sentiment_score = market
+        started = now_ns()
+        long_slots, short_slots = board.evaluate(
+            bar_ts, sentiment_score, self.min_sentiment_score, self.vol_surge_mult,
+            rsi_long=self.rsi_band, rsi_short_max=self.rsi_band[0], min_bars=self.min_bars
+        )
+        LATENCY.record("signal", started)
+        if self.change_handlers:
+            self._update_forming(board.forming(bar_ts, self.vol_surge_mult, self.forming_ratio, rsi_long=self.rsi_band[0],
+                                               rsi_short_max=self.rsi_band[0], min_bars=self.min_bars))
+        if bar_ts < self.gap_until:
+            # The feed was down during this bar: its volume and range are partial
+            if len(long_slots) or len(short_slots):
+                logger.info(f"Skipping {len(long_slots) + len(short_slots)} entry signals on a bar the feed gap overlaps.")
+            return
+        
+        entries = []
+        for i in long_slots.tolist():
+            symbol = board.symbols[i]
+            if symbol not in self.positions and symbol not in self.inflight:
+                logger.info(f"GODFATHER SIGNAL [LONG]: {symbol} @ {board.close[i]}")
+                entries.append((symbol, "BUY", float(board.close[i]), float(board.atr[i])))
+        
+        for i in short_slots.tolist():
+            symbol = board.symbols[i]
+            if symbol not in self.positions and symbol not in self.inflight:
+                logger.info(f"GODFATHER SIGNAL [SHORT]: {symbol} @ {board.close[i]}")
+                entries.append((symbol, "SELL", float(board.close[i]), float(board.atr[i])))
+        
+        if entries:
+            # Placed concurrently on a task of their own: this runs under the candle
+            # builder's close lock, which the ordered tick handlers wait on
+            self.inflight.update(entry[0] for entry in entries)
+            self._spawn(self._enter(entries), "Entry batch")
+
+    async def _enter(self, entries):
+        try:
+            await asyncio.gather(*(self.execute_trade(*entry) for entry in entries))
+        finally:
+            self.inflight.difference_update(entry[0] for entry in entries)
+
+    async def on_candle(self, symbol, df_candles):
+        """
+        Called with the candle history of a symbol (DataFrame entry point).
+        Only bars newer than the symbol's indicator state are folded in, so
+        repeated calls with a growing frame cost O(new bars).
+        """
+        state = self._indicator_state(symbol)
+        ts = _bar_times(df_candles)
+        start = 0
+        if state.last_ts is not None:
+            start = int(ts.searchsorted(state.last_ts, side='right'))
         
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
+        rows = zip(
+            ts[start:].tolist(),
+            df_candles['open'].to_numpy()[start:].tolist(),
+            df_candles['high'].to_numpy()[start:].tolist(),
+            df_candles['low'].to_numpy()[start:].tolist(),
+            df_candles['close'].to_numpy()[start:].tolist(),
+            df_candles['volume'].to_numpy()[start:].tolist(),
+        )
+        for row in rows:
+            state.update(*row)
         
-        # Get Global Sentiment
-        sentiment_score = self.brain.sentiment_cache.get('market', 0.0)
+        # Check sufficient data
+        if state.bars < self.min_bars:
+            return
+        
+        await self.evaluate_signal(symbol, state)
+
+    async def evaluate_signal(self, symbol, latest):
+        """
+        Main Entry Logic on the latest closed bar's indicator values.
+        """
+        # Instrument sentiment, falling back to Global Sentiment
+        cache = self.brain.sentiment_cache
+        sentiment_score = cache.get(symbol, cache.get('market', 0.0))
         
         # 2. LONG Signal Logic
         # Condition A: Price > VWAP (Trend is Up)
-        cond_trend_up = latest['close'] > latest['vwap']
+        cond_trend_up = latest.close > latest.vwap
         
         # Condition B: High Volume (Volume Spike > 200% of Avg)
-        cond_vol_surge = latest['volume'] > (latest['vol_sma'] * 2.0)
+        cond_vol_surge = latest.full and latest.volume > (latest.vol_sma * self.vol_surge_mult)
         
         # Condition C: RSI not overbought (< 70) but rising
-        cond_rsi_ok = 50 < latest['rsi'] < 75
+        cond_rsi_ok = self.rsi_band[0] < latest.rsi < self.rsi_band[1]
         
         # Condition D: Sentiment Positive
         cond_sent_ok = sentiment_score > self.min_sentiment_score
         
         if cond_trend_up and cond_vol_surge and cond_rsi_ok and cond_sent_ok:
             if symbol not in self.positions:
-                logger.info(f"GODFATHER SIGNAL [LONG]: {symbol} @ {latest['close']}")
-                await self.execute_trade(symbol, "BUY", latest['close'], latest['atr'])
+                logger.info(f"GODFATHER SIGNAL [LONG]: {symbol} @ {latest.close}")
+                await self.execute_trade(symbol, "BUY", latest.close, latest.atr)
 
         # 3. SHORT Signal Logic
         # Condition A: Price < VWAP (Trend is Down)
-        cond_trend_down = latest['close'] < latest['vwap']
+        cond_trend_down = latest.close < latest.vwap
         
         # Condition D: Sentiment Negative
         cond_sent_neg = sentiment_score < -self.min_sentiment_score
         
-        if cond_trend_down and cond_vol_surge and (latest['rsi'] < 50) and cond_sent_neg:
+        if cond_trend_down and cond_vol_surge and (latest.rsi < self.rsi_band[0]) and cond_sent_neg:
              if symbol not in self.positions:
-                logger.info(f"GODFATHER SIGNAL [SHORT]: {symbol} @ {latest['close']}")
-                await self.execute_trade(symbol, "SELL", latest['close'], latest['atr'])
+                logger.info(f"GODFATHER SIGNAL [SHORT]: {symbol} @ {latest.close}")
+                await self.execute_trade(symbol, "SELL", latest.close, latest.atr)
 
     async def execute_trade(self, symbol, side, price, atr):
         """
@@ -99,57 +253,211 @@ class GodfatherStrategy:
         """
         # Position Sizing (Risk 1% of capital per trade - Example placeholder)
         quantity = 1 # TODO: Calculate based on Risk Manager
+        if self.halted:
+            logger.warning(f"Trading halted. Skipping {side} {symbol}.")
+            return
         
-        sl_price = price - (1.5 * atr) if side == "BUY" else price + (1.5 * atr)
-        tgt_price = price + (3.0 * atr) if side == "BUY" else price - (3.0 * atr)
+        sl_price, tgt_price = self._bands(side, price, atr)
         
         logger.info(f"Placing {side} Order: {symbol} Qty: {quantity} SL: {sl_price:.2f} TGT: {tgt_price:.2f}")
         
-        # Place Main Order
-        # order_id = await self.client.place_order(...) 
+        # Place Main Order (async, pooled HTTP - never blocks the feed loop)
+        self.inflight.add(symbol)
+        try:
+            order_id = await self.client.place_order_async(symbol, side, quantity)
+        finally:
+            self.inflight.discard(symbol)
+        if order_id is None:
+            logger.error(f"Entry order failed for {symbol}. Position not opened.")
+            return
+        self.active_orders[order_id] = {"symbol": symbol, "side": side, "quantity": quantity, "purpose": "ENTRY"}
+        self.pnl.fill(symbol, side, quantity, price)
         
         # Store in self.positions
+        opened_at = self.clock()
         self.positions[symbol] = {
             "side": side,
             "entry_price": price,
-            "entry_time": datetime.now(),
+            "entry_time": datetime.fromtimestamp(opened_at),
             "quantity": quantity,
             "sl": sl_price,
             "tgt": tgt_price
         }
+        self.risk.add(symbol, self.positions[symbol], opened_at)
+        self._changed("open", symbol)
+
+    def _bands(self, side, price, atr):
+        """
+        (stop loss, target) at sl_atr_mult / tgt_atr_mult ATRs from the entry price.
+        """
+        if side == "BUY":
+            return price - self.sl_atr_mult * atr, price + self.tgt_atr_mult * atr
+        return price + self.sl_atr_mult * atr, price - self.tgt_atr_mult * atr
+
+    def _update_forming(self, slots):
+        symbols = self.signal_board.symbols
+        forming = {symbols[i] for i in slots.tolist()}
+        for symbol in forming - self.forming:
+            self._changed("forming", symbol)
+        for symbol in self.forming - forming:
+            self._changed("settled", symbol)
+        self.forming = forming
+
+    def _changed(self, event, symbol):
+        for handler in self.change_handlers:
+            handler(event, symbol)
 
     async def manage_risk(self, symbol, current_ltp):
         """
         Active Position Management.
+        1. Hard Stop Loss  2. Target  3. Time Decay: open > 5 mins with < 0.2% profit.
+        All three are folded into the RiskEngine band check (one comparison per tick).
         """
-        pos = self.positions[symbol]
-        
-        # 1. Hard Stop Loss Check
-        if pos['side'] == "BUY" and current_ltp <= pos['sl']:
-            await self.close_position(symbol, "SL Hit")
-        elif pos['side'] == "SELL" and current_ltp >= pos['sl']:
-            await self.close_position(symbol, "SL Hit")
-            
-        # 2. Target Hit Check
-        if pos['side'] == "BUY" and current_ltp >= pos['tgt']:
-            await self.close_position(symbol, "Target Hit")
-        elif pos['side'] == "SELL" and current_ltp <= pos['tgt']:
-            await self.close_position(symbol, "Target Hit")
-            
-        # 3. Time Decay (Escape Logic)
-        # If trade is open > 5 mins and profit is < 0.2%, KILL IT.
-        time_elapsed = (datetime.now() - pos['entry_time']).total_seconds() / 60
-        if time_elapsed > 5.0:
-            # Check pnl
-            pnl_pct = (current_ltp - pos['entry_price']) / pos['entry_price']
-            if pos['side'] == "SELL": pnl_pct *= -1
-            
-            if pnl_pct < 0.002: # Less than 0.2% profit after 5 mins
-                logger.info(f"Time Decay Escape: {symbol} stagnant for 5 mins.")
-                await self.close_position(symbol, "Time Stop")
+        reason = self.risk.check(symbol, current_ltp)
+        if reason:
+            await self.exit_on(symbol, reason)
+
+    async def exit_on(self, symbol, reason):
+        if reason == "Time Stop":
+            logger.info(f"Time Decay Escape: {symbol} stagnant for {self.time_stop_minutes:g} mins.")
+        await self.close_position(symbol, reason)
 
     async def close_position(self, symbol, reason):
         logger.info(f"Closing Position {symbol}: {reason}")
-        # await self.client.exit_position(...)
-        del self.positions[symbol]
+        # Remove first so ticks arriving while the exit is in flight don't re-trigger it
+        pos = self.positions.pop(symbol)
+        self.risk.remove(symbol)
+        exit_side = "SELL" if pos['side'] == "BUY" else "BUY"
+        self.inflight.add(symbol)
+        try:
+            order_id = await self.client.place_order_async(symbol, exit_side, pos['quantity'], priority=PRIORITY_EXIT)
+        finally:
+            self.inflight.discard(symbol)
+        if order_id is None:
+            logger.error(f"Exit order failed for {symbol} ({reason}). Position restored.")
+            self.positions[symbol] = pos
+            self.risk.add(symbol, pos, pos['entry_time'].timestamp())
+            self._changed("restore", symbol)
+            return
+        self.active_orders[order_id] = {"symbol": symbol, "side": exit_side, "quantity": pos['quantity'], "purpose": reason}
+        self.pnl.fill(symbol, exit_side, pos['quantity'], self.pnl.last_price(symbol, pos['entry_price']))
+        self._changed("close", symbol)
+
+    def on_gap(self, start_ms, end_ms):
+        """
+        Market feed outage from start_ms to end_ms (epoch millis): no entries
+        on the bars it overlaps.
+        """
+        self.gap_until = max(self.gap_until, end_ms)
+
+    def reconcile(self, broker_positions, orders, skip=()):
+        """
+        Align positions and active_orders with the broker's, e.g. after a feed
+        outage. broker_positions: {symbol: (net quantity, average price)} with
+        shorts negative; orders: {order_id: order book entry}. Symbols in
+        'skip' (orders in flight, changed while the broker was queried) are
+        left alone. Returns the number of positions changed.
+        """
+        changed = 0
+        symbols = set(self.positions) | {s for s, (qty, _) in broker_positions.items()
+                                         if qty and s in self.signal_board.index}
+        for symbol in symbols - set(skip) - self.inflight:
+            pos = self.positions.get(symbol)
+            local = 0 if pos is None else (pos['quantity'] if pos['side'] == "BUY" else -pos['quantity'])
+            qty, price = broker_positions.get(symbol, (0, 0.0))
+            if qty == local:
+                continue
+            changed += 1
+            if pos is not None and (qty == 0 or qty * local < 0):
+                # Closed (or flipped) at the broker while we weren't looking
+                logger.warning(f"Resync: {symbol} {pos['side']} x{pos['quantity']} is flat at the broker. Dropping it.")
+                self.positions.pop(symbol)
+                self.risk.remove(symbol)
+                exit_side = "SELL" if pos['side'] == "BUY" else "BUY"
+                self.pnl.fill(symbol, exit_side, pos['quantity'], self.pnl.last_price(symbol, pos['entry_price']))
+                self._changed("close", symbol)
+                pos, local = None, 0
+                if qty == 0:
+                    continue
+            side = "BUY" if qty > 0 else "SELL"
+            if pos is None:
+                logger.warning(f"Resync: adopting broker position {symbol} {side} x{abs(qty)} @ {price}")
+                state = self.indicators.get(symbol)
+                atr = state.atr if state is not None and state.atr > 0 else price * 0.005
+                sl_price, tgt_price = self._bands(side, price, atr)
+                opened_at = self.clock()
+                self.positions[symbol] = {
+                    "side": side,
+                    "entry_price": price,
+                    "entry_time": datetime.fromtimestamp(opened_at),
+                    "quantity": abs(qty),
+                    "sl": sl_price,
+                    "tgt": tgt_price
+                }
+                self.pnl.fill(symbol, side, abs(qty), price)
+                self.risk.add(symbol, self.positions[symbol], opened_at)
+                self._changed("open", symbol)
+            else:
+                logger.warning(f"Resync: {symbol} quantity {abs(local)} -> {abs(qty)} at the broker")
+                delta = qty - local
+                self.pnl.fill(symbol, "BUY" if delta > 0 else "SELL", abs(delta), price)
+                pos['quantity'] = abs(qty)
+
+        for order_id in list(self.active_orders):
+            status = orders.get(order_id, {}).get("status")
+            if status in ("complete", "rejected", "cancelled"):
+                order = self.active_orders.pop(order_id)
+                if status != "complete":
+                    logger.warning(f"Resync: {order['purpose']} order {order_id} for {order['symbol']} was {status}.")
+        return changed
 
+    def halt(self, reason):
+        """
+        Stop opening positions and close the open ones.
+        """
+        if self.halted:
+            return
+        self.halted = True
+        logger.critical(f"Trading halted: {reason}")
+        self._flatten_task = self._spawn(self.flatten(reason), "Flatten")
+        self._changed("halt", None)
+
+    async def flatten(self, reason):
+        for symbol in list(self.positions):
+            if symbol in self.positions: # May have exited while earlier exits were in flight
+                await self.close_position(symbol, reason)
+
+    def _spawn(self, coro, what):
+        """
+        Run coro as a tracked task whose failure is logged.
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._task_done(t, what))
+        return task
+
+    def _task_done(self, task, what):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{what} failed: {task.exception()!r}")
+
+    async def settle(self):
+        """
+        Wait for the entry batches / flatten started so far (replays, tests).
+        """
+        while pending := [task for task in self._tasks if not task.done()]:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _bar_times(df):
+    """
+    Bar open times of a candle frame as epoch millis. Naive timestamps are
+    session-local (as CandleBuffer.to_frame produces them).
+    """
+    import pandas as pd  # Deferred: only the DataFrame entry point (on_candle) needs it
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is None:
+            index = index.tz_localize(SESSION_TZ)
+        return index.as_unit('ms').asi8
+    return pd.RangeIndex(len(df)).to_numpy()
@@ -0,0 +1,185 @@
+import math
+from collections import deque
+
+NAN = float("nan")
+SESSION_UTC_OFFSET_MS = 19_800_000  # IST (UTC+05:30), no DST
+DAY_MS = 86_400_000
+
+
+def session_day(ts):
+    """
+    Trading session (IST calendar day) of an epoch-millis timestamp.
+    """
+    return (ts + SESSION_UTC_OFFSET_MS) // DAY_MS
+
+
+class RMA:
+    """
+    Wilder's moving average as pandas_ta computes it:
+    series.ewm(alpha=1/length, min_periods=length).mean() (adjust=True).
+    The adjusted EWM is a ratio of two decayed sums, so it updates in O(1).
+    """
+    __slots__ = ("length", "decay", "num", "den", "count", "value")
+
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.num = 0.0
+        self.den = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def update(self, x):
+        self.num = x + self.decay * self.num
+        self.den = 1.0 + self.decay * self.den
+        self.count += 1
+        if self.count >= self.length:
+            self.value = self.num / self.den
+        return self.value
+
+
+class StreamingRSI:
+    """
+    RSI (pandas_ta.rsi, RMA smoothing) updated per closed bar.
+    """
+    __slots__ = ("gain", "loss", "prev_close", "value")
+
+    def __init__(self, length=14):
+        self.gain = RMA(length)
+        self.loss = RMA(length)
+        self.prev_close = None
+        self.value = NAN
+
+    def update(self, close):
+        prev = self.prev_close
+        self.prev_close = close
+        if prev is None:
+            return self.value  # diff() is NaN on the first bar
+        change = close - prev
+        gain = self.gain.update(change if change > 0 else 0.0)
+        loss = self.loss.update(-change if change < 0 else 0.0)
+        total = gain + loss
+        self.value = 100.0 * gain / total if total else NAN
+        return self.value
+
+
+class StreamingATR:
+    """
+    ATR (pandas_ta.atr, RMA of true range) updated per closed bar.
+    """
+    __slots__ = ("rma", "prev_close", "value")
+
+    def __init__(self, length=14):
+        self.rma = RMA(length)
+        self.prev_close = None
+        self.value = NAN
+
+    def update(self, high, low, close):
+        prev = self.prev_close
+        self.prev_close = close
+        if prev is None:
+            return self.value  # True range is NaN on the first bar
+        tr = high - low
+        if high - prev > tr:
+            tr = high - prev
+        if prev - low > tr:
+            tr = prev - low
+        self.value = self.rma.update(tr)
+        return self.value
+
+
+class StreamingSMA:
+    """
+    Rolling simple moving average (pandas_ta.sma / rolling(length).mean()).
+    Keeps a running sum; re-sums the window once per 'length' updates so
+    floating point drift can't accumulate over a session.
+    """
+    __slots__ = ("length", "window", "total", "since_resum", "value")
+
+    def __init__(self, length=20):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.since_resum = 0
+        self.value = NAN
+
+    def update(self, x):
+        window = self.window
+        if len(window) == self.length:
+            self.total -= window[0]
+        window.append(x)
+        self.total += x
+        self.since_resum += 1
+        if self.since_resum >= self.length:
+            self.total = math.fsum(window)
+            self.since_resum = 0
+        if len(window) == self.length:
+            self.value = self.total / self.length
+        return self.value
+
+
+class SessionVWAP:
+    """
+    Session-anchored VWAP on typical price (pandas_ta.vwap, anchor='D').
+    Resets at the start of each IST trading day.
+    """
+    __slots__ = ("day", "pv", "vol", "value")
+
+    def __init__(self):
+        self.day = None
+        self.pv = 0.0
+        self.vol = 0.0
+        self.value = NAN
+
+    def update(self, ts, high, low, close, volume):
+        day = session_day(ts)
+        if day != self.day:
+            self.day = day
+            self.pv = 0.0
+            self.vol = 0.0
+        self.pv += (high + low + close) / 3.0 * volume
+        self.vol += volume
+        self.value = self.pv / self.vol if self.vol else NAN
+        return self.value
+
+
+class IndicatorState:
+    """
+    Per-symbol indicator bundle used by GodfatherStrategy.
+    update() costs O(1) per closed bar regardless of history length.
+
+    Bar volume comes on two bases: traded volume (full-mode feed, history)
+    and sampled last-trade quantities (ltpc feed), a small fraction of it.
+    Each basis keeps its own volume average; 'vol_sma' is the one on the
+    latest bar's basis and 'full' says which that is.
+    """
+    __slots__ = ("vwap_ind", "rsi_ind", "atr_ind", "vol_sma_ind", "sampled_sma_ind", "bars", "last_ts",
+                 "close", "volume", "vwap", "rsi", "atr", "vol_sma", "full")
+
+    def __init__(self, rsi_period=14, atr_period=14, vol_ma_period=20):
+        self.vwap_ind = SessionVWAP()
+        self.rsi_ind = StreamingRSI(rsi_period)
+        self.atr_ind = StreamingATR(atr_period)
+        self.vol_sma_ind = StreamingSMA(vol_ma_period)
+        self.sampled_sma_ind = StreamingSMA(vol_ma_period)
+        self.bars = 0
+        self.last_ts = None
+        self.close = NAN
+        self.volume = NAN
+        self.vwap = NAN
+        self.rsi = NAN
+        self.atr = NAN
+        self.vol_sma = NAN
+        self.full = True
+
+    def update(self, ts, open_, high, low, close, volume, full=True):
+        self.bars += 1
+        self.last_ts = ts
+        self.close = close
+        self.volume = volume
+        self.vwap = self.vwap_ind.update(ts, high, low, close, volume)
+        self.rsi = self.rsi_ind.update(close)
+        self.atr = self.atr_ind.update(high, low, close)
+        self.full = full
+        self.vol_sma = (self.vol_sma_ind if full else self.sampled_sma_ind).update(volume)
+        return self
@@ -0,0 +1,179 @@
+import logging
+import asyncio
+import json
+import uuid
+
+logger = logging.getLogger("Subscriptions")
+
+MODE_LTPC = "ltpc"
+MODE_FULL = "full"
+
+# Reasons a symbol is held in full mode
+HOLD_POSITION = "position"
+HOLD_SIGNAL = "signal"
+
+
+class SubscriptionManager:
+    """
+    Desired feed subscriptions (symbol -> mode) and what has been sent.
+
+    Every symbol sits in 'base_mode' (ltpc by default: price and last trade
+    only) unless something holds it in full mode (an open position, a
+    forming signal); the last release demotes it. Changes are coalesced and
+    sent as the minimal sub / unsub / change_mode messages, at most one per
+    (method, mode), on the next loop iteration. On (re)connect the whole
+    set is restored with one sub per mode.
+    """
+    def __init__(self, symbols=(), base_mode=MODE_LTPC, max_keys=1000):
+        self.base_mode = base_mode
+        self.max_keys = max_keys       # Instrument keys per message
+        self.wanted = dict.fromkeys(symbols, base_mode)
+        self.holds = {}                # symbol -> set of hold reasons
+        self.sent = {}                 # symbol -> mode the server has
+        self.websocket = None
+        self.messages = 0
+        self.promotions = 0
+        self.demotions = 0
+        self._flush = None
+
+    # --- Desired state ---
+
+    def add(self, symbols):
+        for symbol in symbols:
+            if symbol not in self.wanted:
+                self.wanted[symbol] = MODE_FULL if self.holds.get(symbol) else self.base_mode
+        self._schedule()
+
+    def remove(self, symbols):
+        for symbol in symbols:
+            self.wanted.pop(symbol, None)
+            self.holds.pop(symbol, None)
+        self._schedule()
+
+    def hold(self, symbol, reason):
+        """
+        Keep 'symbol' in full mode while 'reason' applies.
+        """
+        reasons = self.holds.setdefault(symbol, set())
+        reasons.add(reason)
+        if symbol in self.wanted and self.wanted[symbol] != MODE_FULL:
+            self.wanted[symbol] = MODE_FULL
+            self.promotions += 1
+            self._schedule()
+
+    def release(self, symbol, reason):
+        reasons = self.holds.get(symbol)
+        if not reasons or reason not in reasons:
+            return
+        reasons.discard(reason)
+        if reasons:
+            return
+        del self.holds[symbol]
+        if symbol in self.wanted and self.wanted[symbol] != self.base_mode:
+            self.wanted[symbol] = self.base_mode
+            self.demotions += 1
+            self._schedule()
+
+    def on_change(self, event, symbol):
+        """
+        GodfatherStrategy change handler: positions and forming signals hold
+        their symbols in full mode.
+        """
+        if event in ("open", "restore"):
+            self.hold(symbol, HOLD_POSITION)
+        elif event == "close":
+            self.release(symbol, HOLD_POSITION)
+        elif event == "forming":
+            self.hold(symbol, HOLD_SIGNAL)
+        elif event == "settled":
+            self.release(symbol, HOLD_SIGNAL)
+
+    def mode(self, symbol):
+        return self.wanted.get(symbol)
+
+    # --- Wire ---
+
+    def diff(self):
+        """
+        Messages that turn 'sent' into 'wanted', and marks them sent.
+        """
+        unsub, sub, change = [], {}, {}
+        for symbol in self.sent.keys() - self.wanted.keys():
+            unsub.append(symbol)
+        for symbol, mode in self.wanted.items():
+            current = self.sent.get(symbol)
+            if current is None:
+                sub.setdefault(mode, []).append(symbol)
+            elif current != mode:
+                change.setdefault(mode, []).append(symbol)
+        messages = []
+        if unsub:
+            messages += self._messages("unsub", None, unsub)
+        for mode, keys in change.items():
+            messages += self._messages("change_mode", mode, keys)
+        for mode, keys in sub.items():
+            messages += self._messages("sub", mode, keys)
+        self.sent = dict(self.wanted)
+        return messages
+
+    def _messages(self, method, mode, keys):
+        out = []
+        for i in range(0, len(keys), self.max_keys):
+            data = {"instrumentKeys": keys[i:i + self.max_keys]}
+            if mode:
+                data["mode"] = mode
+            out.append({"guid": uuid.uuid4().hex, "method": method, "data": data})
+        return out
+
+    async def _send(self, messages):
+        websocket = self.websocket
+        for message in messages:
+            await websocket.send(json.dumps(message).encode("utf-8"))
+            self.messages += 1
+            logger.debug(f"{message['method']} {message['data'].get('mode', '')}: "
+                         f"{len(message['data']['instrumentKeys'])} instruments")
+
+    async def attach(self, websocket):
+        """
+        New connection: the server has nothing, so the whole desired set
+        goes out as one sub per mode.
+        """
+        self.websocket = websocket
+        self.sent = {}
+        messages = self.diff()
+        await self._send(messages)
+        counts = {}
+        for mode in self.wanted.values():
+            counts[mode] = counts.get(mode, 0) + 1
+        logger.info(f"Subscribed {len(self.wanted)} instruments ({counts}) in {len(messages)} messages")
+
+    def detach(self):
+        self.websocket = None
+        self.sent = {}
+
+    def _schedule(self):
+        if self._flush is None and self.websocket is not None:
+            try:
+                self._flush = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass  # No loop (yet): attach() sends everything
+
+    async def flush(self):
+        """
+        Send pending changes (the schedule runs this after the current
+        batch of hold / release calls).
+        """
+        await asyncio.sleep(0)
+        self._flush = None
+        if self.websocket is None:
+            return
+        try:
+            await self._send(self.diff())
+        except Exception as e:
+            # The connection is going away; attach() restores the full set
+            logger.error(f"Subscription update failed: {e}")
+
+    def stats(self):
+        full = sum(mode == MODE_FULL for mode in self.wanted.values())
+        return {"instruments": len(self.wanted), "full": full, "ltpc": len(self.wanted) - full,
+                "messages": self.messages, "promotions": self.promotions, "demotions": self.demotions}
@@ -0,0 +1,496 @@
+import logging
+import argparse
+import csv
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from candles import parse_timeframe
+from streaming_indicators import SESSION_UTC_OFFSET_MS, DAY_MS
+
+logger = logging.getLogger("Sweep")
+
+# Grid parameters, named after the GodfatherStrategy attributes they tune
+# (rsi_low / rsi_high are the two edges of rsi_band). Entry parameters decide
+# the candidate entries; exit parameters only how each trade ends.
+ENTRY_PARAMS = ("rsi_period", "vol_ma_period", "vol_surge_mult", "rsi_low", "rsi_high")
+EXIT_PARAMS = ("atr_period", "sl_atr_mult", "tgt_atr_mult", "time_stop_minutes", "time_stop_min_profit")
+PARAMS = ENTRY_PARAMS + EXIT_PARAMS
+INT_PARAMS = {"rsi_period", "vol_ma_period", "atr_period"}
+
+REASONS = ("sl", "target", "time_stop", "session_end")
+SL, TARGET, TIME_STOP, SESSION_END = range(4)
+METRICS = ("trades", "win_rate", "return_pct", "pnl", "profit_factor", "max_drawdown", "avg_bars") + REASONS
+RANK_KEYS = ("return_pct", "pnl", "win_rate", "profit_factor", "trades")
+
+
+def strategy_defaults():
+    """
+    The live GodfatherStrategy parameters: (grid defaults, min_bars, min_sentiment_score).
+    """
+    from strategy import GodfatherStrategy  # Deferred: pulls in the order / risk modules
+    s = GodfatherStrategy(None, None, {})
+    params = {"rsi_period": s.rsi_period, "vol_ma_period": s.vol_ma_period, "vol_surge_mult": s.vol_surge_mult,
+              "rsi_low": s.rsi_band[0], "rsi_high": s.rsi_band[1], "atr_period": s.atr_period,
+              "sl_atr_mult": s.sl_atr_mult, "tgt_atr_mult": s.tgt_atr_mult,
+              "time_stop_minutes": s.time_stop_minutes, "time_stop_min_profit": s.time_stop_min_profit}
+    return params, s.min_bars, s.min_sentiment_score
+
+
+# --- Indicators over whole series (same values as streaming_indicators) ---
+
+def rma(x, length):
+    """
+    Wilder's RMA as the streaming RMA computes it: adjusted EWM with
+    alpha 1/length, NaN until 'length' values (leading NaNs skipped).
+    """
+    import pandas as pd  # Deferred: only the parent process computes indicators
+    return pd.Series(x).ewm(alpha=1.0 / length, min_periods=length, adjust=True).mean().to_numpy()
+
+
+def rsi(close, length):
+    change = np.diff(close, prepend=np.nan)
+    gain = rma(np.maximum(change, 0.0), length)
+    loss = rma(np.maximum(-change, 0.0), length)
+    total = gain + loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total != 0, 100.0 * gain / total, np.nan)
+
+
+def atr(high, low, close, length):
+    prev = np.r_[np.nan, close[:-1]]
+    tr = np.maximum(high - low, np.maximum(high - prev, prev - low))
+    return rma(tr, length)
+
+
+def sma(x, length):
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        total = np.cumsum(np.r_[0.0, x])
+        out[length - 1:] = (total[length:] - total[:-length]) / length
+    return out
+
+
+def session_vwap(ts, high, low, close, volume, starts):
+    """
+    Typical-price VWAP from each session start ('starts' marks the first
+    bar of every symbol-session).
+    """
+    pv = np.cumsum((high + low + close) / 3.0 * volume)
+    vol = np.cumsum(volume)
+    first = np.flatnonzero(starts)
+    lengths = np.diff(np.r_[first, len(ts)])
+    pv -= np.repeat(np.r_[0.0, pv][first], lengths)
+    vol -= np.repeat(np.r_[0.0, vol][first], lengths)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(vol != 0, pv / vol, np.nan)
+
+
+def build_inputs(candles, grid, min_bars=50):
+    """
+    Concatenate {symbol: bar columns} into one bar table and compute each
+    indicator once per distinct period in the grid.
+    Returns {name: array}: ts, open, high, low, close, volume, vwap,
+    seg_end (last bar of the bar's symbol-session), ready (past min_bars
+    and not a session's last bar), rsi_<p>, atr_<p>, vol_sma_<p>.
+    """
+    symbols = [s for s in candles if len(candles[s]["ts"])]
+    columns = {name: [] for name in ("ts", "open", "high", "low", "close", "volume")}
+    bar_no, rsis, atrs, smas = [], {}, {}, {}
+    for symbol in symbols:
+        bars = candles[symbol]
+        order = np.argsort(bars["ts"], kind="stable")
+        cols = {name: np.asarray(bars[name])[order] for name in columns}
+        for name in columns:
+            columns[name].append(cols[name])
+        bar_no.append(np.arange(len(order)))
+        for p in set(grid["rsi_period"]):
+            rsis.setdefault(p, []).append(rsi(cols["close"], p))
+        for p in set(grid["atr_period"]):
+            atrs.setdefault(p, []).append(atr(cols["high"], cols["low"], cols["close"], p))
+        for p in set(grid["vol_ma_period"]):
+            smas.setdefault(p, []).append(sma(cols["volume"], p))
+
+    data = {name: np.concatenate(parts).astype(np.int64 if name == "ts" else np.float64)
+            for name, parts in columns.items()}
+    n = len(data["ts"])
+    symbol_id = np.repeat(np.arange(len(symbols)), [len(candles[s]["ts"]) for s in symbols])
+    day = (data["ts"] + SESSION_UTC_OFFSET_MS) // DAY_MS
+    starts = np.r_[True, (day[1:] != day[:-1]) | (symbol_id[1:] != symbol_id[:-1])]
+    first = np.flatnonzero(starts)
+    data["seg_end"] = np.repeat(np.r_[first[1:], n] - 1, np.diff(np.r_[first, n]))
+    data["ready"] = (np.concatenate(bar_no) >= min_bars - 1) & (data["seg_end"] > np.arange(n))
+    data["vwap"] = session_vwap(data["ts"], data["high"], data["low"], data["close"], data["volume"], starts)
+    for prefix, series in (("rsi", rsis), ("atr", atrs), ("vol_sma", smas)):
+        for p, parts in series.items():
+            data[f"{prefix}_{p}"] = np.concatenate(parts)
+    return data
+
+
+# --- Shared memory ---
+
+class SharedArrays:
+    """
+    Named arrays packed into one shared memory block. Worker processes
+    attach() by name and get zero-copy read-only views.
+    """
+    def __init__(self, arrays):
+        self.layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = -(-offset // 64) * 64  # Cache-line aligned
+            self.layout[name] = (offset, array.dtype.str, array.shape)
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, array in arrays.items():
+            self._view(self.shm, name)[...] = array
+
+    def _view(self, shm, name):
+        offset, dtype, shape = self.layout[name]
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    @staticmethod
+    def attach(name, layout):
+        shm = shared_memory.SharedMemory(name=name)
+        views = {}
+        for key, (offset, dtype, shape) in layout.items():
+            views[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            views[key].flags.writeable = False
+        return shm, views
+
+
+_SHM = None
+_DATA = None
+_SETTINGS = None
+
+
+def _init_worker(name, layout, settings):
+    global _SHM, _DATA, _SETTINGS
+    _SHM, _DATA = SharedArrays.attach(name, layout)
+    _SETTINGS = settings
+
+
+def _run_task(entry, exits):
+    return evaluate_group(_DATA, entry, exits, _SETTINGS)
+
+
+# --- Vectorized evaluation ---
+
+def entries(data, entry, settings):
+    """
+    Candidate entry bars (indices) for one set of entry parameters:
+    (longs, shorts), the GodfatherStrategy bar-close conditions with a
+    fixed market sentiment.
+    """
+    p = dict(zip(ENTRY_PARAMS, entry))
+    close, vwap = data["close"], data["vwap"]
+    rsi_ = data[f"rsi_{p['rsi_period']}"]
+    with np.errstate(invalid="ignore"):
+        base = data["ready"] & (data["volume"] > data[f"vol_sma_{p['vol_ma_period']}"] * p["vol_surge_mult"])
+        empty = np.zeros(0, dtype=np.int64)
+        sentiment, min_sentiment = settings["sentiment"], settings["min_sentiment"]
+        longs = (np.flatnonzero(base & (close > vwap) & (rsi_ > p["rsi_low"]) & (rsi_ < p["rsi_high"]))
+                 if sentiment > min_sentiment else empty)
+        shorts = (np.flatnonzero(base & (close < vwap) & (rsi_ < p["rsi_low"]))
+                  if sentiment < -min_sentiment else empty)
+    return longs, shorts
+
+
+def simulate_exits(data, cand, side, atr_, sl_mult, tgt_mult, stop_bars, min_profit):
+    """
+    Exit bar, exit price and reason for every candidate entry (entered at
+    its bar's close), applying the RiskEngine rules to bar ranges: stop and
+    target at sl_mult / tgt_mult entry ATRs; from 'stop_bars' bars after
+    the entry the stop tightens to the minimum-profit level (time stop);
+    out at the session's last close otherwise. Within a bar, price goes
+    open -> low -> high -> close on up bars and open -> high -> low ->
+    close on down bars (as replay_candles ticks it); a bar opening past a
+    level fills at the open.
+
+    Shorts are simulated as longs on negated prices.
+    """
+    o_all, h_all, l_all, c_all = data["open"], data["high"], data["low"], data["close"]
+    entry = c_all[cand]
+    a = atr_[cand]
+    if side > 0:
+        stop = entry - sl_mult * a
+        target = entry + tgt_mult * a
+        tight = np.maximum(stop, entry * (1 + min_profit))
+    else:
+        stop = -(entry + sl_mult * a)
+        target = -(entry - tgt_mult * a)
+        tight = np.maximum(stop, -entry * (1 - min_profit))
+    end = data["seg_end"][cand]
+    exit_idx = end.copy()
+    price = c_all[end] * side
+    reason = np.full(len(cand), SESSION_END, dtype=np.int8)
+
+    pending = np.arange(len(cand))
+    offset, width = 1, 8
+    while len(pending):
+        k = np.arange(offset, offset + width)
+        rows_end = end[pending, None]
+        j = cand[pending, None] + k
+        valid = j <= rows_end
+        j = np.minimum(j, rows_end)
+        if side > 0:
+            o, h, l, c = o_all[j], h_all[j], l_all[j], c_all[j]
+        else:
+            o, h, l, c = -o_all[j], -l_all[j], -h_all[j], -c_all[j]
+        low_first = c >= o
+        lower = np.where(k > stop_bars, tight[pending, None], stop[pending, None])
+        upper = target[pending, None]
+        hit_low = l <= lower
+        hit_high = h >= upper
+        hit = (hit_low | hit_high) & valid
+        resolved = hit.any(axis=1)
+        if resolved.any():
+            rows = np.flatnonzero(resolved)
+            col = hit[rows].argmax(axis=1)
+            idx = pending[rows]
+            bo, lo_band, hi_band = o[rows, col], lower[rows, col], upper[rows, 0]
+            take_low = hit_low[rows, col] & (~hit_high[rows, col] | low_first[rows, col])
+            px = np.where(take_low, np.minimum(lo_band, bo), np.maximum(hi_band, bo))
+            exit_idx[idx] = j[rows, col]
+            price[idx] = px
+            reason[idx] = np.where(take_low, np.where(px <= stop[idx], SL, TIME_STOP), TARGET)
+        # Rows past their session end keep the session-end exit
+        pending = pending[~resolved & valid[:, -1]]
+        offset += width
+        width *= 2
+    return exit_idx, price * side, reason
+
+
+def evaluate(data, longs, shorts, exit_params, settings):
+    """
+    One parameter combination: simulate every candidate, then keep the
+    entries the live strategy would take (one position per symbol: a
+    signal while the symbol's previous trade is open is skipped).
+    Returns the METRICS tuple.
+    """
+    p = dict(zip(EXIT_PARAMS, exit_params))
+    atr_ = data[f"atr_{p['atr_period']}"]
+    stop_bars = math.ceil(p["time_stop_minutes"] * 60_000 / settings["interval_ms"])
+    parts = []
+    for cand, side in ((longs, 1), (shorts, -1)):
+        if len(cand):
+            cand = cand[~np.isnan(atr_[cand])]
+            exit_idx, px, reason = simulate_exits(data, cand, side, atr_, p["sl_atr_mult"], p["tgt_atr_mult"],
+                                                  stop_bars, p["time_stop_min_profit"])
+            parts.append((cand, np.full(len(cand), side, dtype=np.int8), exit_idx, px, reason))
+    if not parts:
+        return _metrics(*(np.zeros(0),) * 5)
+    cand, side, exit_idx, px, reason = (np.concatenate(col) for col in zip(*parts))
+    order = np.argsort(cand, kind="stable")
+    cand, side, exit_idx, px, reason = cand[order], side[order], exit_idx[order], px[order], reason[order]
+
+    # Walk the non-overlapping chain: after a trade, the next entry is the
+    # first candidate at or after its exit bar (exits happen intrabar, the
+    # entry check at the bar's close)
+    following = np.searchsorted(cand, exit_idx, side="left").tolist()
+    taken = []
+    i, n = 0, len(cand)
+    while i < n:
+        taken.append(i)
+        i = following[i]
+    taken = np.array(taken, dtype=np.int64)
+
+    slip = settings["slippage"]
+    side = side[taken]
+    entry_fill = data["close"][cand[taken]] * (1 + slip * side)
+    exit_fill = px[taken] * (1 - slip * side)
+    pnl = (exit_fill - entry_fill) * side
+    return _metrics(pnl, pnl / entry_fill, data["ts"][exit_idx[taken]], exit_idx[taken] - cand[taken], reason[taken])
+
+
+def _metrics(pnl, ret, exit_ts, held, reason):
+    trades = len(pnl)
+    if not trades:
+        return (0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0) + (0,) * len(REASONS)
+    equity = np.r_[0.0, np.cumsum(pnl[np.argsort(exit_ts, kind="stable")])]
+    drawdown = float(np.max(np.maximum.accumulate(equity) - equity))
+    gains, losses = float(pnl[pnl > 0].sum()), float(-pnl[pnl < 0].sum())
+    counts = np.bincount(reason.astype(np.int64), minlength=len(REASONS))
+    return ((trades, round(float((pnl > 0).mean()), 4), round(float(ret.sum()) * 100, 3), round(float(pnl.sum()), 2),
+             round(gains / losses, 3) if losses else math.inf, round(drawdown, 2), round(float(held.mean()), 1))
+            + tuple(int(x) for x in counts))
+
+
+def evaluate_group(data, entry, exits, settings):
+    """
+    Entry parameters (computed once) x a list of exit parameter tuples.
+    Returns [(params tuple, metrics tuple)].
+    """
+    longs, shorts = entries(data, entry, settings)
+    return [(tuple(entry) + tuple(exit_params), evaluate(data, longs, shorts, exit_params, settings))
+            for exit_params in exits]
+
+
+# --- Driver ---
+
+def sweep(candles, grid, workers=None, sentiment=0.5, slippage_bps=2.0, timeframe="1min", min_bars=50,
+          min_sentiment=0.1):
+    """
+    Evaluate every combination of grid {param: [values]} (PARAMS; missing
+    ones take the live strategy's value) over candles {symbol: bar columns}.
+    Returns a list of result dicts (params + METRICS), unranked.
+    """
+    defaults = strategy_defaults()[0]
+    grid = {name: list(grid.get(name) or [defaults[name]]) for name in PARAMS}
+    settings = {"sentiment": sentiment, "min_sentiment": min_sentiment, "slippage": slippage_bps / 10_000,
+                "interval_ms": parse_timeframe(timeframe)}
+    entry_grid = list(itertools.product(*(grid[name] for name in ENTRY_PARAMS)))
+    exit_grid = list(itertools.product(*(grid[name] for name in EXIT_PARAMS)))
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    data = build_inputs(candles, grid, min_bars)
+    logger.info(f"Inputs: {len(data['ts'])} bars, {len(data) - 9} indicator series "
+                f"({sum(a.nbytes for a in data.values()) / 2**20:.0f} MiB) in {time.perf_counter() - start:.2f}s")
+
+    # Enough tasks to keep every worker busy: split the exit grid when there are few entry combinations
+    chunks = max(1, math.ceil(4 * workers / len(entry_grid)))
+    size = math.ceil(len(exit_grid) / min(chunks, len(exit_grid)))
+    tasks = [(entry, exit_grid[i:i + size]) for entry in entry_grid for i in range(0, len(exit_grid), size)]
+    logger.info(f"{len(entry_grid) * len(exit_grid)} combinations in {len(tasks)} tasks on {workers} workers")
+
+    results = []
+    if workers == 1:
+        for entry, exits in tasks:
+            results += evaluate_group(data, entry, exits, settings)
+    else:
+        shared = SharedArrays(data)
+        del data
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(shared.name, shared.layout, settings)) as pool:
+                for rows in pool.map(_run_task, *zip(*tasks)):
+                    results += rows
+        finally:
+            shared.close()
+    logger.info(f"Swept in {time.perf_counter() - start:.2f}s")
+    return [dict(zip(PARAMS, params), **dict(zip(METRICS, metrics))) for params, metrics in results]
+
+
+def rank(results, key="return_pct", min_trades=1):
+    return sorted((r for r in results if r["trades"] >= min_trades), key=lambda r: r[key], reverse=True)
+
+
+# Table columns: header and value format
+COLUMNS = {"rsi_period": ("rsi", "d"), "vol_ma_period": ("volma", "d"), "vol_surge_mult": ("surge", ".2f"),
+           "rsi_low": ("rsi_lo", "g"), "rsi_high": ("rsi_hi", "g"), "atr_period": ("atr", "d"),
+           "sl_atr_mult": ("sl", ".2f"), "tgt_atr_mult": ("tgt", ".2f"), "time_stop_minutes": ("t_min", "g"),
+           "time_stop_min_profit": ("t_prof", ".4f"), "trades": ("trades", "d"), "win_rate": ("win%", ".1%"),
+           "return_pct": ("ret%", ".2f"), "pnl": ("pnl", ".2f"), "profit_factor": ("pf", ".3f"),
+           "max_drawdown": ("max_dd", ".2f"), "avg_bars": ("bars", ".1f"), "sl": ("n_sl", "d"),
+           "target": ("n_tgt", "d"), "time_stop": ("n_time", "d"), "session_end": ("n_eod", "d")}
+
+
+def format_table(rows, top=20):
+    """
+    The top rows as a text table: one right-aligned column per parameter
+    and metric, each as wide as its widest value, separated by two spaces.
+    """
+    rows = rows[:top]
+    columns = [("rank", [str(i) for i in range(1, len(rows) + 1)])]
+    for name in PARAMS + METRICS:
+        header, spec = COLUMNS[name]
+        columns.append((header, [format(row[name], spec) for row in rows]))
+    widths = [max([len(header)] + [len(v) for v in values]) for header, values in columns]
+    lines = ["  ".join(header.rjust(w) for (header, _), w in zip(columns, widths))]
+    for i in range(len(rows)):
+        lines.append("  ".join(values[i].rjust(w) for (_, values), w in zip(columns, widths)))
+    return "\n".join(lines)
+
+
+def parse_values(text, integer=False):
+    """
+    '10,14,21' or 'start:stop:step' (stop included) -> list of values.
+    """
+    if ":" in text:
+        start, stop, step = (float(x) for x in text.split(":"))
+        values = [round(start + i * step, 10) for i in range(int(math.floor((stop - start) / step + 1e-9)) + 1)]
+    else:
+        values = [float(x) for x in text.split(",") if x]
+    return [int(v) for v in values] if integer else values
+
+
+def load_cache(root, interval="1minute"):
+    """
+    Every day in a CandleCache (history.py) -> {symbol: bar columns}.
+    """
+    from history import CandleCache, concat_bars
+    cache = CandleCache(root)
+    parts = {}
+    for name in sorted(os.listdir(os.path.join(root, interval))):
+        day = int(np.datetime64(name, "D").astype(np.int64))  # Directory names are day_name(day)
+        for symbol, (bars, _) in cache.read_day(interval, day).items():
+            parts.setdefault(symbol, []).append(bars)
+    return {symbol: concat_bars(p) for symbol, p in parts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep Godfather strategy parameters over 1-min candles (vectorized, process pool).",
+        epilog="Grid values: comma lists (10,14,21) or start:stop:step ranges (1.5:3:0.5). "
+               "Parameters not given keep the live strategy's value.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--candles", help="Directory of <symbol>.npz/.csv candle files (as replay.py)")
+    source.add_argument("--cache", help="Candle cache root (CANDLE_CACHE_DIR)")
+    source.add_argument("--synthetic", type=int, default=50, help="Symbols of synthetic candles (default)")
+    parser.add_argument("--sessions", type=int, default=20, help="Synthetic sessions per symbol")
+    for name in PARAMS:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+    parser.add_argument("--sentiment", type=float, default=0.5, help="Fixed market sentiment (sign picks longs / shorts)")
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--rank", choices=RANK_KEYS, default="return_pct")
+    parser.add_argument("--min-trades", type=int, default=10, help="Leave out combinations with fewer trades")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="Write every result, ranked, to this CSV file")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    if args.candles:
+        from replay import load_candles
+        candles = load_candles(args.candles)
+    elif args.cache:
+        candles = load_cache(args.cache)
+    else:
+        from replay import synthetic_candles
+        candles = synthetic_candles(args.synthetic, sessions=args.sessions)
+    grid = {name: parse_values(getattr(args, name), name in INT_PARAMS) for name in PARAMS if getattr(args, name)}
+    _, min_bars, min_sentiment = strategy_defaults()
+
+    start = time.perf_counter()
+    results = sweep(candles, grid, args.workers, args.sentiment, args.slippage_bps, min_bars=min_bars,
+                    min_sentiment=min_sentiment)
+    took = time.perf_counter() - start
+    ranked = rank(results, args.rank, args.min_trades)
+    bars = sum(len(c["ts"]) for c in candles.values())
+    print(f"{len(results)} combinations x {bars} bars ({len(candles)} symbols) in {took:.1f}s "
+          f"({took / max(len(results), 1) * 1000:.1f} ms each); {len(ranked)} with >= {args.min_trades} trades, "
+          f"ranked by {args.rank}:")
+    print(format_table(ranked, args.top))
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=PARAMS + METRICS)
+            writer.writeheader()
+            writer.writerows(ranked)
+
+
+if __name__ == "__main__":
+    main()
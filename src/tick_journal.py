@@ -0,0 +1,288 @@
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+from streaming_indicators import session_day
+
+logger = logging.getLogger("TickJournal")
+
+# One decoded tick = one fixed 48-byte record
+TICK_DTYPE = np.dtype([
+    ("ts", "<i8"),          # Exchange last trade time (epoch millis)
+    ("recv_ns", "<i8"),     # Local receive time (time.time_ns)
+    ("instrument", "<u4"),  # Index into the day's symbols.txt
+    ("_pad", "<u4"),
+    ("ltp", "<f8"),
+    ("volume", "<i8"),      # Volume traded today (vtt)
+    ("ltq", "<i8"),
+    ("oi", "<f8"),
+])
+
+# Raw frames: <recv_ns int64><length uint32><frame bytes>
+_FRAME_HEADER = struct.Struct("<qI")
+
+_DAY_MS = 86_400_000
+_STOP = object()
+
+
+def _day_name(ts_ms):
+    return time.strftime("%Y-%m-%d", time.gmtime(session_day(ts_ms) * _DAY_MS / 1000))
+
+
+def _frames_end(f):
+    """
+    Byte length of the complete frame records in an open frames segment
+    (a crash can leave a torn header or body at the end).
+    """
+    size = os.fstat(f.fileno()).st_size
+    end = 0
+    while end + _FRAME_HEADER.size <= size:
+        f.seek(end)
+        _, length = _FRAME_HEADER.unpack(f.read(_FRAME_HEADER.size))
+        if end + _FRAME_HEADER.size + length > size:
+            break
+        end += _FRAME_HEADER.size + length
+    return end
+
+
+class TickJournal:
+    """
+    Append-only market data recorder.
+
+    The feed loop only enqueues (raw frame bytes / decoded Tick batches); a
+    writer thread turns batches into fixed-size records, appends them to the
+    day's segment files and fsyncs in batches. Layout:
+
+        <root>/<YYYY-MM-DD>/ticks-00000.bin   TICK_DTYPE records
+        <root>/<YYYY-MM-DD>/frames-00000.bin  length-prefixed raw frames
+        <root>/<YYYY-MM-DD>/symbols.txt       instrument id -> key, one per line
+    """
+    def __init__(self, root, segment_bytes=256 << 20, fsync_interval=1.0, max_queue=100_000):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written_ticks = 0
+        self.written_frames = 0
+
+        # Writer-thread state
+        self._day = None
+        self._symbols = {}
+        self._symbols_file = None
+        self._files = {}      # kind -> open file
+        self._segment = {}    # kind -> segment number
+        self._last_sync = 0.0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TickJournal", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    # --- Feed loop side (non-blocking) ---
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def record_frame(self, frame):
+        """
+        Frame handler for MarketDataStreamer (raw WebSocket message).
+        """
+        if isinstance(frame, bytes):
+            self._put(("frame", time.time_ns(), frame))
+
+    async def on_ticks(self, ticks):
+        """
+        Tick handler for MarketDataStreamer (decoded batch).
+        """
+        self._put(("ticks", time.time_ns(), ticks))
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                self._sync()
+                continue
+            if item is _STOP:
+                break
+            try:
+                if item[0] == "ticks":
+                    self._write_ticks(item[1], item[2])
+                else:
+                    self._write_frame(item[1], item[2])
+            except OSError as e:
+                logger.error(f"Journal write failed: {e}")
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+        self._sync()
+        self._close_day()
+
+    def _roll_day(self, ts_ms):
+        day = _day_name(ts_ms)
+        if day == self._day:
+            return
+        self._close_day()
+        self._day = day
+        path = os.path.join(self.root, day)
+        os.makedirs(path, exist_ok=True)
+
+        symbols_path = os.path.join(path, "symbols.txt")
+        self._symbols = {}
+        if os.path.exists(symbols_path):
+            with open(symbols_path, "rb+") as f:
+                data = f.read()
+                if not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)  # Torn last line
+            for i, line in enumerate(data[:data.rfind(b"\n") + 1].decode().splitlines()):
+                self._symbols[line] = i
+        self._symbols_file = open(symbols_path, "a")
+
+        # Resume after the last existing segment of each kind (restart mid-session)
+        for kind in ("ticks", "frames"):
+            existing = sorted(n for n in os.listdir(path) if n.startswith(kind + "-"))
+            self._segment[kind] = int(existing[-1][len(kind) + 1:-4]) if existing else 0
+            segment = os.path.join(path, f"{kind}-{self._segment[kind]:05d}.bin")
+            if existing:
+                # Drop a torn record left by a crash so appends stay record-aligned
+                with open(segment, "rb+") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    end = size - size % TICK_DTYPE.itemsize if kind == "ticks" else _frames_end(f)
+                    if end < size:
+                        logger.warning(f"Dropping a torn record at the end of {segment}")
+                        f.truncate(end)
+            self._files[kind] = open(segment, "ab")
+
+    def _close_day(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        if self._symbols_file:
+            self._symbols_file.close()
+            self._symbols_file = None
+
+    def _file(self, kind):
+        f = self._files[kind]
+        if f.tell() >= self.segment_bytes:
+            self._sync_symbols()
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+            self._segment[kind] += 1
+            f = self._files[kind] = open(
+                os.path.join(self.root, self._day, f"{kind}-{self._segment[kind]:05d}.bin"), "ab")
+        return f
+
+    def _write_ticks(self, recv_ns, ticks):
+        self._roll_day(recv_ns // 1_000_000)
+        symbols = self._symbols
+        records = np.zeros(len(ticks), dtype=TICK_DTYPE)
+        ids = []
+        for tick in ticks:
+            i = symbols.get(tick.symbol)
+            if i is None:
+                i = symbols[tick.symbol] = len(symbols)
+                self._symbols_file.write(tick.symbol + "\n")
+            ids.append(i)
+        records["ts"] = [tick.ltt for tick in ticks]
+        records["recv_ns"] = recv_ns
+        records["instrument"] = ids
+        records["ltp"] = [tick.ltp for tick in ticks]
+        records["volume"] = [tick.vtt for tick in ticks]
+        records["ltq"] = [tick.ltq for tick in ticks]
+        records["oi"] = [tick.oi for tick in ticks]
+        self._symbols_file.flush()  # Ids must be on disk before the records that use them
+        self._file("ticks").write(records.tobytes())
+        self.written_ticks += len(ticks)
+
+    def _write_frame(self, recv_ns, frame):
+        self._roll_day(recv_ns // 1_000_000)
+        f = self._file("frames")
+        f.write(_FRAME_HEADER.pack(recv_ns, len(frame)))
+        f.write(frame)
+        self.written_frames += 1
+
+    def _sync_symbols(self):
+        if self._symbols_file:
+            self._symbols_file.flush()
+            os.fsync(self._symbols_file.fileno())
+
+    def _sync(self):
+        # Instrument ids first: a synced tick record must never name an id that isn't on disk
+        self._sync_symbols()
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        self._last_sync = time.monotonic()
+
+
+class TickJournalReader:
+    """
+    Memory-mapped reader for one journal day.
+    segments: one read-only TICK_DTYPE memmap per ticks segment; column()
+    returns zero-copy strided views for single-segment days.
+    """
+    def __init__(self, root, day):
+        self.path = os.path.join(root, day)
+        with open(os.path.join(self.path, "symbols.txt")) as f:
+            self.symbols = [line.rstrip("\n") for line in f]
+        self.segments = []
+        for name in sorted(os.listdir(self.path)):
+            if name.startswith("ticks-"):
+                full = os.path.join(self.path, name)
+                count = os.path.getsize(full) // TICK_DTYPE.itemsize  # Ignore a torn last record
+                if count:
+                    self.segments.append(np.memmap(full, dtype=TICK_DTYPE, mode="r", shape=(count,)))
+
+    def __len__(self):
+        return sum(len(seg) for seg in self.segments)
+
+    def column(self, name):
+        """
+        One column (ts, recv_ns, instrument, ltp, volume, ltq, oi) for the day.
+        Zero-copy when the day fits in one segment; concatenated otherwise.
+        """
+        if len(self.segments) == 1:
+            return self.segments[0][name]
+        if not self.segments:
+            return np.zeros(0, dtype=TICK_DTYPE[name])
+        return np.concatenate([seg[name] for seg in self.segments])
+
+    def columns(self, names=("ts", "instrument", "ltp", "volume")):
+        return {name: self.column(name) for name in names}
+
+    def instrument_id(self, symbol):
+        return self.symbols.index(symbol)
+
+    def frames(self):
+        """
+        Iterate (recv_ns, raw_frame) over the day's recorded frames.
+        """
+        for name in sorted(os.listdir(self.path)):
+            if not name.startswith("frames-"):
+                continue
+            with open(os.path.join(self.path, name), "rb") as f:
+                data = f.read()
+            pos = 0
+            while pos + _FRAME_HEADER.size <= len(data):
+                recv_ns, length = _FRAME_HEADER.unpack_from(data, pos)
+                pos += _FRAME_HEADER.size
+                if pos + length > len(data):
+                    break  # Torn last frame
+                yield recv_ns, data[pos:pos + length]
+                pos += length
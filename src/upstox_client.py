@@ -1,30 +1,63 @@
 import logging
-import upstox_client
-from upstox_client.rest import ApiException
+import asyncio
+from order_gateway import OrderGateway
+from order_scheduler import OrderScheduler, PRIORITY_ENTRY, PRIORITY_EXIT
 
 logger = logging.getLogger("UpstoxClient")
 
+
+def _sdk():
+    """
+    The Upstox SDK, imported on first use: only the synchronous REST calls
+    need it, not startup or the async order path.
+    """
+    import upstox_client
+    from upstox_client.rest import ApiException
+    return upstox_client, ApiException
+
 class UpstoxHandler:
-    def __init__(self, config):
+    def __init__(self, config, instruments=None):
         self.config = config
+        self.instruments = instruments  # InstrumentMaster (optional): order symbols -> instrument keys
         self.api_version = '2.0'
         self.access_token = self.config.get("ACCESS_TOKEN")
         
         if not self.access_token:
             logger.warning("No access token found in config. Authentication required.")
             
-        self.configuration = upstox_client.Configuration()
-        self.configuration.access_token = self.access_token
+        self._api_client = None
+        self._order_api = None
+        
+        # Async order path (pooled HTTP, used from the strategy's event loop)
+        # Orders are queued through the scheduler to respect broker rate limits.
+        self.gateway = OrderGateway(config)
+        self.scheduler = OrderScheduler(self.gateway.place_order, limits=(
+            (config.get("ORDER_LIMIT_PER_SEC", 50), 1.0),
+            (config.get("ORDER_LIMIT_PER_MIN", 500), 60.0),
+            (config.get("ORDER_LIMIT_PER_30MIN", 2000), 1800.0),
+        ), coalesce=config.get("ORDER_COALESCE", False))
+
+    def _get_api_client(self):
+        # One ApiClient (and its urllib3 pool) for all synchronous SDK calls
+        if self._api_client is None:
+            upstox_client, _ = _sdk()
+            configuration = upstox_client.Configuration()
+            configuration.access_token = self.access_token
+            self._api_client = upstox_client.ApiClient(configuration)
+            self._order_api = upstox_client.OrderApi(self._api_client)
+        return self._api_client
 
     def validate_session(self):
         """
         Verify if the current token is valid by fetching user profile.
+        Blocking; validate_session_async does the same without the SDK.
         """
         if not self.access_token:
             return False
             
+        upstox_client, ApiException = _sdk()
         try:
-            api_instance = upstox_client.UserApi(upstox_client.ApiClient(self.configuration))
+            api_instance = upstox_client.UserApi(self._get_api_client())
             api_response = api_instance.get_profile(self.api_version)
             logger.info(f"Session Valid. User: {api_response.data.user_name}")
             return True
@@ -45,6 +78,7 @@ class UpstoxHandler:
         """
         Exchange auth code for access token.
         """
+        upstox_client, ApiException = _sdk()
         api_instance = upstox_client.LoginApi()
         try:
             api_response = api_instance.token(
@@ -56,13 +90,33 @@ class UpstoxHandler:
                 grant_type="authorization_code"
             )
             self.access_token = api_response.access_token
-            self.configuration.access_token = self.access_token
+            self._api_client = None
+            self.gateway.set_access_token(self.access_token)
             logger.info("Access Token Generated successfully")
             return self.access_token
         except ApiException as e:
             logger.error(f"Failed to generate token: {e}")
             raise
 
+    def resolve_order(self, symbol, quantity):
+        """
+        Instrument key for an order on 'symbol' (a key, trading symbol or
+        ISIN), or None when the instrument master doesn't know it or the
+        quantity isn't a whole number of lots. Without a master the symbol
+        is taken to be the key already.
+        """
+        if self.instruments is None:
+            return symbol
+        instrument = self.instruments.get(symbol)
+        if instrument is None:
+            logger.error(f"Order rejected: unknown instrument {symbol}")
+            return None
+        if instrument.lot_size > 1 and quantity % instrument.lot_size:
+            logger.error(f"Order rejected: {quantity} is not a multiple of the {symbol} lot size "
+                         f"({instrument.lot_size})")
+            return None
+        return instrument.instrument_key
+
     def get_market_data_feed_details(self):
         # We will implement WebSocket logic in a separate module
         pass
@@ -74,9 +128,14 @@ class UpstoxHandler:
         if not self.access_token:
             logger.error("Cannot place order: No Access Token.")
             return None
+        instrument_key = self.resolve_order(symbol, quantity)
+        if instrument_key is None:
+            return None
             
+        upstox_client, ApiException = _sdk()
         try:
-            api_instance = upstox_client.OrderApi(upstox_client.ApiClient(self.configuration))
+            self._get_api_client()
+            api_instance = self._order_api
             
             # Construct order body
             body = upstox_client.PlaceOrderRequest(
@@ -85,7 +144,7 @@ class UpstoxHandler:
                 validity='DAY',
                 price=price if order_type == 'LIMIT' else 0.0,
                 tag='NKBot_Algo',
-                instrument_token=symbol, # This needs to be the instrument KEY (e.g., NSE_EQ|INE...)
+                instrument_token=instrument_key,
                 order_type=order_type,
                 transaction_type=side,
                 disclosed_quantity=0,
@@ -105,11 +164,58 @@ class UpstoxHandler:
         """
         Cancel an open order.
         """
+        _, ApiException = _sdk()
         try:
-            api_instance = upstox_client.OrderApi(upstox_client.ApiClient(self.configuration))
-            api_response = api_instance.cancel_order(order_id, self.api_version)
+            self._get_api_client()
+            api_response = self._order_api.cancel_order(order_id, self.api_version)
             logger.info(f"Order Cancelled: {order_id}")
             return True
         except ApiException as e:
             logger.error(f"Cancel Order Failed: {e}")
             return False
+
+    # --- Async order path (non-blocking, for use inside the event loop) ---
+
+    async def validate_session_async(self):
+        """
+        Profile check over the order gateway's pooled session, so it can run
+        while the feed connects (and leaves a warm connection for orders).
+        """
+        return await self.gateway.validate_session()
+
+    async def place_order_async(self, symbol, side, quantity, product='I', order_type='MARKET', price=0.0,
+                                trigger_price=0.0, priority=PRIORITY_ENTRY):
+        """
+        Queue an order through the rate-limit scheduler. Exits (PRIORITY_EXIT)
+        are always sent ahead of entries.
+        """
+        instrument_key = self.resolve_order(symbol, quantity)
+        if instrument_key is None:
+            return None
+        return await self.scheduler.submit(
+            priority, symbol=instrument_key, side=side, quantity=quantity, product=product,
+            order_type=order_type, price=price, trigger_price=trigger_price
+        )
+
+    async def modify_order_async(self, order_id, quantity=None, price=None, order_type=None, trigger_price=None,
+                                 priority=PRIORITY_EXIT):
+        """
+        Modifications and cancellations count against the same broker order
+        limits, so they queue through the scheduler too (as exits by default:
+        they are usually stop adjustments).
+        """
+        return await self.scheduler.call(
+            self.gateway.modify_order, priority, order_id=order_id, quantity=quantity, price=price,
+            order_type=order_type, trigger_price=trigger_price
+        )
+
+    async def cancel_order_async(self, order_id, priority=PRIORITY_EXIT):
+        return await self.scheduler.call(self.gateway.cancel_order, priority, order_id=order_id)
+
+    async def place_orders_async(self, orders, priority=PRIORITY_ENTRY):
+        """
+        Several orders (place_order keyword arguments, instrument keys as
+        symbols), each queued through the scheduler. Returns order ids (None
+        for failures) in the same order.
+        """
+        return await asyncio.gather(*[self.scheduler.submit(priority, **order) for order in orders])
@@ -0,0 +1,13 @@
+from broadcast import _delta
+
+
+def test_delta_lists_removals_apart_from_null_values():
+    old = {"pnl": 1.0, "halted": None, "stale": 3, "positions": {"A": {"qty": 1}, "B": {"qty": 2, "sl": None}}}
+    new = {"pnl": None, "halted": None, "fresh": None, "positions": {"B": {"qty": 2, "sl": 99.0}, "C": None}}
+    assert _delta(old, new) == {
+        "changes": {"pnl": None, "fresh": None},
+        "removed": ["stale"],
+        "patches": {"positions": {"B": {"qty": 2, "sl": 99.0}, "C": None}},
+        "deletes": {"positions": ["A"]},
+    }
+    assert _delta(new, new) == {}
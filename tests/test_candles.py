@@ -0,0 +1,32 @@
+import asyncio
+
+from candles import CandleAggregator
+from feed_decoder import Tick
+
+
+def test_concurrent_closes_close_each_boundary_once():
+    # The bar timer and the tick path race for the same boundary while a
+    # slow on_close (order placement) is awaited
+    closes = []
+
+    async def on_close(bar_ts, bars):
+        closes.append(bar_ts)
+        await asyncio.sleep(0.05)
+
+    async def run():
+        candles = CandleAggregator("1min", ["A"], on_close=on_close, clock=lambda: 0.0)
+        await candles.on_ticks([Tick("A", ltp=100.0, ltt=1_000, ltq=1)])
+        timer = asyncio.create_task(candles.close_until(60_000))
+        await asyncio.sleep(0)
+        await candles.on_ticks([Tick("A", ltp=101.0, ltt=60_500, ltq=2)])
+        await timer
+        await candles.on_ticks([Tick("A", ltp=102.0, ltt=120_500, ltq=3)])
+        return candles
+
+    candles = asyncio.run(run())
+    bars = candles.buffers["A"].arrays()
+    assert closes == [0, 60_000]
+    assert bars["ts"].tolist() == [0, 60_000]
+    assert bars["close"].tolist() == [100.0, 101.0]
+    assert bars["volume"].tolist() == [1.0, 2.0]
+    assert candles.bucket == 120_000
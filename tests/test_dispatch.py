@@ -0,0 +1,29 @@
+import asyncio
+
+from feed_decoder import Tick
+from market_data import MarketDataStreamer
+
+
+def test_queue_overflow_becomes_a_gap_in_tick_order():
+    events = []
+
+    async def candles(ticks):
+        events.append(("ticks", [tick.ltt for tick in ticks]))
+
+    async def run():
+        streamer = MarketDataStreamer({"TRADING_SYMBOL_LIST": ["A"], "DISPATCH_QUEUE": 2})
+        streamer.tick_handlers.append(candles)
+        streamer.gap_handlers.append(lambda start, end: events.append(("gap", [start, end])))
+        dispatcher = streamer.dispatcher
+        for ltt in (1_000, 2_000, 3_000, 4_000):  # The reader outruns the handlers: 3_000 and 4_000 overflow
+            dispatcher.put(0, [Tick("A", 100.0, ltt)])
+        dispatcher.start()
+        await asyncio.sleep(0.01)
+        dispatcher.put(0, [Tick("A", 100.0, 5_000)])
+        await asyncio.sleep(0.01)
+        dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(run())
+    assert events == [("ticks", [1_000]), ("ticks", [2_000]), ("gap", [3_000, 4_000]), ("ticks", [5_000])]
+    assert stats["dropped"] == 2 and stats["overflows"] == 1
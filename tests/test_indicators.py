@@ -0,0 +1,87 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from candles import SESSION_TZ
+from replay import synthetic_candles
+from streaming_indicators import IndicatorState, SESSION_UTC_OFFSET_MS, DAY_MS
+from strategy import GodfatherStrategy
+
+MIN_BARS = GodfatherStrategy(None, None, {}).min_bars
+
+
+def reference(bars, rsi_period, atr_period, vol_ma_period):
+    """
+    Fallback for when pandas_ta isn't installed: its definitions (no TA-Lib)
+    written out in pandas. RSI / ATR on Wilder's RMA (adjusted EWM, alpha
+    1/length), rolling volume mean and a VWAP that restarts every session.
+    """
+    df = pd.DataFrame(bars)
+
+    def rma(x, length):
+        return x.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+    change = df["close"].diff()
+    gain, loss = rma(change.clip(lower=0), rsi_period), rma(-change.clip(upper=0), rsi_period)
+    prev = df["close"].shift()
+    true_range = pd.concat([df["high"] - df["low"], (df["high"] - prev).abs(), (df["low"] - prev).abs()],
+                           axis=1).max(axis=1, skipna=False)
+    typical = (df["high"] + df["low"] + df["close"]) / 3
+    session = (df["ts"] + SESSION_UTC_OFFSET_MS) // DAY_MS
+    return {
+        "rsi": 100 * gain / (gain + loss),
+        "atr": rma(true_range, atr_period),
+        "vol_sma": df["volume"].rolling(vol_ma_period).mean(),
+        "vwap": (typical * df["volume"]).groupby(session).cumsum() / df["volume"].groupby(session).cumsum(),
+    }
+
+
+def stream(bars, periods):
+    state = IndicatorState(*periods)
+    streamed = {name: [] for name in ("rsi", "atr", "vol_sma", "vwap")}
+    for row in zip(*(bars[name].tolist() for name in ("ts", "open", "high", "low", "close", "volume"))):
+        state.update(*row)
+        for name, values in streamed.items():
+            values.append(getattr(state, name))
+    return {name: np.array(values) for name, values in streamed.items()}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("periods", [(14, 14, 20), (7, 10, 5)])
+def test_streaming_matches_pandas_ta(seed, periods):
+    pytest.importorskip("pandas_ta")
+    from indicators import TechnicalIndicators
+
+    bars = next(iter(synthetic_candles(1, seed=seed, sessions=3).values()))
+    index = pd.to_datetime(bars["ts"], unit="ms", utc=True).tz_convert(SESSION_TZ).tz_localize(None)
+    df = pd.DataFrame({name: bars[name] for name in ("open", "high", "low", "close", "volume")}, index=index)
+    rsi_period, atr_period, vol_ma_period = periods
+    expected = {
+        "rsi": TechnicalIndicators.calculate_rsi(df, rsi_period),
+        "atr": TechnicalIndicators.calculate_atr(df, atr_period),
+        "vol_sma": TechnicalIndicators.calculate_sma_volume(df, vol_ma_period),
+        "vwap": TechnicalIndicators.calculate_vwap(df),
+    }
+    streamed = stream(bars, periods)
+    for name, values in expected.items():
+        # Every bar the strategy can trade on (from min_bars)
+        np.testing.assert_allclose(streamed[name][MIN_BARS - 1:], values.to_numpy()[MIN_BARS - 1:],
+                                   rtol=1e-10, err_msg=name)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("periods", [(14, 14, 20), (7, 10, 5)])
+def test_streaming_matches_pandas_reference(seed, periods):
+    if importlib.util.find_spec("pandas_ta") is not None:
+        pytest.skip("pandas_ta is installed: test_streaming_matches_pandas_ta covers it")
+    bars = next(iter(synthetic_candles(1, seed=seed, sessions=3).values()))
+    streamed = stream(bars, periods)
+    for name, expected in reference(bars, *periods).items():
+        got = streamed[name]
+        expected = expected.to_numpy()
+        # Same warm-up, and every bar the strategy can trade on (from min_bars) is compared
+        np.testing.assert_array_equal(np.isnan(got), np.isnan(expected), err_msg=name)
+        assert not np.isnan(got[MIN_BARS - 1:]).any(), name
+        np.testing.assert_allclose(got[MIN_BARS - 1:], expected[MIN_BARS - 1:], rtol=1e-10, err_msg=name)
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from instruments import InstrumentMaster
+
+CSV = """instrument_key,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,option_type,exchange
+NSE_EQ|INE002A01018,2885,RELIANCE,RELIANCE INDUSTRIES LTD,0.0,,,0.05,1,EQUITY,,NSE_EQ
+NSE_FO|43919,43919,NIFTY24OCTFUT,NIFTY,0.0,2024-10-31,,0.05,25,FUTIDX,,NSE_FO
+NSE_FO|43920,43920,NIFTY24OCT25000CE,NIFTY,0.0,2024-10-31,25000.0,0.05,25,OPTIDX,CE,NSE_FO
+"""
+
+ROWS = [{"segment": "NSE_EQ", "name": "RELIANCE INDUSTRIES LTD", "exchange": "NSE", "isin": "INE002A01018",
+         "instrument_type": "EQ", "instrument_key": "NSE_EQ|INE002A01018", "lot_size": 1, "tick_size": 5.0,
+         "trading_symbol": "RELIANCE"},
+        {"segment": "NSE_FO", "name": "NIFTY", "exchange": "NSE", "instrument_type": "CE",
+         "instrument_key": "NSE_FO|43920", "lot_size": 25, "tick_size": 5.0, "trading_symbol": "NIFTY24OCT25000CE"}]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_formats_build_the_same_records(tmp_path, fmt):
+    source = tmp_path / f"instruments.{fmt}"
+    source.write_text(CSV if fmt == "csv" else json.dumps(ROWS))
+    master = InstrumentMaster.open(str(tmp_path / "store"), str(source))
+
+    reliance = master["RELIANCE"]
+    assert reliance.instrument_key == "NSE_EQ|INE002A01018"
+    assert reliance.tick_size == 0.05
+    assert reliance.instrument_type == "EQ"
+    assert master.select("NSE_EQ", "EQ") == ["NSE_EQ|INE002A01018"]
+    assert master.select("NSE_FO", "CE") == ["NSE_FO|43920"]
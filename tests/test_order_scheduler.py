@@ -0,0 +1,92 @@
+import asyncio
+
+from order_scheduler import OrderScheduler, PRIORITY_ENTRY, PRIORITY_EXIT
+
+
+class FakeClock:
+    """
+    Scheduler time that only moves when the test advances it, so tokens
+    refill exactly when the test says.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Broker:
+    def __init__(self):
+        self.sent = []
+
+    async def place_order(self, symbol, side, quantity):
+        self.sent.append(symbol)
+        return f"order-{len(self.sent)}"
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def drain(clock, tasks, step):
+    """
+    Advance the clock a bucket period at a time until every task is done.
+    """
+    while not all(task.done() for task in tasks):
+        clock.now += step
+        await asyncio.sleep(0.02)
+    return [task.result() for task in tasks]
+
+
+def test_exits_jump_the_queue_and_entries_leave_the_reserve():
+    async def run():
+        clock, broker = FakeClock(), Broker()
+        # 3 tokens per 30ms of scheduler time, 2 of them kept for exits
+        scheduler = OrderScheduler(broker.place_order, limits=((3, 0.03),), exit_reserve=2, clock=clock)
+        entries = [asyncio.create_task(scheduler.submit(PRIORITY_ENTRY, symbol=f"E{i}", side="BUY", quantity=1))
+                   for i in range(4)]
+        await settle()
+        assert broker.sent == ["E0"]  # The burst stops at the exit reserve
+
+        exits = [asyncio.create_task(scheduler.submit(PRIORITY_EXIT, symbol=f"X{i}", side="SELL", quantity=1))
+                 for i in range(3)]
+        await settle()
+        assert broker.sent == ["E0", "X0", "X1"]  # The reserve goes to exits at once
+
+        clock.now = 0.03  # Bucket full again: the waiting exit goes before the earlier entries
+        await asyncio.sleep(0.05)
+        assert broker.sent == ["E0", "X0", "X1", "X2"]
+        assert scheduler.depth == {PRIORITY_EXIT: 0, PRIORITY_ENTRY: 3}
+
+        await drain(clock, entries + exits, 0.03)
+        await scheduler.stop()
+        return broker
+
+    broker = asyncio.run(run())
+    assert broker.sent == ["E0", "X0", "X1", "X2", "E1", "E2", "E3"]
+
+
+def test_identical_orders_are_only_merged_when_coalescing():
+    async def run(coalesce):
+        clock, broker = FakeClock(), Broker()
+        scheduler = OrderScheduler(broker.place_order, limits=((1, 0.01),), exit_reserve=0, coalesce=coalesce,
+                                   clock=clock)
+        first = asyncio.create_task(scheduler.submit(PRIORITY_ENTRY, symbol="A", side="BUY", quantity=1))
+        await settle()  # Takes the only token
+        queued = [asyncio.create_task(scheduler.submit(PRIORITY_ENTRY, symbol="B", side="BUY", quantity=1))
+                  for _ in range(2)]
+        await settle()
+        ids = await drain(clock, [first, *queued], 0.01)
+        await scheduler.stop()
+        return broker, scheduler, ids
+
+    broker, scheduler, ids = asyncio.run(run(coalesce=False))
+    assert broker.sent == ["A", "B", "B"]
+    assert ids == ["order-1", "order-2", "order-3"]
+    assert scheduler.coalesced == 0
+
+    broker, scheduler, ids = asyncio.run(run(coalesce=True))
+    assert broker.sent == ["A", "B"]
+    assert ids == ["order-1", "order-2", "order-2"]
+    assert scheduler.coalesced == 1
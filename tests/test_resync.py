@@ -0,0 +1,71 @@
+import asyncio
+
+from market_data import Backoff
+from resync import StateResync
+
+
+class Gateway:
+    """
+    Order book unavailable for the first 'failures' calls.
+    """
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def order_book(self):
+        self.calls += 1
+        return None if self.calls <= self.failures else []
+
+    async def positions(self):
+        return []
+
+    async def ltp(self, symbols):
+        return {}
+
+
+class Strategy:
+    def __init__(self):
+        self.positions = {}
+        self.inflight = set()
+        self.reconciled = 0
+
+    def reconcile(self, positions, orders, skip=()):
+        self.reconciled += 1
+        return 0
+
+
+def new_resync(failures):
+    return StateResync(Gateway(failures), Strategy(), backoff=Backoff(0.001, 0.004))
+
+
+def test_failed_resync_is_retried_until_it_succeeds():
+    async def run():
+        resync = new_resync(3)
+        resync.on_disconnect()
+        resync.on_connect()
+        await asyncio.wait_for(resync._resync, 1.0)
+        return resync
+
+    resync = asyncio.run(run())
+    assert resync.gateway.calls == 4
+    assert resync.failures == 3
+    assert resync.resyncs == 1
+    assert resync.strategy.reconciled == 1
+    assert resync._resync is None
+
+
+def test_retries_stop_when_the_feed_drops_again():
+    async def run():
+        resync = new_resync(1_000)
+        resync.on_disconnect()
+        resync.on_connect()
+        task = resync._resync
+        await asyncio.sleep(0.02)
+        resync.on_disconnect()
+        await asyncio.wait_for(task, 1.0)
+        return resync
+
+    resync = asyncio.run(run())
+    assert resync.resyncs == 0
+    assert resync.strategy.reconciled == 0
+    assert resync._resync is None
@@ -0,0 +1,37 @@
+import asyncio
+import multiprocessing
+
+from sharding import ShardLink, ShardOrderClient, ShardWorker
+
+
+def test_order_fails_at_once_when_the_coordinator_is_gone():
+    async def run():
+        conn, other = multiprocessing.Pipe()
+        other.close()
+        client = ShardOrderClient(ShardLink(conn, lambda message: None))
+        order_id = await asyncio.wait_for(client.place_order_async("A", "BUY", 1), 1.0)
+        return order_id, client
+
+    order_id, client = asyncio.run(run())
+    assert order_id is None
+    assert not client._pending
+
+
+def test_flatten_failures_are_logged(caplog):
+    class Strategy:
+        async def flatten(self, reason):
+            raise RuntimeError(f"cannot flatten ({reason})")
+
+    async def run():
+        conn, _ = multiprocessing.Pipe()
+        worker = ShardWorker(3, {}, conn)
+        worker.strategy = Strategy()
+        worker.on_message(("flatten", "Daily loss limit"))
+        await asyncio.gather(*worker._tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+        return worker
+
+    with caplog.at_level("ERROR", logger="Sharding"):
+        worker = asyncio.run(run())
+    assert not worker._tasks
+    assert any("Shard 3: Flatten failed" in r.message and "Daily loss limit" in r.message for r in caplog.records)
@@ -0,0 +1,84 @@
+import asyncio
+import types
+
+import numpy as np
+
+from strategy import GodfatherStrategy
+
+
+class SlowBroker:
+    """
+    place_order_async waits until released; records what was on the wire.
+    """
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.sent = []
+        self.waiting = 0
+
+    async def place_order_async(self, symbol, side, quantity, priority=None):
+        self.sent.append((symbol, side))
+        self.waiting += 1
+        await self.release.wait()
+        return f"order-{len(self.sent)}"
+
+
+def new_strategy(client, symbols):
+    brain = types.SimpleNamespace(sentiment_cache={"market": 1.0})
+    return GodfatherStrategy(client, brain, {"TRADING_SYMBOL_LIST": symbols})
+
+
+def test_bar_close_does_not_wait_for_entry_acks():
+    symbols = ["A", "B", "C"]
+
+    async def run():
+        broker = SlowBroker()
+        strategy = new_strategy(broker, symbols)
+        board = strategy.signal_board
+        board.close[:] = 100.0
+        board.atr[:] = 1.0
+        board.evaluate = lambda *args, **kwargs: (np.array([0, 1]), np.array([2]))
+        await asyncio.wait_for(strategy.on_bar_close(0, []), 0.1)  # Returns with every ack pending
+        await asyncio.sleep(0)
+        on_wire = broker.waiting
+        assert strategy.inflight == set(symbols)
+        await strategy.on_bar_close(60_000, [])  # Still in flight: no second entry
+        broker.release.set()
+        await strategy.settle()
+        return broker, strategy, on_wire
+
+    broker, strategy, on_wire = asyncio.run(run())
+    assert on_wire == 3  # All three placed concurrently
+    assert broker.sent == [("A", "BUY"), ("B", "BUY"), ("C", "SELL")]
+    assert set(strategy.positions) == set(symbols)
+    assert not strategy.inflight
+
+
+class FailingBroker:
+    def __init__(self):
+        self.sent = []
+
+    async def place_order_async(self, symbol, side, quantity, priority=None):
+        self.sent.append((symbol, side))
+        raise ConnectionError("broker down")
+
+
+def test_halt_flattens_with_its_reason_and_logs_failures(caplog):
+    async def run():
+        strategy = new_strategy(FailingBroker(), ["A"])
+        strategy.positions["A"] = {"side": "BUY", "quantity": 1, "entry_price": 100.0}
+        reasons = []
+        close_position = strategy.close_position
+
+        async def recording_close(symbol, reason):
+            reasons.append(reason)
+            await close_position(symbol, reason)
+        strategy.close_position = recording_close
+        strategy.halt("Kill switch")
+        await strategy.settle()
+        return strategy, reasons
+
+    with caplog.at_level("ERROR", logger="StrategyEngine"):
+        strategy, reasons = asyncio.run(run())
+    assert reasons == ["Kill switch"]
+    assert strategy._flatten_task.done()
+    assert any("Flatten failed" in r.message and "broker down" in r.message for r in caplog.records)
@@ -0,0 +1,37 @@
+import asyncio
+import os
+import time
+
+from feed_decoder import Tick
+from tick_journal import TickJournal, TickJournalReader, TICK_DTYPE
+
+
+def _record(root, frames, ticks):
+    journal = TickJournal(str(root), fsync_interval=0.01)
+    journal.start()
+    for frame in frames:
+        journal.record_frame(frame)
+    asyncio.run(journal.on_ticks(ticks))
+    journal.stop()
+    return os.listdir(root)[0]
+
+
+def test_resume_drops_torn_records(tmp_path):
+    now_ms = time.time_ns() // 1_000_000
+    day = _record(tmp_path, [b"first", b"second"], [Tick("A", 1.0, now_ms), Tick("B", 2.0, now_ms)])
+    path = tmp_path / day
+
+    # Crash mid-write: a frame header with half its body, half a tick record, half a symbol
+    with open(path / "frames-00000.bin", "ab") as f:
+        f.write(b"\x01\x00\x00\x00\x00\x00\x00\x00\x10\x00\x00\x00torn")
+    with open(path / "ticks-00000.bin", "ab") as f:
+        f.write(b"\x00" * (TICK_DTYPE.itemsize // 2))
+    with open(path / "symbols.txt", "a") as f:
+        f.write("NSE_EQ|INE")
+
+    _record(tmp_path, [b"third"], [Tick("C", 3.0, now_ms)])
+    reader = TickJournalReader(str(tmp_path), day)
+    assert [frame for _, frame in reader.frames()] == [b"first", b"second", b"third"]
+    assert reader.symbols == ["A", "B", "C"]
+    assert reader.column("instrument").tolist() == [0, 1, 2]
+    assert reader.column("ltp").tolist() == [1.0, 2.0, 3.0]
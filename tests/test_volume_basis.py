@@ -0,0 +1,58 @@
+import asyncio
+
+import numpy as np
+
+from candles import CandleAggregator
+from feed_decoder import Tick
+from signals import SignalBoard
+from streaming_indicators import IndicatorState
+
+
+def test_bars_carry_their_volume_basis():
+    closed = []
+
+    async def on_close(bar_ts, bars):
+        closed.extend(bars)
+
+    async def run():
+        candles = CandleAggregator("1min", ["A"], on_close=on_close, clock=lambda: 0.0)
+        await candles.on_ticks([Tick("A", ltp=100.0, ltt=1_000, ltq=5)])                       # ltpc
+        await candles.on_ticks([Tick("A", ltp=100.0, ltt=61_000, ltq=5, vtt=10_000)])          # promoted
+        await candles.on_ticks([Tick("A", ltp=100.0, ltt=62_000, ltq=5, vtt=10_400)])
+        await candles.on_ticks([Tick("A", ltp=100.0, ltt=121_000, ltq=5, vtt=11_000)])         # full
+        await candles.close_until(240_000)                                                     # + flat bar
+
+    asyncio.run(run())
+    assert [(bar[0], bar[5], bar[6]) for _, bar in closed] == [
+        (0, 5.0, False), (60_000, 405.0, False), (120_000, 600.0, True), (180_000, 0.0, True)]
+
+
+def test_surge_needs_traded_volume_and_a_same_basis_average():
+    board = SignalBoard(["A"])
+    state = IndicatorState()
+    ts = 0
+    for i in range(60):  # History: traded volume around 1000, rising prices
+        state.update(ts, 100 + i, 101 + i, 99 + i, 100.5 + i, 1000.0)
+        ts += 60_000
+    for i in range(20):  # ltpc: sampled volume, ~1% of traded
+        state.update(ts, 160, 161, 159, 160.5, 10.0, full=False)
+        ts += 60_000
+    assert not state.full and state.vol_sma == 10.0
+
+    # A sampled-volume spike is a spike on its own basis (forming), never an entry
+    state.update(ts, 160, 163, 159, 162.5, 30.0, full=False)
+    board.update("A", state)
+    assert board.forming(ts, rsi_long=0.0, min_bars=50).tolist() == [0]
+    longs, _ = board.evaluate(ts, 1.0, rsi_long=(0.0, 101.0), min_bars=50)
+    assert not len(longs)
+
+    # After promotion, traded volume is compared with the traded-volume average
+    ts += 60_000
+    state.update(ts, 162, 164, 161, 163.5, 1500.0)
+    board.update("A", state)
+    assert state.full and state.vol_sma == 1025.0
+    assert not len(board.evaluate(ts, 1.0, rsi_long=(0.0, 101.0), min_bars=50)[0])
+    ts += 60_000
+    state.update(ts, 163, 168, 162, 167.5, 5000.0)
+    board.update("A", state)
+    np.testing.assert_array_equal(board.evaluate(ts, 1.0, rsi_long=(0.0, 101.0), min_bars=50)[0], [0])
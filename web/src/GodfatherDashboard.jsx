@@ -10,6 +10,8 @@ const GodfatherDashboard = () => {
     const [status, setStatus] = useState("DISCONNECTED");
     const [logs, setLogs] = useState([]);
     const ws = useRef(null);
+    const seq = useRef(0);
+    const current = useRef(null); // Latest metrics, for diffing in the socket handler
 
     useEffect(() => {
         connectWebSocket();
@@ -27,8 +29,28 @@ const GodfatherDashboard = () => {
         };
 
         ws.current.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            setMetrics(data);
+            const msg = JSON.parse(event.data);
+            if (msg.type === "snapshot") {
+                seq.current = msg.seq;
+                current.current = msg.data;
+                setMetrics(msg.data);
+                return;
+            }
+            if (msg.seq !== seq.current + 1) {
+                // Missed a delta: reconnecting gets a fresh snapshot
+                ws.current.close();
+                return;
+            }
+            seq.current = msg.seq;
+            const open = current.current?.positions || {};
+            for (const [symbol, pos] of Object.entries(msg.patches?.positions || {})) {
+                if (!(symbol in open)) addLog(`OPEN ${pos.side} ${symbol} @ ${pos.entry_price}`);
+            }
+            for (const symbol of msg.deletes?.positions || []) {
+                addLog(`CLOSED ${symbol}`);
+            }
+            current.current = applyDelta(current.current, msg);
+            setMetrics(current.current);
         };
 
         ws.current.onclose = () => {
@@ -74,7 +96,7 @@ const GodfatherDashboard = () => {
                     <Card title="SENTIMENT" value={metrics.sentiment?.toFixed(2)} icon={<Activity />} color="text-blue-400" />
                     <Card title="ACTIVE POSITIONS" value={Object.keys(metrics.positions || {}).length} icon={<TrendingUp />} color="text-green-400" />
                     <Card title="PNL (SESSION)" value={`₹${metrics.pnl || 0}`} icon={<DollarSign />} color="text-yellow-400" />
-                    <Card title="RISK LEVEL" value="LOW" icon={<Shield />} color="text-purple-400" />
+                    <Card title={metrics.halted ? "RISK: HALTED" : "DRAWDOWN"} value={`₹${metrics.pnl_detail?.drawdown || 0}`} icon={<Shield />} color={metrics.halted ? "text-red-500" : "text-purple-400"} />
                 </div>
 
                 {/* Main Chart Area */}
@@ -116,6 +138,20 @@ const GodfatherDashboard = () => {
     );
 };
 
+// Delta: "changes" replace top-level fields and "removed" drops them;
+// "patches" set entries of object fields (e.g. positions) and "deletes"
+// removes entries. Parts with nothing in them are left out.
+const applyDelta = (prev, { changes = {}, removed = [], patches = {}, deletes = {} }) => {
+    const next = { ...prev, ...changes };
+    for (const key of removed) delete next[key];
+    for (const key of new Set([...Object.keys(patches), ...Object.keys(deletes)])) {
+        const merged = { ...(prev[key] || {}), ...(patches[key] || {}) };
+        for (const entry of deletes[key] || []) delete merged[entry];
+        next[key] = merged;
+    }
+    return next;
+};
+
 const Card = ({ title, value, icon, color }) => (
     <div className="bg-gray-900/40 border border-gray-800 p-4 rounded-xl backdrop-blur-sm hover:border-gray-700 transition-colors">
         <div className={`mb-2 ${color}`}>{icon}</div>